@@ -1,63 +1,492 @@
+import heapq
+import time
+from array import array
+from collections import deque
+
+from search_stats import HEAP_ENTRY_BYTES, QUEUE_ENTRY_BYTES, SearchStats, container_bytes
+
+
 class Algorithms:
-    def __init__(self, graph):
+    """
+    Search algorithms over a Graph.
+
+    Every algorithm is implemented once as a step generator (the ``*_steps`` methods):
+    it yields each node as it is expanded and returns the found path (an empty list
+    when the goal is unreachable) when it finishes. ``perform_search`` and the plain
+    algorithm methods simply drain those generators into ``(visit_order, found_path)``.
+
+    When a SearchCache is given, ``search_steps`` (and so ``perform_search``) replays
+    cached results and records the results of completed searches.
+
+    Every step generator takes an optional SearchStats and counts its work into it;
+    ``perform_search`` leaves the stats of its run in ``self.stats``.
+    """
+
+    def __init__(self, graph, cache=None):
         self.found_path = []
         self.visit_order = []
+        self.stats = None  # SearchStats of the last perform_search
         self.graph = graph
-        self.designations = ['Profundidade Primeiro', 'Largura Primeiro', 'Greedy BFS', 'A*', 'Dijkstra']
+        self.cache = cache
+        self.designations = ['Profundidade Primeiro', 'Largura Primeiro', 'Greedy BFS', 'A*', 'Dijkstra',
+                             'Dijkstra Bidirecional', 'A* Bidirecional', 'A* (Landmarks)',
+                             'Contraction Hierarchies']
 
     def dfs(self, start_node, end_node):
-        self.found_path.append(start_node)
+        return self._collect(self.dfs_steps(start_node, end_node))
 
-        if start_node == end_node: return self.found_path.copy(), start_node
-        if start_node in self.visit_order:
-            self.found_path.pop()
-            return False
+    def bfs(self, start_node, end_node):
+        return self._collect(self.bfs_steps(start_node, end_node))
 
-        self.visit_order.append(start_node)
+    def greedy_bfs(self, start_node, end_node):
+        return self._collect(self.greedy_bfs_steps(start_node, end_node))
 
-        for node in self.get_neighbors(start_node):
-            result = self.dfs(node, end_node)
-            if result: return result
+    def a_star(self, start_node, end_node):
+        return self._collect(self.a_star_steps(start_node, end_node))
 
-        self.found_path.pop()
-        return False
+    def dijkstra(self, start_node, end_node):
+        return self._collect(self.dijkstra_steps(start_node, end_node))
 
-    def bfs(self, start_node, end_node):
-        visited = set()
-        self.visit_order = [start_node]
+    def bidirectional_dijkstra(self, start_node, end_node):
+        return self._collect(self.bidirectional_dijkstra_steps(start_node, end_node))
 
-        while self.visit_order:
-            node, path = self.visit_order.pop(0)
-            if node == end_node: return node
-            if node in visited: continue
-            visited.add(node)
-            self.visit_order += self.get_neighbors(node)
+    def bidirectional_a_star(self, start_node, end_node):
+        return self._collect(self.bidirectional_a_star_steps(start_node, end_node))
 
-        return
+    def alt_a_star(self, start_node, end_node):
+        return self._collect(self.alt_a_star_steps(start_node, end_node))
 
-    def greedy_bfs(self, start_node, end_node):
-        return [], []
+    def contraction_hierarchy(self, start_node, end_node):
+        return self._collect(self.contraction_hierarchy_steps(start_node, end_node))
 
-    def a_star(self, start_node, end_node):
-        return [], []
+    def dfs_steps(self, start_node, end_node, stats=None):
+        """
+        Iterative depth-first search with an explicit stack, so deep graphs never hit
+        the recursion limit. Neighbors are tried in file order, exactly like the
+        recursive version, and the stack itself is the current path.
+        """
+        graph = self.graph
+        start, goal = graph.id_of(start_node), graph.id_of(end_node)
+        offsets, targets = memoryview(graph.offsets), memoryview(graph.targets)
+        node_list = graph.node_list
+        visited = bytearray(graph.node_count)
+        stats = SearchStats() if stats is None else stats
 
-    def dijkstra(self, start_node, end_node):
-        return [], []
+        visited[start] = 1
+        yield node_list[start]
+        if start == goal:
+            return graph.to_nodes([start])
 
-    def perform_search(self, search_type, start_node, end_node):
+        node_stack = [start]
+        edge_stack = [offsets[start]]  # Next outgoing edge to try for each node on the stack
+        relaxed, pushes, pops, peak = 0, 1, 0, 1
+        try:
+            while node_stack:
+                node, position = node_stack[-1], edge_stack[-1]
+                end = offsets[node + 1]
+                first = position
+                while position < end and visited[targets[position]]:
+                    position += 1
+                if position == end:
+                    relaxed += end - first
+                    node_stack.pop()
+                    edge_stack.pop()
+                    pops += 1
+                    continue
+
+                relaxed += position - first + 1
+                edge_stack[-1] = position + 1
+                neighbor = targets[position]
+                visited[neighbor] = 1
+                node_stack.append(neighbor)
+                edge_stack.append(offsets[neighbor])
+                pushes += 1
+                if len(node_stack) > peak:
+                    peak = len(node_stack)
+                yield node_list[neighbor]
+                if neighbor == goal:
+                    return graph.to_nodes(node_stack)
+
+            return []
+        finally:
+            stats.add_work(relaxed, pushes, pops, peak, container_bytes(visited) + 2 * peak * QUEUE_ENTRY_BYTES)
+
+    def bfs_steps(self, start_node, end_node, stats=None):
+        """
+        Breadth-first search with a deque frontier, a bitmap of discovered nodes and
+        a parent array for path reconstruction.
+        """
+        graph = self.graph
+        start, goal = graph.id_of(start_node), graph.id_of(end_node)
+        offsets, targets = memoryview(graph.offsets), memoryview(graph.targets)
+        node_list = graph.node_list
+        discovered = bytearray(graph.node_count)
+        parents = array('i', [-1]) * graph.node_count
+        stats = SearchStats() if stats is None else stats
+
+        discovered[start] = 1
+        queue = deque([start])
+        relaxed, pushes, pops, peak = 0, 1, 0, 1
+        try:
+            while queue:
+                node = queue.popleft()
+                pops += 1
+                yield node_list[node]
+                if node == goal:
+                    return self._build_path(parents, goal)
+
+                begin, end = offsets[node], offsets[node + 1]
+                relaxed += end - begin
+                for position in range(begin, end):
+                    neighbor = targets[position]
+                    if not discovered[neighbor]:
+                        discovered[neighbor] = 1
+                        parents[neighbor] = node
+                        queue.append(neighbor)
+                        pushes += 1
+                if len(queue) > peak:
+                    peak = len(queue)
+
+            return []
+        finally:
+            stats.add_work(relaxed, pushes, pops, peak, container_bytes(discovered, parents) + peak * QUEUE_ENTRY_BYTES)
+
+    def greedy_bfs_steps(self, start_node, end_node, stats=None):
+        return self._best_first_steps(start_node, end_node, cost_weight=0, heuristic_weight=1, stats=stats)
+
+    def a_star_steps(self, start_node, end_node, stats=None):
+        return self._best_first_steps(start_node, end_node, cost_weight=1, heuristic_weight=1, stats=stats)
+
+    def dijkstra_steps(self, start_node, end_node, stats=None):
+        return self._best_first_steps(start_node, end_node, cost_weight=1, heuristic_weight=0, stats=stats)
+
+    def alt_a_star_steps(self, start_node, end_node, stats=None):
+        """
+        A* with landmark (ALT) lower bounds. The landmarks are built on first use, once the first step is pulled.
+        """
+        if self.graph.landmarks is None:
+            self.graph.build_landmarks()
+        return (yield from self._best_first_steps(start_node, end_node, cost_weight=1, heuristic_weight=1,
+                                                  landmarks=True, stats=stats))
+
+    def contraction_hierarchy_steps(self, start_node, end_node, stats=None):
+        """
+        Upward bidirectional query on the graph's contraction hierarchy (built on first use).
+        Yields the nodes settled by either side and returns the unpacked path.
+        """
+        graph = self.graph
+        if graph.contraction_hierarchy is None:
+            graph.build_contraction_hierarchy()
+        start, goal = graph.id_of(start_node), graph.id_of(end_node)
+        node_list = graph.node_list
+
+        steps = graph.contraction_hierarchy.query_steps(start, goal, stats)
+        while True:
+            try:
+                node = next(steps)
+            except StopIteration as stop:
+                return graph.to_nodes(stop.value[1])
+            yield node_list[node]
+
+    def _best_first_steps(self, start_node, end_node, cost_weight, heuristic_weight, landmarks=False, stats=None):
+        """
+        Shared priority-queue search over the CSR arrays.
+        Nodes are ordered by cost_weight * g(n) + heuristic_weight * h(n).
+        """
+        graph = self.graph
+        start, goal = graph.id_of(start_node), graph.id_of(end_node)
+        offsets = graph.offsets
+        targets, weights = graph.targets, graph.weights
+        # Without a heuristic term, skip computing one (and 0 * inf estimates)
+        heuristics = self._heuristics(goal, landmarks) if heuristic_weight else [0.0] * graph.node_count
+        stats = SearchStats() if stats is None else stats
+
+        costs = {start: 0.0}
+        parents = {start: -1}
+        closed = set()
+        heap = [(heuristic_weight * heuristics[start], start)]
+        relaxed, pushes, pops, peak = 0, 1, 0, 1
+        try:
+            while heap:
+                _, node = heapq.heappop(heap)
+                pops += 1
+                if node in closed:
+                    continue
+                closed.add(node)
+                yield graph.node_list[node]
+                if node == goal:
+                    return self._build_path(parents, goal)
+
+                begin, end = offsets[node], offsets[node + 1]
+                relaxed += end - begin
+                for neighbor, weight in zip(targets[begin:end].tolist(), weights[begin:end].tolist()):
+                    if neighbor in closed:
+                        continue
+                    cost = costs[node] + weight
+                    if neighbor not in costs or cost < costs[neighbor]:
+                        costs[neighbor] = cost
+                        parents[neighbor] = node
+                        priority = cost_weight * cost + heuristic_weight * heuristics[neighbor]
+                        heapq.heappush(heap, (priority, neighbor))
+                        pushes += 1
+                if len(heap) > peak:
+                    peak = len(heap)
+
+            return []
+        finally:
+            memory = container_bytes(costs, parents, closed, heuristics) + peak * HEAP_ENTRY_BYTES
+            stats.add_work(relaxed, pushes, pops, peak, memory)
+
+    def bidirectional_dijkstra_steps(self, start_node, end_node, stats=None):
+        return self._bidirectional_steps(start_node, end_node, use_heuristic=False, stats=stats)
+
+    def bidirectional_a_star_steps(self, start_node, end_node, stats=None):
+        return self._bidirectional_steps(start_node, end_node, use_heuristic=True, stats=stats)
+
+    def _bidirectional_steps(self, start_node, end_node, use_heuristic, stats=None):
+        """
+        Bidirectional search: a forward search from the start over the outgoing edges
+        and a backward search from the goal over the reverse adjacency, always
+        advancing the side with the smaller queue key.
+
+        With use_heuristic, both sides run on the edge costs reduced by the average
+        potential p(n) = (h_goal(n) - h_start(n)) / 2 = h(n) / 2 (no estimate towards
+        the start is available, so h_start = 0). The reverse side uses -p, which keeps
+        the two potentials consistent with each other, so the plain bidirectional
+        Dijkstra stopping rule stays exact: stop once the two queue minima add up to
+        the best meeting cost found so far.
+        """
+        graph = self.graph
+        start, goal = graph.id_of(start_node), graph.id_of(end_node)
+        if start == goal:
+            yield graph.node_list[start]
+            return graph.to_nodes([start])
+
+        potential = [h / 2 for h in self._heuristics(goal)] if use_heuristic else None
+        if potential is not None and potential[start] == float('inf'):
+            # The heuristic proves the goal unreachable from the start
+            yield graph.node_list[start]
+            return []
+        adjacency = [(graph.offsets, graph.targets, graph.weights), graph.reverse_adjacency()]
+        costs = [{start: 0.0}, {goal: 0.0}]
+        parents = [{start: -1}, {goal: -1}]
+        closed = [set(), set()]
+        heaps = [[(0.0, start)], [(0.0, goal)]]
+        seen = set()
+        best, meeting = float('inf'), None
+        stats = SearchStats() if stats is None else stats
+        relaxed, pushes, pops, peak = 0, 2, 0, 2
+        try:
+            while heaps[0] and heaps[1]:
+                if heaps[0][0][0] + heaps[1][0][0] >= best:
+                    break
+
+                side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+                cost, node = heapq.heappop(heaps[side])
+                pops += 1
+                if node in closed[side]:
+                    continue
+                closed[side].add(node)
+                if node not in seen:
+                    seen.add(node)
+                    yield graph.node_list[node]
+
+                offsets, neighbors, weights = adjacency[side]
+                side_costs, other_costs = costs[side], costs[1 - side]
+                begin, end = offsets[node], offsets[node + 1]
+                relaxed += end - begin
+                for neighbor, weight in zip(neighbors[begin:end].tolist(), weights[begin:end].tolist()):
+                    if potential is not None:
+                        # Forward edge node->neighbor or reverse edge neighbor->node, reduced by p
+                        delta = potential[neighbor] - potential[node]
+                        weight += delta if side == 0 else -delta
+                    new_cost = cost + weight
+                    if new_cost < side_costs.get(neighbor, float('inf')):
+                        side_costs[neighbor] = new_cost
+                        parents[side][neighbor] = node
+                        heapq.heappush(heaps[side], (new_cost, neighbor))
+                        pushes += 1
+                        if neighbor in other_costs and new_cost + other_costs[neighbor] < best:
+                            best, meeting = new_cost + other_costs[neighbor], neighbor
+                if len(heaps[0]) + len(heaps[1]) > peak:
+                    peak = len(heaps[0]) + len(heaps[1])
+        finally:
+            memory = container_bytes(*costs, *parents, *closed, seen) + peak * HEAP_ENTRY_BYTES
+            if potential is not None:
+                memory += container_bytes(potential)
+            stats.add_work(relaxed, pushes, pops, peak, memory)
+
+        if meeting is None:
+            return []
+
+        path = self._build_path(parents[0], meeting)
+        node = parents[1][meeting]
+        while node != -1:
+            path.append(graph.node_list[node])
+            node = parents[1][node]
+        return path
+
+    def _heuristics(self, goal, landmarks=False):
+        """
+        Returns the per-node heuristic estimates (indexed by id) towards the goal id.
+
+        The heuristics stored in the graph file only estimate the distance to the file's
+        end node. For any other goal (or when asked to) the landmark bounds are used if
+        they were built, otherwise the estimate is 0, which keeps the search exact.
+        """
+        graph = self.graph
+        if not landmarks and goal == graph.id_of(graph.end_node):
+            return graph.heuristics.tolist()
+        if graph.landmarks is not None:
+            return graph.landmarks.heuristic(goal).tolist()
+        return [0.0] * graph.node_count
+
+    def _build_path(self, parents, goal):
+        """
+        Walks the parent links (a dict or an array, -1 marking the start) back
+        from the goal and returns the path as Node objects.
+        """
+        path = []
+        node = goal
+        while node != -1:
+            path.append(node)
+            node = parents[node]
+        path.reverse()
+        return self.graph.to_nodes(path)
+
+    @staticmethod
+    def _collect(steps):
+        """
+        Drains a step generator into (visit_order, found_path).
+        """
+        visit_order = []
+        try:
+            while True:
+                visit_order.append(next(steps))
+        except StopIteration as stop:
+            return visit_order, stop.value
+
+    def pending_preprocessing(self, search_type):
+        """
+        Name of the preprocessing the algorithm still has to build before its first step, or None.
+        """
+        if search_type == 'A* (Landmarks)' and self.graph.landmarks is None:
+            return "landmarks"
+        if search_type == 'Contraction Hierarchies' and self.graph.contraction_hierarchy is None:
+            return "contraction hierarchy"
+        return None
+
+    def preprocess(self, search_type):
+        """
+        Builds the preprocessing reported by pending_preprocessing, so the search starts right away.
+        """
+        pending = self.pending_preprocessing(search_type)
+        if pending == "landmarks":
+            self.graph.build_landmarks()
+        elif pending == "contraction hierarchy":
+            self.graph.build_contraction_hierarchy()
+        return pending
+
+    def search_steps(self, search_type, start_node, end_node, stats=None):
+        """
+        Returns the step generator of the given algorithm, so callers can pull
+        expansions one at a time instead of running the whole search upfront.
+        With a SearchStats, the run's work is counted into it as the steps are pulled.
+        """
+        steps = self._cached_steps(search_type, start_node, end_node, stats)
+        if stats is None:
+            return steps
+        stats.algorithm = search_type
+        return self._measured_steps(steps, stats)
+
+    def _cached_steps(self, search_type, start_node, end_node, stats=None):
+        """
+        The algorithm's step generator, or a replay of its cached result.
+        """
+        steps = self._algorithm_steps(search_type, start_node, end_node, stats)
+        if self.cache is None:
+            return steps
+
+        cached = self.cache.get(self.graph, search_type, start_node, end_node)
+        if cached is not None:
+            steps.close()
+            if stats is not None:
+                stats.cached = True
+            return self._replay_steps(*cached)
+        return self._recorded_steps(steps, search_type, start_node, end_node)
+
+    def _measured_steps(self, steps, stats):
+        """
+        Passes the expansions of `steps` through, counting them and the time spent inside the search.
+        """
+        clock = time.perf_counter
+        while True:
+            began = clock()
+            try:
+                node = next(steps)
+            except StopIteration as stop:
+                stats.wall_time += clock() - began
+                stats.finish(self.graph, stop.value)
+                return stop.value
+            stats.wall_time += clock() - began
+            stats.expanded += 1
+            yield node
+
+    @staticmethod
+    def _replay_steps(visit_order, found_path):
+        yield from visit_order
+        return found_path
+
+    def _recorded_steps(self, steps, search_type, start_node, end_node):
+        """
+        Passes the expansions of `steps` through and caches the result once the search completes.
+        Searches longer than the cache's max_visit_order are not cached, so recording stops there.
+        """
+        visit_order, limit = [], self.cache.max_visit_order
+        while True:
+            try:
+                node = next(steps)
+            except StopIteration as stop:
+                if visit_order is not None:
+                    self.cache.put(self.graph, search_type, start_node, end_node, visit_order, stop.value)
+                return stop.value
+            if visit_order is not None:
+                visit_order.append(node)
+                if len(visit_order) > limit:
+                    visit_order = None
+            yield node
+
+    def _algorithm_steps(self, search_type, start_node, end_node, stats=None):
         match search_type:
             case "Profundidade Primeiro":
-                self.visit_order, self.found_path = self.dfs(start_node, end_node)
-                return self.visit_order, self.found_path
+                return self.dfs_steps(start_node, end_node, stats)
             case "Largura Primeiro":
-                self.visit_order, self.found_path = self.bfs(start_node, end_node)
-                return self.visit_order, self.found_path
+                return self.bfs_steps(start_node, end_node, stats)
             case "Greedy BFS":
-                self.visit_order, self.found_path = self.greedy_bfs(start_node, end_node)
-                return self.visit_order, self.found_path
+                return self.greedy_bfs_steps(start_node, end_node, stats)
             case "A*":
-                self.visit_order, self.found_path = self.a_star(start_node, end_node)
-                return self.visit_order, self.found_path
+                return self.a_star_steps(start_node, end_node, stats)
             case "Dijkstra":
-                self.visit_order, self.found_path = self.dijkstra(start_node, end_node)
-                return self.visit_order, self.found_path
\ No newline at end of file
+                return self.dijkstra_steps(start_node, end_node, stats)
+            case "Dijkstra Bidirecional":
+                return self.bidirectional_dijkstra_steps(start_node, end_node, stats)
+            case "A* Bidirecional":
+                return self.bidirectional_a_star_steps(start_node, end_node, stats)
+            case "A* (Landmarks)":
+                return self.alt_a_star_steps(start_node, end_node, stats)
+            case "Contraction Hierarchies":
+                return self.contraction_hierarchy_steps(start_node, end_node, stats)
+            case _:
+                raise ValueError(f"Unknown search algorithm: {search_type}")
+
+    def perform_search(self, search_type, start_node, end_node):
+        """
+        Runs the whole search and returns (visit_order, found_path); its SearchStats are left in self.stats.
+        """
+        stats = self.stats = SearchStats(search_type)
+        began = time.perf_counter()
+        self.visit_order, self.found_path = self._collect(self._cached_steps(search_type, start_node, end_node, stats))
+        stats.wall_time = time.perf_counter() - began
+        stats.expanded = len(self.visit_order)
+        stats.finish(self.graph, self.found_path)
+        return self.visit_order, self.found_path
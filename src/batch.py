@@ -0,0 +1,178 @@
+"""
+Headless batch routing.
+
+Reads (start, end, algorithm) queries from a file or stdin, answers them on a
+process pool that loads the graph once per worker, and writes one JSON object
+per query to stdout (or to --output). pygame is never initialized.
+
+Each input line is either a JSON object ``{"start": ..., "end": ..., "algorithm": ...}``,
+a JSON array ``[start, end, algorithm]`` or three tab-separated fields.
+Missing fields fall back to the graph's start/end nodes and to --algorithm.
+A malformed line gets an error record with its line number and the batch goes on.
+
+With --stats, every result also carries the search statistics of the run (nodes
+expanded, edges relaxed, heap operations, peak frontier, memory, wall time).
+
+With --cache, every worker starts from the results stored in that file and keeps an
+LRU of its own; new results are sent back to the parent, which writes the merged
+cache at the end of the run.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from algorithms import Algorithms
+from graph import Graph
+from search_cache import SearchCache
+
+_algorithms = None  # Per-process search engine, set by _init_worker
+_export_cache_entries = False
+_export_stats = False
+
+
+def _init_worker(graph_path, cache_path=None, cache_size=1024, stats=False):
+    """
+    Loads the graph (and the search cache, if any) once in the current process.
+    The loader's progress messages go to stderr so stdout stays pure JSON.
+    """
+    global _algorithms, _export_cache_entries, _export_stats
+    with redirect_stdout(sys.stderr):
+        cache = SearchCache(cache_size)
+        if cache_path:
+            cache.load(cache_path)
+        _algorithms = Algorithms(Graph(graph_path), cache)
+    _export_cache_entries = bool(cache_path)
+    _export_stats = stats
+
+
+def _parse_query(line, default_algorithm, line_number=None):
+    """
+    (start, end, algorithm) of a query line, None for blank and comment lines, or an error
+    record for a malformed line, which _run_query passes through so the batch goes on.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line[0] in '{[':
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            return {"line": line_number, "error": f"Malformed query: {e}"}
+    else:
+        data = line.split('\t')
+
+    if isinstance(data, dict):
+        start, end, algorithm = data.get("start"), data.get("end"), data.get("algorithm")
+    else:
+        start, end, algorithm = (list(data) + [None] * 3)[:3]
+    return start, end, algorithm or default_algorithm
+
+
+def _run_query(query):
+    if isinstance(query, dict):
+        return query  # Error record of a malformed line
+    start, end, algorithm = query
+    graph = _algorithms.graph
+    start = graph.start_node.name if start is None else str(start)
+    end = graph.end_node.name if end is None else str(end)
+    result = {"start": start, "end": end, "algorithm": algorithm}
+
+    if algorithm not in _algorithms.designations:
+        result["error"] = f"Unknown algorithm '{algorithm}'"
+        return result
+    for name in (start, end):
+        if name not in graph.node_ids:
+            result["error"] = f"Unknown node '{name}'"
+            return result
+
+    hits = _algorithms.cache.hits
+    visit_order, found_path = _algorithms.perform_search(algorithm, graph.nodes[start], graph.nodes[end])
+    result["found"] = bool(found_path)
+    result["path"] = [node.name for node in found_path]
+    result["cost"] = graph.path_cost(found_path) if found_path else None
+    result["expanded"] = len(visit_order)
+    result["cached"] = _algorithms.cache.hits > hits
+    if _export_stats:
+        result["stats"] = _algorithms.stats.as_dict()
+    if _export_cache_entries and not result["cached"] and len(visit_order) <= _algorithms.cache.max_visit_order:
+        # Handed to the parent process, which owns the cache file
+        key = SearchCache.make_key(graph, algorithm, start, end)
+        result["_cache_entry"] = [key, [node.name for node in visit_order], result["path"]]
+    return result
+
+
+def _write_result(result, output, cache):
+    entry = result.pop("_cache_entry", None)
+    if entry is not None:
+        cache.put_entry(*entry)
+    output.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def run_batch(graph_path, queries, output, workers=None, default_algorithm="Dijkstra", chunk_size=256,
+              cache_path=None, cache_size=1024, stats=False):
+    """
+    Answers every query line from the `queries` iterable and writes JSON lines to `output`.
+    Results are written in input order, with their SearchStats when `stats` is set.
+    Returns the number of queries answered.
+    """
+    parsed = (q for q in (_parse_query(line, default_algorithm, number) for number, line in enumerate(queries, 1))
+              if q is not None)
+    workers = workers or os.cpu_count() or 1
+    cache = SearchCache(cache_size)
+    if cache_path:
+        cache.load(cache_path)
+    answered = 0
+
+    if workers == 1:
+        _init_worker(graph_path, cache_path, cache_size, stats)
+        for query in parsed:
+            _write_result(_run_query(query), output, cache)
+            answered += 1
+    else:
+        initargs = (graph_path, cache_path, cache_size, stats)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            # Submit in bounded blocks so an endless stdin stream never piles up in memory
+            while block := list(itertools.islice(parsed, chunk_size * workers)):
+                for result in executor.map(_run_query, block, chunksize=chunk_size):
+                    _write_result(result, output, cache)
+                answered += len(block)
+
+    if cache_path:
+        cache.save(cache_path)
+    return answered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pymapz-batch", description="Run pyMapz searches without the GUI.")
+    parser.add_argument("graph", help="Graph file to load")
+    parser.add_argument("queries", nargs="?", default="-", help="Query file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output JSON lines file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-a", "--algorithm", default="Dijkstra", help="Algorithm for queries that do not name one")
+    parser.add_argument("--cache", default=None, help="Search cache file to reuse and update")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Maximum cached results per process")
+    parser.add_argument("--stats", action="store_true", help="Include the search statistics of every query")
+    args = parser.parse_args(argv)
+
+    queries = sys.stdin if args.queries == "-" else open(args.queries, 'r', encoding='utf-8')
+    output = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    try:
+        answered = run_batch(args.graph, queries, output, workers=args.workers, default_algorithm=args.algorithm,
+                             cache_path=args.cache, cache_size=args.cache_size, stats=args.stats)
+    finally:
+        if queries is not sys.stdin:
+            queries.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"[BATCH] Answered {answered} queries.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,427 @@
+"""
+Benchmark suite for pyMapz at scale.
+
+Builds seeded synthetic graphs (see graph_generators.py) for every kind and size, cached under
+--data-dir in both file formats, and measures each one in a fresh process, so that memory
+figures do not carry over from one graph to the next:
+
+* generating the graph and writing it as text and as binary;
+* loading it with Graph from each format, with the resident memory the load adds;
+* every perform_search designation on the same seeded queries, with their SearchStats, after
+  building the landmarks and the contraction hierarchy (skipped above --max-landmark-nodes
+  and --max-ch-nodes, since their preprocessing grows much faster than the graph);
+* headless MapRenderer frames with SDL's dummy driver: the first frame (building the spatial
+  indexes), a full frame of the whole graph, a zoomed-in frame and an incremental frame that
+  recolors newly visited nodes. Needs pygame and the map shapefile; skipped above --max-render-nodes.
+
+The results are written as JSON. --compare OLD.json prints every timing next to an earlier run
+and exits with status 1 when one got slower by more than --threshold.
+
+    python benchmark.py --kinds grid,road --sizes 1e3,1e4,1e5 --output bench.json
+    python benchmark.py --sizes 1e3,1e4 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_VERSION = 1
+WINDOW_SIZE = (800, 800)
+
+
+def _rss_bytes():
+    """Current resident memory of this process, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Bytes on macOS, KiB elsewhere
+
+
+def dataset_paths(data_dir, kind, nodes, seed):
+    from graph_generators import GENERATOR_VERSION
+
+    stem = os.path.join(data_dir, f"{kind}-{nodes}-s{seed}-v{GENERATOR_VERSION}")
+    return {"text": stem + ".txt", "binary": stem + ".pmz", "coordinates": stem + ".xy.npy"}
+
+
+def generate_dataset(kind, nodes, seed, data_dir):
+    """
+    Writes the graph in both formats, plus its layout coordinates. Returns the timings.
+    """
+    import numpy as np
+    from graph_generators import generate, write_graph
+
+    paths = dataset_paths(data_dir, kind, nodes, seed)
+    started = time.perf_counter()
+    data, coordinates = generate(kind, nodes, seed)
+    result = {"generate_seconds": time.perf_counter() - started, "edges": len(data.targets)}
+    for graph_format in ("binary", "text"):
+        started = time.perf_counter()
+        write_graph(data, paths[graph_format])
+        result[f"write_{graph_format}_seconds"] = time.perf_counter() - started
+        result[f"{graph_format}_file_bytes"] = os.path.getsize(paths[graph_format])
+    np.save(paths["coordinates"], coordinates)
+    result["peak_rss_bytes"] = _peak_rss_bytes()
+    return result
+
+
+def bench_load(path):
+    """
+    Times loading the graph with Graph. Returns (graph, result dict).
+    """
+    from graph import Graph
+
+    rss = _rss_bytes()
+    started = time.perf_counter()
+    with redirect_stdout(sys.stderr):
+        graph = Graph(path)
+    result = {"seconds": time.perf_counter() - started}
+    if rss is not None:
+        result["rss_added_bytes"] = _rss_bytes() - rss
+    result["csr_bytes"] = int(graph.offsets.nbytes + graph.targets.nbytes + graph.weights.nbytes + graph.heuristics.nbytes)
+    return graph, result
+
+
+def bench_searches(graph, queries, seed, budget, max_landmark_nodes, max_ch_nodes, designations=None):
+    """
+    Runs every designation on the file's start/end pair followed by seeded random pairs,
+    stopping a designation early once it has used `budget` seconds.
+    """
+    from algorithms import Algorithms
+
+    algorithms = Algorithms(graph)
+    designations = designations or algorithms.designations
+    rng = random.Random(seed)
+    node_list = graph.node_list
+    pairs = [(graph.start_node, graph.end_node)]
+    pairs += [(node_list[rng.randrange(graph.node_count)], node_list[rng.randrange(graph.node_count)])
+              for _ in range(queries - 1)]
+
+    results, skipped = {}, {}
+    with redirect_stdout(sys.stderr):
+        if "A* (Landmarks)" in designations:
+            if graph.node_count <= max_landmark_nodes:
+                started = time.perf_counter()
+                graph.build_landmarks()
+                results["landmarks_preprocessing_seconds"] = time.perf_counter() - started
+            else:
+                skipped["A* (Landmarks)"] = f"more than {max_landmark_nodes} nodes"
+        if "Contraction Hierarchies" in designations:
+            if graph.node_count <= max_ch_nodes:
+                started = time.perf_counter()
+                graph.build_contraction_hierarchy()
+                results["ch_preprocessing_seconds"] = time.perf_counter() - started
+            else:
+                skipped["Contraction Hierarchies"] = f"more than {max_ch_nodes} nodes"
+
+    for designation in designations:
+        if designation in skipped:
+            results[designation] = {"skipped": skipped[designation]}
+            continue
+        runs = []
+        deadline = time.perf_counter() + budget
+        for start, end in pairs:
+            algorithms.perform_search(designation, start, end)
+            runs.append(algorithms.stats)
+            if time.perf_counter() > deadline:
+                break
+        times = [stats.wall_time * 1000 for stats in runs]
+        results[designation] = {
+            "queries": len(runs),
+            "found": sum(stats.found for stats in runs),
+            "median_ms": statistics.median(times),
+            "mean_ms": statistics.fmean(times),
+            "max_ms": max(times),
+            "expanded_mean": statistics.fmean(stats.expanded for stats in runs),
+            "relaxed_mean": statistics.fmean(stats.relaxed for stats in runs),
+            "heap_ops_mean": statistics.fmean(stats.heap_pushes + stats.heap_pops for stats in runs),
+            "peak_frontier_max": max(stats.peak_frontier for stats in runs),
+            "memory_bytes_max": max(stats.memory_bytes for stats in runs),
+        }
+    return results
+
+
+def _median_ms(draw, frames):
+    times = []
+    for _ in range(frames):
+        started = time.perf_counter()
+        draw()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def bench_render(graph, coordinates, frames, shapefile_path):
+    """
+    Draws the graph offscreen with MapRenderer, laid out from its generator coordinates.
+    """
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    # map_renderer imports through the "src." package, so the repository root must be importable too
+    root = os.path.dirname(SRC_DIR)
+    if root not in sys.path:
+        sys.path.append(root)
+    import numpy as np
+    import pygame
+    from node import Node
+    from search_visualizer import SearchVisualizer
+    from utils.map_renderer import MapRenderer
+
+    with redirect_stdout(sys.stderr):
+        pygame.init()
+        surface = pygame.Surface(WINDOW_SIZE)
+        started = time.perf_counter()
+        renderer = MapRenderer(shapefile_path=shapefile_path, window_size=WINDOW_SIZE, margin=100)
+        result = {"renderer_init_seconds": time.perf_counter() - started}
+
+    renderer.viewport = pygame.Rect(0, 50, WINDOW_SIZE[0], WINDOW_SIZE[1] - 90)
+    # Generated node names are "N<row of the coordinates>"
+    rows = np.array([int(node.name[1:]) for node in graph.node_list])
+    positions = renderer.layout_positions(graph, coordinates[rows])
+    nodes = {node: Node(node.name, pos, node.heuristic) for node, pos in positions.items()}
+    visualizer = SearchVisualizer(graph)
+
+    def full_frame():
+        surface.fill((255, 255, 255))
+        renderer.draw_static(surface, graph, nodes)
+        renderer.update_nodes(graph, nodes, renderer.visible_nodes, visualizer, [], False)
+        renderer.draw_dynamic(surface, nodes)
+
+    result["first_frame_ms"] = _median_ms(full_frame, 1)
+    result["full_frame_ms"] = _median_ms(full_frame, frames)
+    result["visible_nodes_full"] = len(renderer.visible_nodes)
+
+    # Recolor the next 50 nodes as visited and recomposite only their areas, like GUIManager.draw
+    order = iter(graph.node_list)
+
+    def incremental_frame():
+        changed = [node for node, _ in zip(order, range(50))]
+        for node in changed:
+            visualizer.add_visited_node(node)
+        for rect in renderer.update_nodes(graph, nodes, changed, visualizer, [], False):
+            surface.set_clip(rect)
+            renderer.draw_dynamic(surface, nodes, area=rect)
+        surface.set_clip(None)
+
+    result["incremental_frame_ms"] = _median_ms(incremental_frame, frames)
+
+    renderer.zoom_at(renderer.viewport.center, 16)
+    renderer.invalidate()
+    result["zoomed_first_frame_ms"] = _median_ms(full_frame, 1)
+    result["zoomed_frame_ms"] = _median_ms(full_frame, frames)
+    result["visible_nodes_zoomed"] = len(renderer.visible_nodes)
+    return result
+
+
+def measure_case(kind, nodes, seed, options):
+    """
+    Loads one generated graph and runs the load, search and render benchmarks on it.
+    """
+    import numpy as np
+
+    paths = dataset_paths(options["data_dir"], kind, nodes, seed)
+    case = {"load": {}}
+    graph = None
+    for graph_format in ("text", "binary"):
+        if graph_format in options["formats"]:
+            graph, case["load"][graph_format] = bench_load(paths[graph_format])
+    if graph is None:
+        graph, _ = bench_load(paths["binary"])
+    case["edges"] = graph.edge_count
+
+    case["search"] = bench_searches(graph, options["queries"], seed, options["budget"],
+                                    options["max_landmark_nodes"], options["max_ch_nodes"], options["algorithms"])
+
+    if options["render_frames"] <= 0:
+        pass
+    elif nodes > options["max_render_nodes"]:
+        case["render"] = {"skipped": f"more than {options['max_render_nodes']} nodes"}
+    elif not os.path.exists(options["shapefile"]):
+        case["render"] = {"skipped": f"map shapefile '{options['shapefile']}' not found"}
+    else:
+        try:
+            case["render"] = bench_render(graph, np.load(paths["coordinates"]), options["render_frames"], options["shapefile"])
+        except ImportError as e:
+            case["render"] = {"skipped": str(e)}
+
+    case["peak_rss_bytes"] = _peak_rss_bytes()
+    return case
+
+
+def _run_in_subprocess(phase, kind, nodes, seed, options):
+    """
+    Runs generate_dataset or measure_case in a fresh interpreter and returns its result.
+    """
+    spec = json.dumps({"phase": phase, "kind": kind, "nodes": nodes, "seed": seed, "options": options})
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", spec], cwd=SRC_DIR,
+                            stdout=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{phase} failed for {kind} with {nodes} nodes (exit status {result.returncode})")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_suite(kinds, sizes, seed=0, options=None, log=sys.stderr):
+    """
+    Benchmarks every kind and size. Returns the results document.
+    """
+    options = dict(options or {})
+    os.makedirs(options["data_dir"], exist_ok=True)
+    cases = []
+    for kind in kinds:
+        for nodes in sizes:
+            paths = dataset_paths(options["data_dir"], kind, nodes, seed)
+            case = {"kind": kind, "nodes": nodes, "seed": seed}
+            if not all(os.path.exists(path) for path in paths.values()):
+                print(f"[BENCH] Generating {kind} graph with {nodes} nodes...", file=log)
+                case["generate"] = _run_in_subprocess("generate", kind, nodes, seed, options)
+            print(f"[BENCH] Measuring {kind} graph with {nodes} nodes...", file=log)
+            case.update(_run_in_subprocess("measure", kind, nodes, seed, options))
+            cases.append(case)
+
+    return {
+        "benchmark_version": BENCHMARK_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": {key: value for key, value in options.items() if key != "data_dir"},
+        "cases": cases,
+    }
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _timings(value, prefix=""):
+    """Flattens every *seconds and *_ms entry of a case into {"path": value}."""
+    found = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            found.update(_timings(item, f"{prefix}{key}/" if isinstance(item, dict) else f"{prefix}{key}"))
+    elif isinstance(value, (int, float)) and prefix.endswith(("seconds", "_ms")):
+        found[prefix] = value
+    return found
+
+
+def compare(old, new, threshold=0.2, out=sys.stdout):
+    """
+    Prints the timings of `new` against `old` for the cases both contain.
+    Returns the number of timings that got slower by more than `threshold` (0.2 = 20%).
+    """
+    old_cases = {(case["kind"], case["nodes"], case["seed"]): case for case in old["cases"]}
+    regressions = 0
+    print(f"[BENCH] Comparing with {old.get('commit') or 'an earlier run'} from {old.get('created', '?')}", file=out)
+    for case in new["cases"]:
+        previous = old_cases.get((case["kind"], case["nodes"], case["seed"]))
+        if previous is None:
+            continue
+        old_timings, new_timings = _timings(previous), _timings(case)
+        for path in sorted(old_timings.keys() & new_timings.keys()):
+            if path.startswith("generate/"):
+                continue  # Only measured when the dataset was missing
+            before, after = old_timings[path], new_timings[path]
+            ratio = after / before if before else float('inf')
+            slower = ratio > 1 + threshold
+            regressions += slower
+            print(f"    {case['kind']:<10} {case['nodes']:>9} {path:<52} {before:10.3f} {after:10.3f} {ratio:6.2f}x"
+                  f"{'  SLOWER' if slower else ''}", file=out)
+    return regressions
+
+
+def parse_sizes(text):
+    """'1e3,1e4,25000' -> [1000, 10000, 25000]"""
+    return [int(float(size)) for size in text.split(",") if size.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pymapz-bench", description="Benchmark pyMapz on synthetic graphs.")
+    parser.add_argument("--kinds", default="grid,geometric,road", help="Graph kinds (default: grid,geometric,road)")
+    parser.add_argument("--sizes", default="1e3,1e4,1e5", help="Node counts, up to 1e7 (default: 1e3,1e4,1e5)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator and query seed (default: 0)")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.expanduser("~"), ".cache", "pymapz", "bench"),
+                        help="Where generated graphs are kept (default: ~/.cache/pymapz/bench)")
+    parser.add_argument("--formats", default="text,binary", help="Graph formats to time loading (default: text,binary)")
+    parser.add_argument("-a", "--algorithm", action="append", default=None, help="Designation to run (default: all)")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per designation (default: 20)")
+    parser.add_argument("--budget", type=float, default=10.0, help="Seconds per designation before stopping early (default: 10)")
+    parser.add_argument("--max-landmark-nodes", type=int, default=200_000, help="Largest graph to build landmarks for")
+    parser.add_argument("--max-ch-nodes", type=int, default=20_000, help="Largest graph to build a contraction hierarchy for")
+    parser.add_argument("--render-frames", type=int, default=5, help="Frames per render measurement, 0 to skip (default: 5)")
+    parser.add_argument("--max-render-nodes", type=int, default=50_000, help="Largest graph to render")
+    parser.add_argument("--shapefile", default="./utils/maps/PRT_ADM1.shp", help="Map drawn under the graph")
+    parser.add_argument("-o", "--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", default=None, metavar="OLD_JSON", help="Compare the timings with an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown reported as a regression (default: 0.2)")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)  # Internal: one phase in a fresh process
+    args = parser.parse_args(argv)
+
+    os.chdir(SRC_DIR)
+    if args.case:
+        spec = json.loads(args.case)
+        if spec["phase"] == "generate":
+            result = generate_dataset(spec["kind"], spec["nodes"], spec["seed"], spec["options"]["data_dir"])
+        else:
+            result = measure_case(spec["kind"], spec["nodes"], spec["seed"], spec["options"])
+        print(json.dumps(result))
+        return 0
+
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+    from graph_generators import GENERATORS
+    unknown = [kind for kind in kinds if kind not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown graph kind(s): {', '.join(unknown)}")
+
+    options = {
+        "data_dir": os.path.abspath(os.path.expanduser(args.data_dir)),
+        "formats": [graph_format.strip() for graph_format in args.formats.split(",") if graph_format.strip()],
+        "algorithms": args.algorithm,
+        "queries": max(1, args.queries),
+        "budget": args.budget,
+        "max_landmark_nodes": args.max_landmark_nodes,
+        "max_ch_nodes": args.max_ch_nodes,
+        "render_frames": args.render_frames,
+        "max_render_nodes": args.max_render_nodes,
+        "shapefile": os.path.abspath(args.shapefile),
+    }
+    results = run_suite(kinds, parse_sizes(args.sizes), args.seed, options)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"[BENCH] Wrote {args.output}", file=sys.stderr)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            regressions = compare(json.load(file), results, args.threshold, out=sys.stderr)
+        if regressions:
+            print(f"[BENCH] {regressions} timing(s) slower than the threshold", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
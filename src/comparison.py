@@ -0,0 +1,196 @@
+"""
+Side-by-side comparison of every search algorithm on one query.
+
+Every designation runs as its own task on a pool of batch workers (batch._init_worker loads the
+graph once per process), so with enough cores a comparison takes about as long as the slowest
+algorithm rather than the sum of all of them. The workers keep no search cache, so the timings
+are always of a real search, and preprocessing (landmarks, contraction hierarchy) is built and
+timed apart from the search it serves; it stays in the worker for the next comparison.
+
+Each result has the batch fields (found, path, cost, expanded, stats), the preprocessing time
+and the ids of the visited nodes, which the GUI draws as small multiples.
+
+    python comparison.py graphs/graph.txt --start AVEIRO --end FARO
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import batch
+
+COMPARE_ALL = "Compare all"  # Algorithm dropdown entry that runs the comparison
+
+
+def _compare_query(query):
+    """
+    Runs one designation in a batch worker, timing its preprocessing apart from the search.
+    """
+    algorithms = batch._algorithms
+    algorithm = query[2]
+    started = time.perf_counter()
+    with redirect_stdout(sys.stderr):
+        preprocessing = algorithms.preprocess(algorithm) if algorithm in algorithms.designations else None
+    preprocess_seconds = time.perf_counter() - started
+
+    result = batch._run_query(query)
+    result["preprocessing"] = preprocessing
+    result["preprocess_seconds"] = preprocess_seconds if preprocessing else 0.0
+    if "error" not in result:
+        node_ids = algorithms.graph.node_ids
+        result["visited"] = np.array([node_ids[node.name] for node in algorithms.visit_order], dtype=np.int32)
+    return result
+
+
+class Comparison:
+    """
+    Runs every designation on one query in a pool of worker processes and collects the results as they finish.
+
+    The pool is started on the first comparison and kept for the next ones on the same graph file;
+    cancel() terminates it, which also stops searches that are still running.
+    """
+    HEADERS = ("Algorithm", "Expanded", "Cost", "Path", "Search ms", "Prep s")  # Columns of rows()
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.designations = []
+        self.query = None  # (start name, end name)
+        self.results = {}  # Designation -> result dict, in completion order
+        self.started = None
+        self.elapsed = 0.0  # Seconds from submit until the last result arrived
+        self._pool = None
+        self._pool_key = None  # (graph path, modification time) the pool workers loaded
+        self._pending = {}
+
+    @property
+    def running(self):
+        return bool(self._pending)
+
+    def submit(self, graph_path, designations, start, end):
+        """Starts running every designation from node `start` to node `end` (names)."""
+        graph_path = os.path.abspath(graph_path)
+        key = (graph_path, os.path.getmtime(graph_path))
+        self.cancel()
+        if self._pool is None or self._pool_key != key:
+            self.close()
+            workers = self.workers or min(len(designations), os.cpu_count() or 1)
+            # Spawned, not forked: the GUI process has pygame state and a search thread that children must not inherit
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(workers, initializer=batch._init_worker, initargs=(graph_path, None, 0, True))
+            self._pool_key = key
+
+        self.designations = list(designations)
+        self.query = (start, end)
+        self.results = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._pending = {designation: self._pool.apply_async(_compare_query, ((start, end, designation),))
+                         for designation in self.designations}
+
+    def poll(self):
+        """Collects the runs that finished since the last poll. Returns their designations."""
+        finished = [designation for designation, pending in self._pending.items() if pending.ready()]
+        for designation in finished:
+            try:
+                self.results[designation] = self._pending.pop(designation).get()
+            except Exception as e:
+                self.results[designation] = {"algorithm": designation, "error": f"{type(e).__name__}: {e}"}
+        if finished:
+            self.elapsed = time.perf_counter() - self.started
+        return finished
+
+    def wait(self, poll_interval=0.05):
+        """Blocks until every run has finished."""
+        while self.running:
+            self.poll()
+            if self.running:
+                time.sleep(poll_interval)
+
+    def cancel(self):
+        """Stops a comparison in progress by terminating the pool; the next one starts a new pool."""
+        if self._pending:
+            self._pending = {}
+            self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+        self._pool = None
+        self._pool_key = None
+
+    def rows(self):
+        """
+        (algorithm, expanded, cost, path length, search ms, preprocessing s) table cells as strings,
+        in designation order; runs still going show "...".
+        """
+        rows = []
+        for designation in self.designations:
+            result = self.results.get(designation)
+            if result is None:
+                rows.append((designation, "...", "", "", "", ""))
+            elif "error" in result:
+                rows.append((designation, "error", "", "", "", ""))
+            else:
+                cost = "-" if result["cost"] is None else f"{result['cost']:g}"
+                preprocessing = f"{result['preprocess_seconds']:.2f}" if result["preprocessing"] else "-"
+                rows.append((designation, str(result["expanded"]), cost, str(len(result["path"])),
+                             f"{result['stats']['wall_time'] * 1000:.2f}", preprocessing))
+        return rows
+
+    def summary(self):
+        """Wall time of the whole comparison next to the sum of the search times."""
+        total = sum(result["stats"]["wall_time"] + result["preprocess_seconds"]
+                    for result in self.results.values() if "error" not in result)
+        state = "running" if self.running else "done"
+        elapsed = time.perf_counter() - self.started if self.running else self.elapsed
+        return f"{len(self.results)}/{len(self.designations)} {state} in {elapsed:.2f} s (runs add up to {total:.2f} s)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pymapz-compare", description="Run every pyMapz algorithm on one query in parallel.")
+    parser.add_argument("graph", help="Graph file to load")
+    parser.add_argument("--start", default=None, help="Start node (default: the graph's start node)")
+    parser.add_argument("--end", default=None, help="End node (default: the graph's end node)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: one per algorithm, up to the CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    from algorithms import Algorithms
+    from graph import Graph
+
+    with redirect_stdout(sys.stderr):
+        graph = Graph(args.graph)
+    start = args.start or graph.start_node.name
+    end = args.end or graph.end_node.name
+    for name in (start, end):
+        if name not in graph.node_ids:
+            parser.error(f"unknown node '{name}'")
+
+    comparison = Comparison(args.workers)
+    try:
+        comparison.submit(args.graph, Algorithms(graph).designations, start, end)
+        comparison.wait()
+    finally:
+        comparison.close()
+
+    if args.json:
+        results = [{key: value for key, value in comparison.results[designation].items() if key != "visited"}
+                   for designation in comparison.designations]
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        table = [Comparison.HEADERS] + comparison.rows()
+        widths = [max(len(row[i]) for row in table) for i in range(len(Comparison.HEADERS))]
+        for row in table:
+            print("  ".join(cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths))))
+    print(f"[INFO] {start} -> {end}: {comparison.summary()}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+"""
+Contraction hierarchies (CH) for repeated point-to-point queries on a Graph.
+
+Preprocessing contracts the nodes one at a time, in order of importance, adding a
+shortcut u->x (through v) whenever removing v would lose the only shortest u->v->x
+path. A query is then a bidirectional Dijkstra that only ever goes *up* the order,
+which settles a tiny fraction of the graph. Shortcuts remember the node they skip,
+so found paths are unpacked back into original edges.
+
+Run ``python contraction.py GRAPH`` to build a hierarchy and report preprocessing
+time, memory and query speedup against plain Dijkstra.
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+import numpy as np
+
+from search_stats import HEAP_ENTRY_BYTES, SearchStats, container_bytes
+
+
+def _pack(edge_lists):
+    """
+    Packs per-node lists of (neighbor, weight, middle) into CSR arrays.
+    """
+    offsets = np.zeros(len(edge_lists) + 1, dtype=np.int64)
+    np.cumsum([len(edges) for edges in edge_lists], out=offsets[1:])
+    flat = [edge for edges in edge_lists for edge in edges]
+    neighbors = np.array([edge[0] for edge in flat], dtype=np.int32)
+    weights = np.array([edge[1] for edge in flat], dtype=np.float64)
+    middles = np.array([edge[2] for edge in flat], dtype=np.int32)
+    return offsets, neighbors, weights, middles
+
+
+class ContractionHierarchy:
+    """
+    Result of the preprocessing: the contraction rank of every node plus two CSR
+    edge sets, both indexed by the lower-ranked endpoint:
+
+    - up_*:   edges v->x with rank[x] > rank[v], used by the forward search;
+    - down_*: edges u->v with rank[u] > rank[v], stored at v as (u, weight), used by
+              the backward search.
+
+    ``*_middles`` hold the contracted node a shortcut skips, or -1 for original edges.
+    Queries run on Python list copies of the edge arrays and unpack shortcuts through
+    a (u, v) -> middle dict, both made once here.
+    """
+
+    def __init__(self, rank, up, down, fingerprint=None, build_seconds=None):
+        self.rank = rank
+        self.up_offsets, self.up_targets, self.up_weights, self.up_middles = up
+        self.down_offsets, self.down_sources, self.down_weights, self.down_middles = down
+        self.fingerprint = fingerprint
+        self.build_seconds = build_seconds
+        self._sides = [(self.up_offsets.tolist(), self.up_targets.tolist(), self.up_weights.tolist()),
+                       (self.down_offsets.tolist(), self.down_sources.tolist(), self.down_weights.tolist())]
+
+        # Every hierarchy edge u->v is stored once, up at u or down at v, so (u, v) is a unique key
+        nodes = np.arange(len(rank))
+        up_sources = np.repeat(nodes, np.diff(self.up_offsets))
+        down_targets = np.repeat(nodes, np.diff(self.down_offsets))
+        up_shortcuts, down_shortcuts = self.up_middles >= 0, self.down_middles >= 0
+        self._middles = dict(zip(zip(up_sources[up_shortcuts].tolist(), self.up_targets[up_shortcuts].tolist()),
+                                 self.up_middles[up_shortcuts].tolist()))
+        self._middles.update(zip(zip(self.down_sources[down_shortcuts].tolist(), down_targets[down_shortcuts].tolist()),
+                                 self.down_middles[down_shortcuts].tolist()))
+
+    @property
+    def shortcut_count(self):
+        return int(np.count_nonzero(self.up_middles >= 0) + np.count_nonzero(self.down_middles >= 0))
+
+    @property
+    def nbytes(self):
+        arrays = (self.rank, self.up_offsets, self.up_targets, self.up_weights, self.up_middles,
+                  self.down_offsets, self.down_sources, self.down_weights, self.down_middles)
+        return sum(array.nbytes for array in arrays) + container_bytes(*self._sides[0], *self._sides[1], self._middles)
+
+    @classmethod
+    def build(cls, graph, witness_settle_limit=64, priority_settle_limit=16):
+        """
+        Contracts every node of `graph`, ordered by edge difference (shortcuts added
+        minus edges removed) plus the number of already contracted neighbors. Only the
+        neighbors of a contracted node change priority, so only they are re-estimated,
+        once each when they come up. Witness searches settle at most `witness_settle_limit`
+        nodes when contracting and `priority_settle_limit` when estimating priorities, which
+        may add a few unnecessary shortcuts but never breaks correctness.
+        """
+        started = time.perf_counter()
+        n = graph.node_count
+        inf = float('inf')
+        heappush, heappop = heapq.heappush, heapq.heappop
+        out_edges = [dict() for _ in range(n)]  # Remaining graph: v -> {x: (weight, middle)}
+        in_edges = [dict() for _ in range(n)]   # Remaining graph: v -> {u: (weight, middle)}
+        for u, targets, weights in zip(range(n), np.split(graph.targets, graph.offsets[1:-1]),
+                                       np.split(graph.weights, graph.offsets[1:-1])):
+            for v, weight in zip(targets.tolist(), weights.tolist()):
+                if u != v and weight < out_edges[u].get(v, (inf,))[0]:
+                    out_edges[u][v] = in_edges[v][u] = (weight, -1)
+
+        def witness_distances(source, excluded, limit, goals, settle_limit):
+            distances = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            remaining = set(goals)
+            while heap and remaining and settled < settle_limit:
+                distance, node = heappop(heap)
+                if distance > distances[node]:
+                    continue
+                if distance > limit:
+                    break
+                settled += 1
+                remaining.discard(node)
+                for neighbor, (weight, _) in out_edges[node].items():
+                    new_distance = distance + weight
+                    if new_distance <= limit and neighbor != excluded and new_distance < distances.get(neighbor, inf):
+                        distances[neighbor] = new_distance
+                        heappush(heap, (new_distance, neighbor))
+            return distances
+
+        def shortcuts_for(v, settle_limit):
+            shortcuts = []
+            outgoing = out_edges[v]
+            if not outgoing:
+                return shortcuts
+            max_out = max(weight for weight, _ in outgoing.values())
+            for u, (weight_in, _) in in_edges[v].items():
+                distances = witness_distances(u, v, weight_in + max_out, outgoing, settle_limit)
+                for x, (weight_out, _) in outgoing.items():
+                    if x != u and weight_in + weight_out < distances.get(x, inf):
+                        shortcuts.append((u, x, weight_in + weight_out))
+            return shortcuts
+
+        contracted_neighbors = [0] * n
+
+        def priority(v):
+            shortcuts = shortcuts_for(v, priority_settle_limit)
+            return len(shortcuts) - len(in_edges[v]) - len(out_edges[v]) + contracted_neighbors[v]
+
+        heap = [(priority(v), v) for v in range(n)]
+        heapq.heapify(heap)
+        stale = [False] * n  # Neighbors of contracted nodes, re-estimated once they come up
+        rank = np.zeros(n, dtype=np.int32)
+        up_lists, down_lists = [None] * n, [None] * n
+        order = 0
+
+        while heap:
+            _, v = heappop(heap)
+            if stale[v]:
+                stale[v] = False
+                current = priority(v)
+                if heap and current > heap[0][0]:
+                    heappush(heap, (current, v))
+                    continue
+            shortcuts = shortcuts_for(v, witness_settle_limit)
+
+            rank[v] = order
+            order += 1
+            up_lists[v] = [(x, weight, middle) for x, (weight, middle) in out_edges[v].items()]
+            down_lists[v] = [(u, weight, middle) for u, (weight, middle) in in_edges[v].items()]
+            neighbors = out_edges[v].keys() | in_edges[v].keys()
+            for x in out_edges[v]:
+                del in_edges[x][v]
+            for u in in_edges[v]:
+                del out_edges[u][v]
+            out_edges[v], in_edges[v] = {}, {}
+
+            for u, x, weight in shortcuts:
+                if weight < out_edges[u].get(x, (inf,))[0]:
+                    out_edges[u][x] = in_edges[x][u] = (weight, v)
+
+            for neighbor in neighbors:
+                contracted_neighbors[neighbor] += 1
+                stale[neighbor] = True
+
+        return cls(rank, _pack(up_lists), _pack(down_lists), graph.fingerprint(), time.perf_counter() - started)
+
+    def save(self, path):
+        np.savez(path, rank=self.rank,
+                 up_offsets=self.up_offsets, up_targets=self.up_targets,
+                 up_weights=self.up_weights, up_middles=self.up_middles,
+                 down_offsets=self.down_offsets, down_sources=self.down_sources,
+                 down_weights=self.down_weights, down_middles=self.down_middles,
+                 fingerprint=np.array(self.fingerprint or ""))
+
+    @classmethod
+    def load(cls, path, graph=None):
+        """
+        Loads a hierarchy written by save(). With `graph`, refuses a hierarchy built for other contents.
+        """
+        with np.load(path) as data:
+            fingerprint = str(data["fingerprint"]) or None
+            if graph is not None and fingerprint != graph.fingerprint():
+                raise ValueError(f"Contraction hierarchy '{path}' was built for a different graph")
+            up = (data["up_offsets"], data["up_targets"], data["up_weights"], data["up_middles"])
+            down = (data["down_offsets"], data["down_sources"], data["down_weights"], data["down_middles"])
+            return cls(data["rank"], up, down, fingerprint)
+
+    def query_steps(self, start, goal, stats=None):
+        """
+        Upward bidirectional Dijkstra between two node ids.
+        Yields every settled node id (once) and returns (cost, path ids), or (inf, []).
+        The work done is counted into `stats`, a SearchStats, if given.
+        """
+        if start == goal:
+            yield start
+            return 0.0, [start]
+
+        sides = self._sides
+        costs = [{start: 0.0}, {goal: 0.0}]
+        parents = [{start: -1}, {goal: -1}]
+        heaps = [[(0.0, start)], [(0.0, goal)]]
+        seen = set()
+        inf = float('inf')
+        best, meeting = inf, -1
+        stats = SearchStats() if stats is None else stats
+        relaxed, pushes, pops, peak = 0, 2, 0, 2
+        try:
+            while True:
+                # Each side runs until its queue minimum can no longer improve the best meeting
+                up_min = heaps[0][0][0] if heaps[0] else inf
+                down_min = heaps[1][0][0] if heaps[1] else inf
+                side = 0 if up_min <= down_min else 1
+                if min(up_min, down_min) >= best:
+                    break
+                cost, node = heapq.heappop(heaps[side])
+                pops += 1
+                if cost > costs[side][node]:
+                    continue
+                if node not in seen:
+                    seen.add(node)
+                    yield node
+                if node in costs[1 - side] and cost + costs[1 - side][node] < best:
+                    best, meeting = cost + costs[1 - side][node], node
+
+                offsets, neighbors, weights = sides[side]
+                begin, end = offsets[node], offsets[node + 1]
+                relaxed += end - begin
+                for i in range(begin, end):
+                    neighbor, new_cost = neighbors[i], cost + weights[i]
+                    if new_cost < costs[side].get(neighbor, inf):
+                        costs[side][neighbor] = new_cost
+                        parents[side][neighbor] = node
+                        heapq.heappush(heaps[side], (new_cost, neighbor))
+                        pushes += 1
+                if len(heaps[0]) + len(heaps[1]) > peak:
+                    peak = len(heaps[0]) + len(heaps[1])
+        finally:
+            memory = container_bytes(*costs, *parents, seen) + peak * HEAP_ENTRY_BYTES
+            stats.add_work(relaxed, pushes, pops, peak, memory)
+
+        if meeting == -1:
+            return inf, []
+
+        # Hierarchy path: start ... meeting ... goal, then expand every shortcut
+        upward = [meeting]
+        while parents[0][upward[-1]] != -1:
+            upward.append(parents[0][upward[-1]])
+        upward.reverse()
+        downward = []
+        node = parents[1][meeting]
+        while node != -1:
+            downward.append(node)
+            node = parents[1][node]
+
+        hierarchy_path = upward + downward
+        path = [start]
+        for u, v in zip(hierarchy_path, hierarchy_path[1:]):
+            path.extend(self._unpack(u, v)[1:])
+        return best, path
+
+    def _unpack(self, u, v):
+        """
+        Expands the hierarchy edge u->v into the original node sequence u ... v.
+        """
+        path = [u]
+        stack = [(u, v)]
+        while stack:
+            a, b = stack.pop()
+            middle = self._middles.get((a, b), -1)
+            if middle == -1:
+                path.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+        return path
+
+
+def report(graph, hierarchy, queries=100, seed=0):
+    """
+    Compares CH queries with the plain 'Dijkstra' designation on random node pairs.
+    Returns a dict with preprocessing time, memory and mean query times.
+    """
+    from algorithms import Algorithms
+
+    algorithms = Algorithms(graph)
+    rng = random.Random(seed)
+    pairs = [(rng.randrange(graph.node_count), rng.randrange(graph.node_count)) for _ in range(queries)]
+    ch_seconds = dijkstra_seconds = 0.0
+    for start, goal in pairs:
+        began = time.perf_counter()
+        steps = hierarchy.query_steps(start, goal)
+        try:
+            while True:
+                next(steps)
+        except StopIteration as stop:
+            ch_cost = stop.value[0]
+        ch_seconds += time.perf_counter() - began
+
+        began = time.perf_counter()
+        _, found_path = algorithms.dijkstra(graph.node_list[start], graph.node_list[goal])
+        dijkstra_seconds += time.perf_counter() - began
+        dijkstra_cost = graph.path_cost(found_path) if found_path else float('inf')
+        if abs(ch_cost - dijkstra_cost) > 1e-6 * max(1.0, abs(dijkstra_cost)) and ch_cost != dijkstra_cost:
+            raise AssertionError(f"CH and Dijkstra disagree for {start}->{goal}: {ch_cost} != {dijkstra_cost}")
+
+    graph_bytes = graph.offsets.nbytes + graph.targets.nbytes + graph.weights.nbytes
+    return {
+        "nodes": graph.node_count,
+        "edges": graph.edge_count,
+        "shortcuts": hierarchy.shortcut_count,
+        "preprocessing_seconds": hierarchy.build_seconds,
+        "graph_bytes": graph_bytes,
+        "hierarchy_bytes": hierarchy.nbytes,
+        "queries": queries,
+        "ch_query_ms": 1000 * ch_seconds / max(1, queries),
+        "dijkstra_query_ms": 1000 * dijkstra_seconds / max(1, queries),
+        "speedup": dijkstra_seconds / ch_seconds if ch_seconds else float('inf'),
+    }
+
+
+def main(argv=None):
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from graph import Graph
+
+    parser = argparse.ArgumentParser(description="Build a contraction hierarchy and compare it with Dijkstra.")
+    parser.add_argument("graph", help="Graph file to preprocess")
+    parser.add_argument("-o", "--output", default=None, help="Where to save the hierarchy (.npz)")
+    parser.add_argument("-q", "--queries", type=int, default=100, help="Random queries for the comparison")
+    args = parser.parse_args(argv)
+
+    graph = Graph(args.graph)
+    hierarchy = graph.build_contraction_hierarchy()
+    if args.output:
+        hierarchy.save(args.output)
+        print(f"[CH] Saved hierarchy to {args.output}")
+
+    results = report(graph, hierarchy, args.queries)
+    print(f"[CH] {results['nodes']} nodes, {results['edges']} edges, {results['shortcuts']} shortcuts")
+    print(f"[CH] Preprocessing: {results['preprocessing_seconds']:.2f} s, "
+          f"{results['hierarchy_bytes'] / 1e6:.2f} MB (graph arrays: {results['graph_bytes'] / 1e6:.2f} MB)")
+    print(f"[CH] Mean query: {results['ch_query_ms']:.3f} ms vs Dijkstra {results['dijkstra_query_ms']:.3f} ms "
+          f"({results['speedup']:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,60 +1,228 @@
-import networkx as nx
-import json
+import hashlib
+import numpy as np
+from graph_io import read_graph
 from node import Node
 
 
 class Graph:
+    """
+    Directed weighted graph stored in compressed sparse row (CSR) form.
+
+    Nodes are numbered 0..n-1 in the order they first appear in the graph file.
+    The outgoing edges of node ``u`` are ``targets[offsets[u]:offsets[u + 1]]`` with
+    matching ``weights``. A networkx view is still available through ``nx_graph``.
+    Binary ``.pmz`` files are memory-mapped, in which case the arrays are read-only.
+    """
+
     def __init__(self, filename : str):
-        self.nx_graph = nx.DiGraph()
         self.start_node = None
         self.end_node = None
         self.nodes = {}  # Store Node objects keyed by their names
+        self.node_list = []  # Node objects indexed by their integer id
+        self.node_ids = {}  # Node name -> integer id
+        self.heuristics = np.zeros(0, dtype=np.float64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.targets = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float64)
+        self.landmarks = None  # ALT preprocessing, see build_landmarks()
+        self.contraction_hierarchy = None  # See build_contraction_hierarchy()
+        self._reverse = None
+        self._nx_graph = None
+        self._fingerprint = None
+        self._progress_step = 0
+        self.path = filename
         self.name = filename.split("/")[-1]  # Extract name from filename
         self._load_from_file(filename)
 
     def _load_from_file(self, filename : str) -> None:
         print("[INFO] Loading graph file...")
+        self._set_data(read_graph(filename, progress=self._print_progress))
+        print("[INFO] Graph file loaded!")
 
-        with open(filename, 'r', encoding='utf-8') as file:
+    def _print_progress(self, bytes_read, total_bytes):
+        """
+        Prints the loading progress every 10% of the file.
+        """
+        percent = 100 * bytes_read // max(1, total_bytes)
+        if percent // 10 > self._progress_step:
+            self._progress_step = percent // 10
+            print(f"[INFO] Loading graph file... {percent}%")
 
-            data_graph = json.load(file)
-            # Load nodes and edges
-            for node, data_entry in data_graph.items():
+    def _set_data(self, data) -> None:
+        """
+        Adopts the arrays of a GraphData and creates the Node objects.
+        """
+        self.node_list = [Node(name, heuristic=heuristic) for name, heuristic in zip(data.names, data.heuristics.tolist())]
+        self.node_ids = {name: node_id for node_id, name in enumerate(data.names)}
+        self.nodes = dict(zip(data.names, self.node_list))
+        self.heuristics = data.heuristics
+        self.offsets, self.targets, self.weights = data.offsets, data.targets, data.weights
+        self.start_node = self.nodes[data.start]
+        self.end_node = self.nodes[data.end]
+        self.landmarks = None
+        self.contraction_hierarchy = None
+        self._reverse = None
+        self._nx_graph = None
+        self._fingerprint = None
 
-                if node not in ["start", "end"]:
-                    neighbors = data_entry[:-1]
-                    heuristic = data_entry[-1]
+    @property
+    def node_count(self):
+        return len(self.node_list)
 
-                    if node not in self.nodes:
-                        # Create a new Node object and store it in the nodes dictionary
-                        self.nodes[node] = Node(node, heuristic=heuristic)
-                    else:
-                        # Update the heuristic if the node already exists (it was previously added as a neighbor)
-                        self.nodes[node].heuristic = heuristic
-                    self.nx_graph.add_node(self.nodes[node])
+    @property
+    def edge_count(self):
+        return len(self.targets)
 
-                    for connection in neighbors:
-                        neighbor, weight = connection[0], connection[1]
-                        if neighbor not in self.nodes:
-                            self.nodes[neighbor] = Node(neighbor)
-                        self.nx_graph.add_edge(self.nodes[node], self.nodes[neighbor], weight=weight)
+    @property
+    def nx_graph(self):
+        """
+        networkx view of the graph, built on first access.
+        Nodes are the same Node objects used everywhere else; parallel edges become one edge
+        with the cheapest weight, as the searches relax.
+        """
+        if self._nx_graph is None:
+            import networkx as nx
+
+            # Sort the edges by (source, target, weight) and keep the first of every (source, target)
+            sources = np.repeat(np.arange(self.node_count), np.diff(self.offsets))
+            order = np.lexsort((self.weights, self.targets, sources))
+            sources, targets, weights = sources[order], self.targets[order], self.weights[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
 
-            # Load start and end nodes
-            self.start_node = self.nodes[data_graph["start"]]
-            self.end_node = self.nodes[data_graph["end"]]
-            print("[INFO] Graph file loaded!")
+            node_list = self.node_list
+            nx_graph = nx.DiGraph()
+            nx_graph.add_nodes_from(node_list)
+            nx_graph.add_weighted_edges_from(
+                (node_list[u], node_list[v], w)
+                for u, v, w in zip(sources[first].tolist(), targets[first].tolist(), weights[first].tolist()))
+            self._nx_graph = nx_graph
+        return self._nx_graph
+
+    def fingerprint(self) -> str:
+        """
+        Returns a SHA-256 digest of the graph contents (names, heuristics, edges,
+        start and end), independent of the file name. Computed once per graph.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update("\0".join(node.name for node in self.node_list).encode('utf-8'))
+            for array in (self.heuristics, self.offsets, self.targets, self.weights):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            digest.update(f"{self.start_node}\0{self.end_node}".encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def id_of(self, node) -> int:
+        """
+        Returns the integer id of a node, given either the Node object or its name.
+        """
+        return self.node_ids[str(node)]
+
+    def to_nodes(self, ids):
+        """
+        Converts a sequence of integer ids into the matching Node objects.
+        """
+        node_list = self.node_list
+        return [node_list[i] for i in ids]
+
+    def successors(self, node_id : int):
+        """
+        Returns the (targets, weights) array views of the outgoing edges of a node id.
+        """
+        start, end = self.offsets[node_id], self.offsets[node_id + 1]
+        return self.targets[start:end], self.weights[start:end]
+
+    def reverse_adjacency(self):
+        """
+        Returns the (offsets, sources, weights) CSR arrays of the reversed graph,
+        i.e. the incoming edges of every node. Built on first use.
+        """
+        if self._reverse is None:
+            n = len(self.node_list)
+            sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(self.offsets))
+            order = np.argsort(self.targets, kind='stable')
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.targets, minlength=n), out=offsets[1:])
+            self._reverse = (offsets, sources[order], self.weights[order])
+        return self._reverse
+
+    def predecessors(self, node_id : int):
+        """
+        Returns the (sources, weights) array views of the incoming edges of a node id.
+        """
+        offsets, sources, weights = self.reverse_adjacency()
+        start, end = offsets[node_id], offsets[node_id + 1]
+        return sources[start:end], weights[start:end]
+
+    def build_landmarks(self, count=8):
+        """
+        Selects `count` landmarks and precomputes their distance arrays (see Landmarks).
+        """
+        from landmarks import Landmarks
+
+        print(f"[INFO] Preprocessing {count} landmarks...")
+        self.landmarks = Landmarks(self, count)
+        print(f"[INFO] Landmarks ready ({self.landmarks.nbytes / 1e6:.1f} MB).")
+        return self.landmarks
+
+    def build_contraction_hierarchy(self):
+        """
+        Runs the contraction hierarchy preprocessing (see contraction.py).
+        """
+        from contraction import ContractionHierarchy
+
+        print("[INFO] Building contraction hierarchy...")
+        self.contraction_hierarchy = ContractionHierarchy.build(self)
+        print(f"[INFO] Contraction hierarchy ready ({self.contraction_hierarchy.shortcut_count} shortcuts, "
+              f"{self.contraction_hierarchy.build_seconds:.2f} s).")
+        return self.contraction_hierarchy
+
+    def edges(self):
+        """
+        Yields every edge as a (source Node, target Node, weight) tuple.
+        """
+        node_list = self.node_list
+        offsets = self.offsets.tolist()
+        targets = self.targets.tolist()
+        weights = self.weights.tolist()
+        for u in range(len(node_list)):
+            for i in range(offsets[u], offsets[u + 1]):
+                yield node_list[u], node_list[targets[i]], weights[i]
 
     def get_neighbors(self, node):
         """
         Returns a list of neighbors of a given node.
         """
-        return list(self.nx_graph.neighbors(node))
+        return self.to_nodes(self.successors(self.id_of(node))[0].tolist())
 
     def get_cost(self, node1, node2):
         """
-        Returns the cost (weight) between two given nodes.
+        Returns the cost (weight) between two given nodes; of parallel edges, the cheapest, as the searches relax.
+        """
+        targets, weights = self.successors(self.id_of(node1))
+        match = targets == self.id_of(node2)
+        if not match.any():
+            raise KeyError(f"No edge from {node1} to {node2}")
+        return weights[match].min().item()
+
+    def path_cost(self, path):
+        """
+        Returns the total cost of a path given as a sequence of nodes, taking the cheapest of parallel edges.
         """
-        return self.nx_graph[node1][node2]['weight']
+        # Scans the CSR rows directly: per-edge NumPy calls dominate on long (e.g. DFS) paths
+        offsets, targets, weights = memoryview(self.offsets), memoryview(self.targets), memoryview(self.weights)
+        ids = [self.id_of(node) for node in path]
+        total = 0
+        for u, v in zip(ids, ids[1:]):
+            cost = None
+            for i in range(offsets[u], offsets[u + 1]):
+                if targets[i] == v and (cost is None or weights[i] < cost):
+                    cost = weights[i]
+            if cost is None:
+                raise KeyError(f"No edge from {self.node_list[u]} to {self.node_list[v]}")
+            total += cost
+        return total
 
     def get_graph_name(self):
         """
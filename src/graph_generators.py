@@ -0,0 +1,213 @@
+"""
+Seeded synthetic graphs for benchmarks.
+
+Every generator builds the CSR arrays directly with NumPy, so graphs of 10^7 nodes take
+seconds, and returns ``(GraphData, coordinates)``: the coordinates (one (x, y) row per node
+id, y up) are only used to lay the graph out when rendering.
+
+* ``grid``: a 4-connected lattice with integer weights from 1 to 9;
+* ``geometric``: a random geometric graph, points uniform in a square joined when closer
+  than a radius chosen for an average degree of about 7, weighted by length;
+* ``road``: a jittered street grid where some cross streets are missing, with faster
+  highways every 16 rows and columns, weighted by travel time.
+
+Edges are undirected (stored both ways) and every heuristic is an admissible estimate of the
+cost to the end node, so A* and friends stay exact. The same kind, size and seed always give
+the same graph.
+
+Write one with ``python graph_generators.py road 100000 graphs/road-1e5.pmz --seed 1``.
+"""
+import argparse
+import math
+import os
+import time
+import numpy as np
+
+from graph_io import BINARY_EXTENSION, GraphData, write_graph_binary, write_graph_file
+
+GENERATOR_VERSION = 1
+
+
+def _csr(node_count, sources, targets, weights):
+    """
+    Packs undirected (source, target, weight) pairs into CSR arrays, both directions, sorted by source.
+    """
+    sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+    weights = np.concatenate((weights, weights))
+    order = np.lexsort((targets, sources))
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    return offsets, targets[order].astype(np.int32), weights[order].astype(np.float64)
+
+
+def _reachable(offsets, targets, start):
+    """
+    Boolean mask of the nodes reachable from `start`, by a breadth-first search over whole frontiers.
+    """
+    seen = np.zeros(len(offsets) - 1, dtype=bool)
+    seen[start] = True
+    frontier = np.array([start])
+    while len(frontier):
+        begin, counts = offsets[frontier], offsets[frontier + 1] - offsets[frontier]
+        positions = np.repeat(begin - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        frontier = np.unique(targets[positions])
+        frontier = frontier[~seen[frontier]]
+        seen[frontier] = True
+    return seen
+
+
+def _graph_data(coordinates, csr, start, end, heuristic_scale):
+    offsets, csr_targets, csr_weights = csr
+    node_count = len(coordinates)
+    # Straight-line distance to the end node, times the lowest cost per unit of length
+    heuristics = np.hypot(*(coordinates - coordinates[end]).T) * heuristic_scale
+    heuristics = np.floor(heuristics * 100) / 100
+    names = [f"N{i}" for i in range(node_count)]
+    return GraphData(names, heuristics, offsets, csr_targets, csr_weights, names[start], names[end])
+
+
+def grid_graph(nodes, seed=0):
+    """
+    `nodes` nodes on a lattice about sqrt(nodes) wide, the last row possibly incomplete.
+    Start and end are opposite corners.
+    """
+    rng = np.random.default_rng(seed)
+    columns = max(1, math.ceil(math.sqrt(nodes)))
+    ids = np.arange(nodes, dtype=np.int64)
+    coordinates = np.column_stack((ids % columns, -(ids // columns))).astype(float)
+
+    right = ids[(ids % columns < columns - 1) & (ids + 1 < nodes)]
+    down = ids[ids + columns < nodes]
+    sources = np.concatenate((right, down))
+    targets = np.concatenate((right + 1, down + columns))
+    weights = rng.integers(1, 10, len(sources)).astype(float)
+    csr = _csr(nodes, sources, targets, weights)
+    # Manhattan distance is at least the straight-line one, and every step costs at least 1
+    return _graph_data(coordinates, csr, 0, nodes - 1, 1.0), coordinates
+
+
+def geometric_graph(nodes, seed=0, degree=7.0, chunk_size=1 << 20):
+    """
+    Random geometric graph with unit point density: points i, j are joined when
+    |p_i - p_j| <= r, with pi * r^2 = `degree`. Pairs are found through a grid of r-sized cells.
+    Start and end are the points closest to two opposite corners within the component of the start,
+    which is the first point from the corner whose component holds at least half of the graph.
+    """
+    rng = np.random.default_rng(seed)
+    side = math.sqrt(nodes)
+    coordinates = rng.random((nodes, 2)) * side
+    radius = math.sqrt(degree / math.pi)
+
+    # Sort the points by cell, so every cell is a contiguous id range
+    columns = max(1, math.ceil(side / radius))
+    cells = np.minimum((coordinates // radius).astype(np.int64), columns - 1)
+    keys = cells[:, 1] * columns + cells[:, 0]
+    order = np.argsort(keys, kind='stable')
+    coordinates, cells, keys = coordinates[order], cells[order], keys[order]
+    cell_starts = np.searchsorted(keys, np.arange(columns * columns + 1))
+
+    # Half of the 3x3 neighbourhood, so every pair is seen once
+    sources, targets = [], []
+    for dx, dy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+        for first in range(0, nodes, chunk_size):
+            ids = np.arange(first, min(nodes, first + chunk_size))
+            x, y = cells[ids, 0] + dx, cells[ids, 1] + dy
+            inside = (x >= 0) & (x < columns) & (y < columns)
+            ids, neighbor_keys = ids[inside], (y * columns + x)[inside]
+            begin, end = cell_starts[neighbor_keys], cell_starts[neighbor_keys + 1]
+            if dx == 0 and dy == 0:
+                begin = ids + 1  # Same cell: only the points after this one
+            counts = np.maximum(end - begin, 0)
+            pair_sources = np.repeat(ids, counts)
+            pair_targets = np.repeat(begin, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            close = np.hypot(*(coordinates[pair_sources] - coordinates[pair_targets]).T) <= radius
+            sources.append(pair_sources[close])
+            targets.append(pair_targets[close])
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+
+    # Lengths rounded up, so the straight-line heuristic stays admissible
+    weights = np.ceil(np.hypot(*(coordinates[sources] - coordinates[targets]).T) * 100) / 100
+    csr = _csr(nodes, sources, targets, weights)
+
+    diagonal = coordinates.sum(axis=1)
+    for start in np.argsort(diagonal)[:100].tolist():
+        component = _reachable(csr[0], csr[1], start)
+        if component.sum() * 2 >= nodes:
+            break
+    end = int(np.argmax(np.where(component, diagonal, -np.inf)))
+    return _graph_data(coordinates, csr, start, end, 1.0), coordinates
+
+
+def road_graph(nodes, seed=0, missing=0.4, highway_every=16, highway_speed=2.0):
+    """
+    Street grid with jittered intersections. Every row is a street; cross streets run in every
+    4th column and, elsewhere, `missing` of their blocks are left out. Every `highway_every`-th
+    row and column also has a highway joining every 8th intersection at `highway_speed` times
+    the speed. Weights are travel times: length times a congestion factor from 1 to 1.6.
+    """
+    rng = np.random.default_rng(seed)
+    columns = max(1, math.ceil(math.sqrt(nodes)))
+    ids = np.arange(nodes, dtype=np.int64)
+    column, row = ids % columns, ids // columns
+    coordinates = np.column_stack((column, -row)).astype(float) + rng.uniform(-0.3, 0.3, (nodes, 2))
+
+    right = ids[(column < columns - 1) & (ids + 1 < nodes)]
+    down = ids[ids + columns < nodes]
+    down = down[(column[down] % 4 == 0) | (rng.random(len(down)) >= missing)]
+    local_sources = np.concatenate((right, down))
+    local_targets = np.concatenate((right + 1, down + columns))
+    lengths = np.hypot(*(coordinates[local_sources] - coordinates[local_targets]).T)
+    local_weights = lengths * rng.uniform(1.0, 1.6, len(lengths))
+
+    span = 8
+    east = ids[(row % highway_every == 0) & (column % span == 0) & (column + span < columns) & (ids + span < nodes)]
+    south = ids[(column % highway_every == 0) & (row % span == 0) & (ids + span * columns < nodes)]
+    highway_sources = np.concatenate((east, south))
+    highway_targets = np.concatenate((east + span, south + span * columns))
+    highway_weights = np.hypot(*(coordinates[highway_sources] - coordinates[highway_targets]).T) / highway_speed
+
+    sources = np.concatenate((local_sources, highway_sources))
+    targets = np.concatenate((local_targets, highway_targets))
+    weights = np.ceil(np.concatenate((local_weights, highway_weights)) * 100) / 100
+    csr = _csr(nodes, sources, targets, weights)
+    return _graph_data(coordinates, csr, 0, nodes - 1, 1.0 / highway_speed), coordinates
+
+
+GENERATORS = {"grid": grid_graph, "geometric": geometric_graph, "road": road_graph}
+
+
+def generate(kind, nodes, seed=0):
+    """Returns (GraphData, coordinates) for one of the GENERATORS."""
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown graph kind '{kind}' (expected one of {', '.join(GENERATORS)})")
+    if nodes < 2:
+        raise ValueError("A generated graph needs at least 2 nodes")
+    return GENERATORS[kind](int(nodes), seed)
+
+
+def write_graph(data, path):
+    """Writes the graph in the binary format for .pmz paths and in the JSON text format otherwise."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if path.endswith(BINARY_EXTENSION):
+        write_graph_binary(data, path)
+    else:
+        write_graph_file(data, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pymapz-generate", description="Write a seeded synthetic pyMapz graph.")
+    parser.add_argument("kind", choices=sorted(GENERATORS), help="Graph family")
+    parser.add_argument("nodes", type=float, help="Number of nodes (1e5 is accepted)")
+    parser.add_argument("output", help=f"Graph file to write ({BINARY_EXTENSION} for the binary format)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data, _ = generate(args.kind, int(args.nodes), args.seed)
+    write_graph(data, args.output)
+    print(f"[INFO] Wrote {args.output}: {len(data.names)} nodes, {len(data.targets)} edges "
+          f"({os.path.getsize(args.output) / 1e6:.1f} MB, {time.perf_counter() - started:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Graph file readers producing the CSR arrays used by Graph.
+
+The text format is a single JSON object::
+
+    {"NODE": [["NEIGHBOR", weight], ..., heuristic], ..., "start": "NODE", "end": "NODE"}
+
+read_graph_file() parses it incrementally: the file is read in chunks and decoded one
+node entry at a time, so peak memory is the adjacency buffers plus one chunk, never
+the whole JSON document.
+
+The binary format (``.pmz``) stores the same arrays raw and little-endian, each section
+8-byte aligned, after a 64-byte header:
+
+    magic "PYMAPZG\0" | version u32 | reserved u32 | nodes u64 | edges u64 |
+    start id u64 | end id u64 | name table size u64 | reserved u64
+
+    names (UTF-8, NUL separated) | heuristics f64[nodes] | offsets i64[nodes + 1] |
+    targets i32[edges] | weights f64[edges]
+
+read_graph_binary() memory-maps the file and returns NumPy views of it, so nothing is
+copied and every process opening the same file shares its pages.
+
+Convert text graphs with ``python graph_io.py graphs/graph.txt [graphs/graph.pmz]``.
+"""
+import argparse
+import codecs
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+import numpy as np
+
+
+BINARY_EXTENSION = ".pmz"
+BINARY_MAGIC = b"PYMAPZG\0"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<8sII6Q")  # 64 bytes
+
+
+class GraphData:
+    """
+    Plain container for a loaded graph: node names indexed by id, float64 heuristics,
+    CSR offsets (int64), targets (int32) and weights (float64), start and end names.
+    """
+
+    def __init__(self, names, heuristics, offsets, targets, weights, start, end):
+        self.names = names
+        self.heuristics = heuristics
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.start = start
+        self.end = end
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_KEY = re.compile(r'[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*', re.DOTALL)
+_SEPARATOR = re.compile(r'[ \t\n\r]*([,}])')
+
+
+class _ChunkReader:
+    """
+    Character buffer over a UTF-8 file that refills itself on demand.
+    Every read retries after pulling in the next chunk when it hits the end of the buffer.
+    """
+
+    def __init__(self, file, chunk_size, progress):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.total = os.fstat(file.fileno()).st_size
+        self.bytes_read = 0
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.scan_value = json.JSONDecoder().raw_decode
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.file.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        if self.progress is not None:
+            self.progress(self.bytes_read, self.total)
+
+    def error(self, expected):
+        return ValueError(f"Invalid graph file: expected {expected} near byte {self.bytes_read}")
+
+    def expect(self, char):
+        while True:
+            pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if pos < len(self.buffer) or self.eof:
+                break
+            self.fill()
+        if self.buffer[pos:pos + 1] != char:
+            raise self.error(f"'{char}'")
+        self.pos = pos + 1
+
+    def key(self):
+        """
+        Reads an object key and the colon after it.
+        """
+        while True:
+            match = _KEY.match(self.buffer, self.pos)
+            if match is not None and match.end() < len(self.buffer) or self.eof:
+                break
+            self.fill()
+        if match is None:
+            raise self.error("a node name")
+        self.pos = match.end()
+        key = match.group(1)
+        return json.loads(f'"{key}"') if '\\' in key else key
+
+    def value(self):
+        """
+        Decodes the next JSON value (the key regex already skipped the whitespace before it).
+        """
+        while True:
+            try:
+                value, end = self.scan_value(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            if end < len(self.buffer) or self.eof:  # A number could continue in the next chunk
+                self.pos = end
+                return value
+            self.fill()
+
+    def separator(self):
+        """
+        Reads the ',' or '}' after an object member and returns it.
+        """
+        while True:
+            match = _SEPARATOR.match(self.buffer, self.pos)
+            if match is not None or self.eof:
+                break
+            self.fill()
+        if match is None:
+            raise self.error("',' or '}'")
+        self.pos = match.end()
+        return match.group(1)
+
+
+def read_graph_file(filename, progress=None, chunk_size=1 << 20):
+    """
+    Streams a JSON graph file into a GraphData.
+
+    Node ids follow the order in which names first appear (as an entry or as a
+    neighbor), and edges keep their file order, exactly like a full json.load would.
+    `progress`, if given, is called as progress(bytes_read, total_bytes) after each chunk.
+    """
+    node_ids = {}
+    names = []
+    heuristics = array('d')
+    targets, weights = array('i'), array('d')
+    block_start, block_end = array('q'), array('q')  # Edge range of every node's entry
+    special = {}
+
+    def new_node(name):
+        index = node_ids[name] = len(names)
+        names.append(name)
+        heuristics.append(0.0)
+        block_start.append(0)
+        block_end.append(0)
+        return index
+
+    with open(filename, 'rb') as file:
+        reader = _ChunkReader(file, chunk_size, progress)
+        reader.expect('{')
+        while True:
+            key = reader.key()
+            entry = reader.value()
+
+            if key in ("start", "end"):
+                special[key] = str(entry)
+            else:
+                source = node_ids.get(key)
+                if source is None:
+                    source = new_node(key)
+                heuristics[source] = entry[-1]
+                block_start[source] = len(targets)
+                for neighbor, weight in entry[:-1]:
+                    neighbor = str(neighbor)
+                    target = node_ids.get(neighbor)
+                    targets.append(new_node(neighbor) if target is None else target)
+                    weights.append(weight)
+                block_end[source] = len(targets)
+
+            if reader.separator() == '}':
+                break
+
+    for key in ("start", "end"):
+        if key not in special:
+            raise ValueError(f"Invalid graph file: missing '{key}' node")
+        if special[key] not in node_ids:
+            raise KeyError(special[key])
+
+    # Entries are usually already in id order; otherwise gather every node's block
+    starts = np.frombuffer(block_start, dtype=np.int64)
+    lengths = np.frombuffer(block_end, dtype=np.int64) - starts
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    buffered_targets = np.frombuffer(targets, dtype=np.int32)
+    buffered_weights = np.frombuffer(weights, dtype=np.float64)
+    if np.array_equal(starts, offsets[:-1]) and offsets[-1] == len(buffered_targets):
+        csr_targets, csr_weights = buffered_targets, buffered_weights  # Zero-copy views of the buffers
+    else:
+        gather = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        csr_targets, csr_weights = buffered_targets[gather], buffered_weights[gather]
+
+    return GraphData(names, np.frombuffer(heuristics, dtype=np.float64), offsets,
+                     csr_targets, csr_weights, special["start"], special["end"])
+
+
+def _json_number(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def write_graph_file(data, filename, lines_per_write=10000):
+    """
+    Writes a GraphData in the JSON text format, one node entry per line like graphs/graph.txt.
+    Reading it back gives the same graph, though ids follow the reader's first-appearance order.
+    """
+    quoted = [json.dumps(name, ensure_ascii=False) for name in data.names]
+    offsets = data.offsets.tolist()
+    targets, weights = data.targets.tolist(), data.weights.tolist()
+    heuristics = data.heuristics.tolist()
+
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, 'w', encoding='utf-8', newline='\n') as file:
+        file.write("{\n")
+        lines = []
+        for node in range(len(quoted)):
+            begin, end = offsets[node], offsets[node + 1]
+            edges = "".join(f"[{quoted[targets[i]]}, {_json_number(weights[i])}], " for i in range(begin, end))
+            lines.append(f"  {quoted[node]}: [{edges}{_json_number(heuristics[node])}],\n")
+            if len(lines) == lines_per_write:
+                file.write("".join(lines))
+                lines.clear()
+        file.write("".join(lines))
+        file.write(f'  "start": {json.dumps(data.start, ensure_ascii=False)},\n'
+                   f'  "end": {json.dumps(data.end, ensure_ascii=False)}\n}}\n')
+    os.replace(tmp_filename, filename)
+
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+
+def write_graph_binary(data, filename):
+    """
+    Writes a GraphData in the binary format described at the top of this module.
+    """
+    if any('\0' in name for name in data.names):
+        raise ValueError("Node names containing NUL cannot be stored in the binary format")
+    names = "\0".join(data.names).encode('utf-8')
+    node_ids = {name: node_id for node_id, name in enumerate(data.names)}
+    sections = [
+        np.ascontiguousarray(data.heuristics, dtype='<f8'),
+        np.ascontiguousarray(data.offsets, dtype='<i8'),
+        np.ascontiguousarray(data.targets, dtype='<i4'),
+        np.ascontiguousarray(data.weights, dtype='<f8'),
+    ]
+    header = _HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(data.names), len(data.targets),
+                          node_ids[data.start], node_ids[data.end], len(names), 0)
+
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, 'wb') as file:
+        file.write(header)
+        file.write(names)
+        file.write(b"\0" * (_aligned(len(names)) - len(names)))
+        for section in sections:
+            file.write(section.tobytes())
+            file.write(b"\0" * (_aligned(section.nbytes) - section.nbytes))
+    os.replace(tmp_filename, filename)
+
+
+def read_graph_binary(filename):
+    """
+    Memory-maps a binary graph file. The returned arrays are read-only views of the mapping.
+    """
+    with open(filename, 'rb') as file:
+        if os.fstat(file.fileno()).st_size < _HEADER.size:
+            raise ValueError(f"'{filename}' is not a pyMapz binary graph")
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, _, nodes, edges, start, end, names_size, _ = _HEADER.unpack_from(mapping, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"'{filename}' is not a pyMapz binary graph")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary graph version {version} in '{filename}'")
+    if not nodes:
+        raise ValueError(f"Invalid graph file '{filename}': the graph has no nodes")
+    if start >= nodes or end >= nodes:
+        raise ValueError(f"Invalid graph file '{filename}': start or end node id out of range")
+    # Names, heuristics, offsets and targets padded to 8 bytes, then the weights
+    size = _HEADER.size + _aligned(names_size) + _aligned(8 * nodes) + _aligned(8 * (nodes + 1)) + _aligned(4 * edges) + 8 * edges
+    if len(mapping) < size:
+        raise ValueError(f"Invalid graph file '{filename}': truncated ({len(mapping)} of {size} bytes)")
+
+    position = _HEADER.size
+    names = mapping[position:position + names_size].decode('utf-8').split("\0")
+    if len(names) != nodes:
+        raise ValueError(f"Invalid graph file '{filename}': {len(names)} names for {nodes} nodes")
+    position += _aligned(names_size)
+
+    arrays = []
+    for dtype, count in (('<f8', nodes), ('<i8', nodes + 1), ('<i4', edges), ('<f8', edges)):
+        array_view = np.frombuffer(mapping, dtype=dtype, count=count, offset=position)
+        arrays.append(array_view)
+        position += _aligned(array_view.nbytes)
+    heuristics, offsets, targets, weights = arrays
+
+    return GraphData(names, heuristics, offsets, targets, weights, names[start], names[end])
+
+
+def read_graph(filename, progress=None):
+    """
+    Reads a graph file in either format, chosen by its extension.
+    """
+    if filename.endswith(BINARY_EXTENSION):
+        return read_graph_binary(filename)
+    return read_graph_file(filename, progress=progress)
+
+
+def convert_to_binary(source, destination=None, progress=None):
+    """
+    Converts a text graph file into the binary format. Returns the destination path.
+    """
+    destination = destination or os.path.splitext(source)[0] + BINARY_EXTENSION
+    write_graph_binary(read_graph_file(source, progress=progress), destination)
+    return destination
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pymapz-convert", description="Convert pyMapz text graphs to the binary format.")
+    parser.add_argument("source", help="Text (.txt/.json) graph file")
+    parser.add_argument("destination", nargs="?", default=None, help=f"Output file (default: source with {BINARY_EXTENSION})")
+    args = parser.parse_args(argv)
+
+    destination = convert_to_binary(args.source, args.destination)
+    print(f"[INFO] Wrote {destination} ({os.path.getsize(destination) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
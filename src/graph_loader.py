@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from graph import Graph
+
+# Memory that loaded-but-hidden graphs may hold, prefetched or shown before
+PREFETCH_MEMORY = 256 * 1024 * 1024
+# Python objects per node: its Node in the graph and on the map, its name, position and dict entries
+NODE_BYTES = 800
+
+
+def graph_bytes(graph):
+    """Rough memory held by a loaded graph: its arrays, its preprocessing and NODE_BYTES per node."""
+    total = graph.offsets.nbytes + graph.targets.nbytes + graph.weights.nbytes + graph.heuristics.nbytes
+    for preprocessing in (graph.landmarks, graph.contraction_hierarchy):
+        if preprocessing is not None:
+            total += preprocessing.nbytes
+    return total + NODE_BYTES * graph.node_count
+
+
+class GraphLoader:
+    """
+    Loads graphs on a background thread, so switching graphs never blocks the pygame event loop.
+
+    load() asks for a graph file; a worker thread reads it and runs `prepare(graph)` on it, which
+    builds whatever else the caller needs (algorithms, positions, map nodes) into a dict, and
+    poll() hands that dict over on the main thread as ("loaded", prepared) or ("error", message),
+    to be swapped in at once. Only the latest request is delivered; an earlier load that is
+    still running finishes in the background and is kept like a prefetched one.
+
+    Graphs that are loaded but not shown (prefetched with prefetch(), or handed back with keep()
+    when another one is swapped in) stay ready in memory, least recently used first out, while
+    their estimated size fits in `memory_limit` bytes; loading one of them again is immediate
+    as long as its file has not changed since.
+    """
+
+    def __init__(self, prepare, memory_limit=PREFETCH_MEMORY):
+        self.prepare = prepare
+        self.memory_limit = memory_limit
+        self.loading = None  # Path of the graph being waited for, until poll() hands it over
+        self.started = None  # perf_counter() when it was asked for
+        self._ready = OrderedDict()  # Path -> (modification time, bytes, prepared), least recently used first
+        self._lock = threading.Lock()
+        self._wanted = None  # Path of the latest load() while it still has to be read
+        self._delivered = []  # (kind, payload) for the main thread
+        self._prefetch = deque()
+        self._worker = None
+
+    def load(self, path):
+        """Asks for the graph at `path`; poll() delivers it once ready."""
+        path = os.path.abspath(path)
+        with self._lock:
+            self.loading = self._wanted = path
+            self.started = time.perf_counter()
+            self._delivered = []
+            entry = self._ready.get(path)
+            if entry is not None and entry[0] == _modified(path):
+                del self._ready[path]
+                self._deliver("loaded", entry[2])
+        self._start_worker()
+
+    def prefetch(self, paths):
+        """Loads the given graph files in the background, after any load() and while they fit in memory."""
+        with self._lock:
+            self._prefetch.extend(os.path.abspath(path) for path in paths)
+        self._start_worker()
+
+    def keep(self, path, prepared, modified=None):
+        """Keeps a graph that stops being shown ready for later, if it fits in memory."""
+        path = os.path.abspath(path)
+        modified = modified if modified is not None else _modified(path)
+        with self._lock:
+            self._store(path, modified, prepared, recent=True)
+
+    def cancel(self):
+        """Stops waiting for the requested graph; a load already running finishes and is kept."""
+        with self._lock:
+            self.loading = self._wanted = None
+            self._delivered = []
+            self._prefetch.clear()
+
+    def poll(self):
+        """Returns the messages for the requested graph that arrived since the last poll, without waiting."""
+        with self._lock:
+            messages, self._delivered = self._delivered, []
+            if messages:
+                self.loading = None
+            return messages
+
+    def ready_bytes(self):
+        """Estimated memory held by the graphs kept ready."""
+        with self._lock:
+            return sum(entry[1] for entry in self._ready.values())
+
+    def _deliver(self, kind, payload):
+        self._delivered.append((kind, payload))
+        self._wanted = None
+
+    def _store(self, path, modified, prepared, recent):
+        """
+        Adds a graph to the ready ones, as the most recently used or, for prefetched ones, the least,
+        so prefetching never pushes out a graph that was shown. Then evicts down to the memory limit.
+        """
+        self._ready.pop(path, None)
+        self._ready[path] = (modified, graph_bytes(prepared["graph"]), prepared)
+        if not recent:
+            self._ready.move_to_end(path, last=False)
+        total = sum(entry[1] for entry in self._ready.values())
+        while self._ready and total > self.memory_limit:
+            _, (_, size, _) = self._ready.popitem(last=False)
+            total -= size
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="pymapz-graph-loader", daemon=True)
+            self._worker.start()
+
+    def _next_job(self):
+        """The requested graph if it still has to be read, else the next prefetch worth reading; None when idle."""
+        if self._wanted is not None:
+            return self._wanted, True
+        while self._prefetch:
+            path = self._prefetch.popleft()
+            # The file size is a lower bound of the loaded size, so larger files would never fit
+            if path in self._ready or not os.path.exists(path) or os.path.getsize(path) > self.memory_limit:
+                continue
+            return path, False
+        return None, False
+
+    def _run(self):
+        while True:
+            with self._lock:
+                path, wanted = self._next_job()
+                if path is None:
+                    self._worker = None
+                    return
+            modified = _modified(path)
+            try:
+                prepared = self.prepare(Graph(path))
+                error = None
+            except Exception as e:
+                prepared, error = None, f"{type(e).__name__}: {e}"
+
+            with self._lock:
+                if path == self._wanted:
+                    if error is None:
+                        self._deliver("loaded", prepared)
+                    else:
+                        self._deliver("error", error)
+                elif error is None:
+                    self._store(path, modified, prepared, recent=wanted)
+                else:
+                    print(f"[ERRO] Failed to prefetch graph '{path}': {error}")
+
+
+def _modified(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
@@ -1,5 +1,6 @@
 import pygame
 from utils.colors import Color
+from utils.fonts import render_text
 
 
 class ColorLegend:
@@ -16,7 +17,6 @@ class ColorLegend:
             {"color": Color.GREEN.value, "label": "Visited node"},
             {"color": Color.YELLOW.value, "label": "Path node"}
         ]
-        self.font = pygame.font.SysFont('Tahoma', 12)
         self.container = container
 
     def draw(self, screen):
@@ -25,6 +25,6 @@ class ColorLegend:
         for color_info in self.colors:
             square_border = pygame.draw.rect(screen, Color.WHITE.value, (initial_x, self.container.centery - 10, border_size + 2, border_size + 2))
             pygame.draw.rect(screen, color_info["color"], (square_border.x + 1, square_border.y + 1, 20, 20))
-            text = self.font.render(color_info["label"], True, Color.WHITE.value)
+            text = render_text(color_info["label"], 12, Color.WHITE.value)
             screen.blit(text, (initial_x + 25, self.container.centery - 7))
             initial_x += 125  # Change this to adjust space between legend items
@@ -0,0 +1,113 @@
+import numpy as np
+import pygame
+
+from utils.colors import Color
+from utils.fonts import get_font, render_text
+
+
+class ComparisonView:
+    """
+    Table of a Comparison, with small-multiple panels below it: every node as a dot, colored by
+    whether that algorithm visited it or has it on its path.
+    """
+    ROW_HEIGHT = 17
+    COLUMN_WIDTHS = (190, 90, 90, 60, 100, 80)
+    PANEL_COLUMNS = 3
+    PANEL_GAP = 8
+
+    def __init__(self, comparison, rect):
+        self.comparison = comparison
+        self.rect = rect
+        self.visible = False
+        self.show_panels = True
+        self.graph = None
+        self._points = np.zeros((0, 2), dtype=int)  # Node id -> pixel inside a panel
+        self._panel_size = (1, 1)
+        self._panels = {}  # Designation -> rendered panel, for results already drawn
+
+    def set_layout(self, graph, positions, count):
+        """Sizes `count` panels below the table and scales the nodes' map positions into one of them."""
+        self.graph = graph
+        self._panels = {}
+        rows = -(-count // self.PANEL_COLUMNS)
+        # Title, header, one row per algorithm and the summary line above the panels
+        top = self.rect.y + 2 * self.PANEL_GAP + 4 + (count + 3) * self.ROW_HEIGHT
+        width = (self.rect.width - (self.PANEL_COLUMNS + 1) * self.PANEL_GAP) // self.PANEL_COLUMNS
+        height = max(8, (self.rect.bottom - top) // rows - self.ROW_HEIGHT - self.PANEL_GAP)
+        self._panel_size = (width, height)
+
+        points = np.array([positions[node] for node in graph.node_list], dtype=float).reshape(-1, 2)
+        if len(points):
+            low, span = points.min(axis=0), np.ptp(points, axis=0)
+            scale = min((width - 7) / max(span[0], 1), (height - 7) / max(span[1], 1))
+            offset = (np.array((width, height)) - span * scale) / 2
+            points = (points - low) * scale + offset
+        self._points = np.clip(np.rint(points).astype(int), 0, (width - 1, height - 1))
+
+    def _render_panel(self, result):
+        """Draws one run: unvisited nodes in grey, visited in green, path in yellow, start and end on top."""
+        width, height = self._panel_size
+        panel = pygame.Surface((width, height))
+        panel.fill(Color.WHITE.value)
+        pixels = pygame.surfarray.pixels3d(panel)
+
+        def dots(ids, color, size=1):
+            xs, ys = self._points[ids, 0], self._points[ids, 1]
+            for dx in range(size):
+                for dy in range(size):
+                    pixels[np.minimum(xs + dx, width - 1), np.minimum(ys + dy, height - 1)] = color
+
+        graph = self.graph
+        dots(np.arange(len(self._points)), (200, 200, 200))  # Lighter than Color.GREY, under the other dots
+        if "visited" in result:
+            dots(result["visited"], Color.GREEN.value, 2)
+            dots(np.array([graph.node_ids[name] for name in result["path"]], dtype=int), Color.YELLOW.value, 3)
+        start, end = self.comparison.query
+        dots(np.array([graph.node_ids[start]]), Color.BLACK.value, 5)
+        dots(np.array([graph.node_ids[end]]), Color.RED.value, 5)
+        del pixels  # Unlocks the surface
+        return panel
+
+    def draw(self, screen):
+        """Draws the table (and the panels, if shown) and returns the rect covered; without panels the map shows below."""
+        area = self.rect.copy()
+        if not self.show_panels:
+            area.height = 2 * self.PANEL_GAP + 4 + (len(self.comparison.designations) + 3) * self.ROW_HEIGHT
+        pygame.draw.rect(screen, Color.WHITE.value, area)
+        font = get_font(13, "Consolas,Courier New")  # Numbers change while the runs finish, so no shared text cache
+        x, y = self.rect.x + self.PANEL_GAP, self.rect.y + self.PANEL_GAP
+        start, end = self.comparison.query or ("", "")
+        screen.blit(render_text(f"Compare all: {start} -> {end}", 14, Color.BLACK.value), (x, y))
+        y += self.ROW_HEIGHT + 4
+
+        for index, row in enumerate([self.comparison.HEADERS] + self.comparison.rows()):
+            cell_x = x
+            color = Color.GREY.value if index == 0 else Color.BLACK.value
+            for column, (cell, width) in enumerate(zip(row, self.COLUMN_WIDTHS)):
+                text = font.render(cell, True, color)
+                screen.blit(text, (cell_x if column == 0 else cell_x + width - text.get_width() - 10, y))
+                cell_x += width
+            y += self.ROW_HEIGHT
+        hint = "  (M: hide panels)" if self.show_panels else "  (M: show panels)"
+        screen.blit(font.render(self.comparison.summary() + hint, True, Color.GREY.value), (x, y))
+        y += self.ROW_HEIGHT + self.PANEL_GAP
+
+        if not self.show_panels:
+            return area
+        width, height = self._panel_size
+        for index, designation in enumerate(self.comparison.designations):
+            panel_x = x + (index % self.PANEL_COLUMNS) * (width + self.PANEL_GAP)
+            panel_y = y + (index // self.PANEL_COLUMNS) * (height + self.ROW_HEIGHT + self.PANEL_GAP)
+            screen.blit(render_text(designation, 12, Color.BLACK.value), (panel_x, panel_y))
+            frame = pygame.Rect(panel_x, panel_y + self.ROW_HEIGHT - 2, width, height)
+            result = self.comparison.results.get(designation)
+            if result is not None and designation not in self._panels:
+                self._panels[designation] = self._render_panel(result)
+            if result is not None:
+                screen.blit(self._panels[designation], frame.topleft)
+            pygame.draw.rect(screen, Color.GREY.value, frame, 1)
+        return self.rect
+
+    def clear(self):
+        """Forgets the rendered panels, for a new comparison."""
+        self._panels = {}
@@ -1,6 +1,7 @@
 import pygame
 
 from utils.colors import Color
+from utils.fonts import render_text
 
 
 class ConfigLegend:
@@ -9,11 +10,14 @@ class ConfigLegend:
         self.position = position
         self.graph = graph
         self.configs = configs
-        self._cached_font = pygame.font.SysFont("Tahoma", 13)
+        self.stats = None  # SearchStats of the last finished search
 
     def update_configs(self, configs):
         self.configs = configs
 
+    def update_stats(self, stats):
+        self.stats = stats
+
     def draw(self, screen):
         x, y = self.position
         rect_width, rect_height = 100, 25
@@ -23,5 +27,11 @@ class ConfigLegend:
         for idx, (key, value) in enumerate(items):
             pygame.draw.rect(screen, Color.WHITE.value, (x, y + (idx + 1) * rect_height, rect_width, rect_height))
             text = f"{key}: {value}"
-            screen.blit(self._cached_font.render(text, True, Color.BLACK.value), (x, y + (idx + 1) * rect_height))
+            screen.blit(render_text(text, 13, Color.BLACK.value), (x, y + (idx + 1) * rect_height))
+
+        # Search statistics, in smaller rows under the configurations
+        if self.stats is not None:
+            stats_y = y + (len(items) + 1) * rect_height + 10
+            for idx, line in enumerate([f"Search: {self.stats.algorithm}"] + self.stats.lines()):
+                screen.blit(render_text(line, 12, Color.BLACK.value, Color.WHITE.value), (x, stats_y + idx * 16))
 
@@ -1,28 +1,50 @@
 import os
+import time
 import pygame
 import pygame_gui
 from pygame_gui.core import ObjectID
 from pygame_gui.elements import UIButton, UIDropDownMenu, UILabel
 
+from gui.comparison_view import ComparisonView
 from gui.config_legend import ConfigLegend
+from gui.loading_bar import LoadingBar
 from gui.options_window import OptionsWindow
+from gui.profiler_overlay import ProfilerOverlay
+from gui.timeline_bar import TimelineBar
 from src.algorithms import Algorithms
+from src.comparison import COMPARE_ALL, Comparison
+from src.graph_loader import GraphLoader
 from src.gui.color_legend import ColorLegend
 from src.gui.heuristics_table import HeuristicsTable
 from src.node import Node
+from src.playback import Playback, nodes_per_second
+from src.search_cache import SearchCache
+from src.search_executor import SearchExecutor
+from src.search_stats import SearchStats
 from src.search_visualizer import SearchVisualizer
 from src.utils.colors import Color
+from src.utils.frame_profiler import FrameProfiler
 from src.utils.map_renderer import MapRenderer
-from src.graph import Graph
 
 
 class GUIManager:
     def __init__(self, graph):
-        self.found_path = None
-        self.visit_order = None
+        self.found_path = None  # Set once the search is over
+        self.search_stats = None  # SearchStats of the running (or last finished) search
         self.graph = graph
         self.animation_completed = False
-        self._cached_font = pygame.font.SysFont("Tahoma", 16)
+        self._base_layer = None  # Background, bars, map and edges; rebuilt only when the graph changes
+        self._scene = None  # Base layer with the nodes and weight labels on top, updated in place
+        self._changed_nodes = set()  # Nodes whose state changed since the last draw
+        self._full_redraw = True
+        self._ui_dirty = True
+        self._was_hovering = False
+        self._panning = False
+        self._scrubbing = False
+        self._timeline_dirty = False
+        self._overlay_timer = 0.0
+        self._overlay_due = False
+        self._comparison_timer = 0.0
 
         # Ajustar se necessario
         self.window_size = (800, 800)
@@ -31,7 +53,6 @@ class GUIManager:
         self.DARKBLUE = (52, 73, 94)
         self.graph_margin = 100
         self.animation_speed = 50
-        self.animation_timer = 0
         self.legend_margin_left = 200
         self.heuristics_margin_left = 10
         self.heuristics_margin_top = 75
@@ -52,18 +73,45 @@ class GUIManager:
         self.manager = pygame_gui.UIManager(self.window_size, './gui/theme.json')
 
         # Inicializar motor
-        self.algorithms = Algorithms(self.graph)
+        self.search_cache_path = os.path.join(os.path.expanduser("~"), ".cache", "pymapz", "search_cache.json")
+        self.search_cache = SearchCache()
+        self.search_cache.load(self.search_cache_path)
+        self.algorithms = Algorithms(self.graph, self.search_cache)
         self.visualizer = SearchVisualizer(self.graph)
+        self.playback = Playback(self.visualizer, nodes_per_second(self.animation_speed))
+        self.search_executor = SearchExecutor()
+        self.background_search = True  # Run searches on the executor; offscreen rendering runs them inline
         self.heuristics_table = HeuristicsTable((self.heuristics_margin_left, self.heuristics_margin_top), graph)
         self.color_legend = ColorLegend(self.legend_margin_left, self.window_size[1] - 40, self.down)
 
         self.config_legend = ConfigLegend((self.window_size[0] - self.config_legend_margin_right - 150, self.config_legend_margin_top), graph, self.current_configs)
         self.options_window = OptionsWindow(self.manager, self.window_size, self.animation_speed)
 
+        # Frame profiler, shown with F3; the main loop and update/draw mark its phases
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = ProfilerOverlay(self.profiler, (self.window_size[0] - 10, self.down.top - 10))
+        self.trace_path = None  # Chrome trace written on shutdown, if set
+
+        # Search playback timeline, shown above the bottom bar once a search begins
+        timeline_rect = pygame.Rect(0, self.down.top - TimelineBar.HEIGHT, self.window_size[0], TimelineBar.HEIGHT)
+        self.timeline_bar = TimelineBar(self.playback, timeline_rect, self.DARKBLUE)
+
+        # "Compare all": every algorithm in worker processes, shown as a table over the map
+        self.comparison = Comparison()
+        comparison_rect = pygame.Rect(0, self.top.bottom, self.window_size[0], timeline_rect.top - self.top.bottom)
+        self.comparison_view = ComparisonView(self.comparison, comparison_rect)
+
+        # Graphs load (and other graph files prefetch) on a background thread, shown by a strip above the timeline
+        self.graph_loader = GraphLoader(self._prepare_graph)
+        loading_rect = pygame.Rect(0, timeline_rect.top - LoadingBar.HEIGHT, self.window_size[0], LoadingBar.HEIGHT)
+        self.loading_bar = LoadingBar(self.graph_loader, loading_rect, self.DARKBLUE)
+
         # Initialize map renderer and nodes
         self.map_renderer = MapRenderer(shapefile_path="./utils/maps/PRT_ADM1.shp", window_size=self.window_size, margin=self.graph_margin, manager=self.manager)
-        self.positions = self.map_renderer.map_positions(self.graph.nx_graph)
-        self.nodes = {name: Node(name, pos, self._cached_font) for name, pos in self.positions.items()}
+        self.map_renderer.viewport = pygame.Rect(0, self.top.bottom, self.window_size[0], self.down.top - self.top.bottom)
+        self.positions = self.map_renderer.map_positions(self.graph)
+        self.nodes = {node: Node(node.name, pos, node.heuristic) for node, pos in self.positions.items()}
+        self.comparison_view.set_layout(self.graph, self.positions, len(self.algorithms.designations))
 
         # UI elements configs
         space_between_elements = 10
@@ -85,7 +133,7 @@ class GUIManager:
 
         # Dropdown menu for algorithm choice
         self.algorithm_dropdown = UIDropDownMenu(
-            options_list=self.algorithms.designations,
+            options_list=self.algorithms.designations + [COMPARE_ALL],
             starting_option=self.algorithms.designations[0],
             relative_rect=pygame.Rect((left_start_x, 5), (200, 40)),
             manager=self.manager,
@@ -139,22 +187,27 @@ class GUIManager:
         )
 
     def process_events(self, event):
+        # Anything but a plain mouse move may change the UI; hovering is checked in update()
+        if event.type != pygame.MOUSEMOTION:
+            self._ui_dirty = True
+
         # Handle options window events first
         options_result = self.options_window.handle_event(event)
         if options_result:
             if options_result['type'] == 'speed_changed':
                 self.animation_speed = options_result['value']
+                self.playback.rate = nodes_per_second(self.animation_speed)
+                self._timeline_dirty = True
                 self.update_config_legend('Animation Speed', options_result['value'])
             elif options_result['type'] == 'graph_changed':
                 self.load_graph(options_result['value'][0])
-                self.update_config_legend('Graph', options_result['value'][0])
 
         if event.type == pygame.USEREVENT and event.user_type == pygame_gui.UI_BUTTON_PRESSED:
             if event.ui_element == self.begin_button:
-                self.reset()  # Reset the visualizer and algorithms before starting a new search
-                selected_algorithm = self.algorithm_dropdown.selected_option[0]
-                print("[ALGO] Begin search for search algorithm:", selected_algorithm)
-                self.visit_order, self.found_path = self.algorithms.perform_search(selected_algorithm, self.graph.start_node, self.graph.end_node)
+                if self.algorithm_dropdown.selected_option[0] == COMPARE_ALL:
+                    self.begin_comparison()
+                else:
+                    self.begin_search(self.algorithm_dropdown.selected_option[0])
 
             elif event.ui_element == self.options_button:
                 self.options_window.open_window()
@@ -164,6 +217,7 @@ class GUIManager:
                 self.reset()
 
             elif event.ui_element == self.exit_button:
+                self.shutdown()
                 pygame.quit()
                 print("[ROOT] pyMapz exited.")
                 exit()
@@ -172,50 +226,295 @@ class GUIManager:
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_h:  # Press 'h' to toggle heuristics table
                 self.heuristics_table.show = not self.heuristics_table.show
+            elif event.key == pygame.K_m and self.comparison_view.visible:  # Small multiples of the comparison
+                self.comparison_view.show_panels = not self.comparison_view.show_panels
+            elif event.key == pygame.K_F3:  # Frame profiler overlay
+                self.profiler.toggle_overlay()
+                self._overlay_timer = 0.0
+            elif event.key == pygame.K_F4:
+                self.export_trace()
+            elif event.key in (pygame.K_SPACE, pygame.K_COMMA, pygame.K_PERIOD):
+                self.process_playback_keys(event.key, event.mod)
+            else:
+                self.process_camera_keys(event.key)
+
+        # Map navigation: wheel zooms at the cursor, right or middle drag pans
+        elif event.type == pygame.MOUSEWHEEL:
+            mouse_pos = pygame.mouse.get_pos()
+            if self.map_renderer.viewport.collidepoint(mouse_pos) and not self.manager.get_hovering_any_element():
+                self.map_renderer.zoom_at(mouse_pos, 1.25 ** event.y)
+                self.invalidate_layers()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+            self._panning = self.map_renderer.viewport.collidepoint(event.pos) and not self.manager.get_hovering_any_element()
+        elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self._panning = False
+        elif event.type == pygame.MOUSEMOTION and self._panning:
+            self.map_renderer.pan_by(*event.rel)
+            self.invalidate_layers()
+
+        # Timeline: left click or drag seeks
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self._scrubbing = self.playback.active and self.timeline_bar.rect.collidepoint(event.pos)
+            if self._scrubbing:
+                self.seek(self.timeline_bar.position_at(event.pos[0]))
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self._scrubbing = False
+        elif event.type == pygame.MOUSEMOTION and self._scrubbing:
+            self.seek(self.timeline_bar.position_at(event.pos[0]))
 
         self.manager.process_events(event)
 
+    def process_camera_keys(self, key):
+        """'+'/'-' zoom, the arrow keys pan and '0' resets the map view."""
+        viewport = self.map_renderer.viewport
+        if key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.map_renderer.zoom_at(viewport.center, 1.25)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.map_renderer.zoom_at(viewport.center, 0.8)
+        elif key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+            step = 50
+            dx = step if key == pygame.K_LEFT else -step if key == pygame.K_RIGHT else 0
+            dy = step if key == pygame.K_UP else -step if key == pygame.K_DOWN else 0
+            self.map_renderer.pan_by(dx, dy)
+        elif key in (pygame.K_0, pygame.K_KP0, pygame.K_HOME):
+            self.map_renderer.reset_view()
+        else:
+            return
+        self.invalidate_layers()
+
+    def process_playback_keys(self, key, mod=0):
+        """Space pauses or resumes the playback; ',' and '.' step back and forth (10% of the timeline with Shift)."""
+        if not self.playback.active:
+            return
+        if key == pygame.K_SPACE:
+            self._sync_playback(self.playback.toggle_pause())
+            return
+        count = max(1, len(self.visualizer.order) // 10) if mod & pygame.KMOD_SHIFT else 1
+        self._sync_playback(self.playback.step(count if key == pygame.K_PERIOD else -count))
+
+    def seek(self, position):
+        """Pauses the playback and shows the first `position` expansions of the search."""
+        self.playback.paused = True
+        self._sync_playback(self.playback.seek(position))
+
     def update(self, time_delta):
         self.manager.update(time_delta)
-
-        # Process animation updates, if visit_order is set
-        if hasattr(self, 'visit_order') and self.visit_order:
-            self.animation_timer += time_delta * 1000  # Convert to milliseconds
-            animation_interval = max(50, 1000 - (self.animation_speed * 10))  # Adjust interval based on speed
-
-            if self.animation_timer >= animation_interval:
-                self.animation_timer = 0  # Reset timer
-
-                # Process the next node in visit_order
-                if self.visit_order:
-                    next_node_name = self.visit_order.pop(0)
-                    self.visualizer.add_visited_node(next_node_name)
-                    self.nodes[next_node_name].set_order(len(self.visualizer.visited_nodes))
-
-                # Check if the animation is completed
-                self.animation_completed = not self.visit_order
+        self.profiler.mark("ui_update")
+
+        # Hovered elements animate, so keep redrawing the UI while (and right after) the mouse is over one
+        hovering = self.manager.get_hovering_any_element()
+        if hovering or self._was_hovering:
+            self._ui_dirty = True
+        self._was_hovering = hovering
+
+        # Record the search ahead of the playback, then show as many expansions as the elapsed time calls for
+        if self.playback.active:
+            if self.playback.searching:
+                self._poll_search() if self.background_search else self.playback.buffer()
+                self._timeline_dirty = True
+            self._sync_playback(self.playback.advance(time_delta))
+
+        # Swap in a graph that finished loading
+        if self.graph_loader.loading:
+            for kind, payload in self.graph_loader.poll():
+                if kind == "loaded":
+                    self._swap_graph(payload)
+                else:
+                    print(f"[ERRO] Failed to load graph: {payload}")
+                self._ui_dirty = True
+
+        # Collect finished comparison runs, and refresh the elapsed time four times a second while they run
+        if self.comparison.running:
+            self._comparison_timer += time_delta
+            if self.comparison.poll() or self._comparison_timer >= 0.25:
+                self._comparison_timer = 0.0
+                self._ui_dirty = True
+        self.profiler.mark("animation")
+
+        # Refresh the profiler overlay twice a second
+        if self.profiler.show_overlay:
+            self._overlay_timer += time_delta
+            if self._overlay_timer >= 0.5:
+                self._overlay_timer = 0.0
+                self._overlay_due = True
+
+    def begin_search(self, algorithm, start_node=None, end_node=None):
+        """Starts animating a search; the nodes default to the graph's start and end nodes."""
+        self.reset()  # Reset the visualizer and algorithms before starting a new search
+        print("[ALGO] Begin search for search algorithm:", algorithm)
+        start_node = self.graph.start_node if start_node is None else start_node
+        end_node = self.graph.end_node if end_node is None else end_node
+        self.search_stats = SearchStats(algorithm)
+        self.playback.rate = nodes_per_second(self.animation_speed)
+        if self.background_search:
+            self.playback.start()
+            self.search_executor.submit(self.algorithms, algorithm, start_node, end_node, self.search_stats)
+        else:
+            self.playback.start(self.algorithms.search_steps(algorithm, start_node, end_node, self.search_stats))
+            self._sync_playback(self.playback.seek(1))  # Show the first expansion right away
+
+    def begin_comparison(self, start_node=None, end_node=None):
+        """Runs every algorithm on the same query in worker processes and shows their results side by side."""
+        self.reset()
+        print("[ALGO] Comparing all algorithms...")
+        start_node = self.graph.start_node if start_node is None else start_node
+        end_node = self.graph.end_node if end_node is None else end_node
+        try:
+            self.comparison.submit(self.graph.path, self.algorithms.designations, str(start_node), str(end_node))
+        except OSError as e:
+            print(f"[ERRO] Failed to start the comparison: {e}")
+            return
+        self.comparison_view.clear()
+        self.comparison_view.visible = True
+        self._comparison_timer = 0.0
+
+    def _poll_search(self):
+        """Records what the background search sent since the last frame."""
+        for kind, payload in self.search_executor.poll():
+            if kind == "steps":
+                self.playback.extend(payload)
+            elif kind == "done":
+                self.playback.finish(payload)
+            else:
+                print(f"[ERRO] Search failed: {payload}")
+                self.playback.finish([])
+        self.playback.status = self.search_executor.status
+
+    def _sync_playback(self, previous):
+        """
+        Brings the nodes, the path and the legends up to date after the playback moved from position `previous`.
+        Only the nodes that changed state are redrawn, unless there are more of them than visible nodes.
+        """
+        playback, position = self.playback, self.visualizer.position
+        if self.found_path is None and playback.found_path is not None:
+            self.found_path = playback.found_path
+            self.algorithms.found_path = self.found_path
+            print(f"[ALGO] Search finished: {self.search_stats.expanded} expanded, {self.search_stats.relaxed} edges "
+                  f"relaxed, {self.search_stats.wall_time * 1000:.2f} ms")
+
+        if position != previous:
+            self._timeline_dirty = True
+            if abs(position - previous) > len(self.map_renderer.visible_nodes):
+                self._scene = None
+            else:
+                self._changed_nodes.update(self.visualizer.order[min(position, previous):max(position, previous)])
+
+        if playback.finished != self.animation_completed:
+            self.animation_completed = playback.finished
+            self._changed_nodes.update(self.found_path)
+            if self.animation_completed:
+                self.config_legend.update_stats(self.search_stats)
+                self._ui_dirty = True
+
+    def idle_timeout(self):
+        """
+        Milliseconds the main loop may sleep waiting for events before the next frame is due,
+        or 0 while something animates.
+        """
+        if self._ui_dirty or self._was_hovering or self._timeline_dirty or self.playback.searching:
+            return 0
+        timeout = 500
+        if self.comparison.running:
+            timeout = max(0, int((0.25 - self._comparison_timer) * 1000))
+        next_step = self.playback.time_to_next_step()
+        if next_step is not None:
+            timeout = min(timeout, int(next_step * 1000))
+        if self.graph_loader.loading:
+            timeout = min(timeout, 50)  # Leaves the loader thread most of the interpreter
+        if self.profiler.show_overlay:
+            timeout = min(timeout, max(0, int((0.5 - self._overlay_timer) * 1000)))
+        return timeout
 
     def draw(self):
-        # Clear or fill the screen
-        self.screen.fill(self.background_color)
-        pygame.draw.rect(self.screen, self.DARKBLUE, self.top)  # Draw TOP BAR
-        pygame.draw.rect(self.screen, self.DARKBLUE, self.down)  # Draw DOWN BAR
-        # Draw map + edges + nodes in one shot
-        self.map_renderer.draw(
-            screen=self.screen,
+        """
+        Brings the screen up to date and returns the rects that changed, for pygame.display.update.
+
+        The scene (map, edges, nodes and weights) is kept between frames and only the areas of
+        nodes that changed are recomposited from the cached base layer. The UI overlay is drawn
+        over the whole screen only when it may have changed.
+        """
+        if self._base_layer is None:
+            self._base_layer = pygame.Surface(self.window_size)
+            self._base_layer.fill(self.background_color)
+            self.map_renderer.draw_static(self._base_layer, self.graph, self.nodes, radius=self.node_radius)
+            pygame.draw.rect(self._base_layer, self.DARKBLUE, self.top)  # Draw TOP BAR
+            pygame.draw.rect(self._base_layer, self.DARKBLUE, self.down)  # Draw DOWN BAR
+            self._scene = None
+
+        viewport = self.map_renderer.viewport
+        if self._scene is None:
+            self._scene = self._base_layer.copy()
+            self._update_nodes(self.map_renderer.visible_nodes)
+            self._scene.set_clip(viewport)
+            self.map_renderer.draw_dynamic(self._scene, self.nodes)
+            self._scene.set_clip(None)
+            self._changed_nodes.clear()
+            self._full_redraw = True
+
+        # Recomposite only the areas of the nodes that changed
+        dirty = []
+        if self._changed_nodes:
+            for rect in self._update_nodes(self._changed_nodes):
+                rect = rect.clip(viewport)
+                if not rect:
+                    continue
+                self._scene.blit(self._base_layer, rect, rect)
+                self._scene.set_clip(rect)
+                self.map_renderer.draw_dynamic(self._scene, self.nodes, area=rect)
+                self._scene.set_clip(None)
+                dirty.append(rect)
+            self._changed_nodes.clear()
+        self.profiler.mark("map_render")
+
+        rects = []
+        if self._full_redraw or self._ui_dirty:
+            area = self.screen.get_rect()
+        elif dirty:
+            area = dirty[0].unionall(dirty[1:]).clip(self.screen.get_rect())
+        else:
+            area = None
+
+        # Then draw your GUI overlays (buttons, legends, tables)
+        if area is not None:
+            self.screen.blit(self._scene, area, area)
+            self.screen.set_clip(area)
+            self.manager.draw_ui(self.screen)
+            self.color_legend.draw(self.screen)
+            if self.comparison_view.visible:
+                self.comparison_view.draw(self.screen)
+            else:
+                self.config_legend.draw(self.screen)
+                self.heuristics_table.draw(self.screen) if hasattr(self.heuristics_table, 'show') and self.heuristics_table.show else None
+            self.screen.set_clip(None)
+            self._full_redraw = self._ui_dirty = False
+            rects.append(area)
+
+        if self.playback.active and (area is not None or self._timeline_dirty):
+            rects.append(self.timeline_bar.draw(self.screen))
+        self._timeline_dirty = False
+        if self.graph_loader.loading:
+            rects.append(self.loading_bar.draw(self.screen))
+
+        if self.profiler.show_overlay and (rects or self._overlay_due):
+            rects.append(self.profiler_overlay.draw(self.screen))
+            self._overlay_due = False
+        self.profiler.mark("overlays")
+        return rects
+
+    def _update_nodes(self, changed):
+        return self.map_renderer.update_nodes(
             graph=self.graph,
             nodes=self.nodes,
+            changed=changed,
             visualizer=self.visualizer,
             found_path=self.found_path or [],
-            animation_done=self.animation_completed,
-            radius=self.node_radius
+            animation_done=self.animation_completed
         )
 
-        # Then draw your GUI overlays (buttons, legends, tables)
-        self.manager.draw_ui(self.screen)
-        self.color_legend.draw(self.screen)
-        self.config_legend.draw(self.screen)
-        self.heuristics_table.draw(self.screen) if hasattr(self.heuristics_table, 'show') and self.heuristics_table.show else None
+    def invalidate_layers(self):
+        """Drops the cached layers; the next draw rebuilds the whole frame."""
+        self._base_layer = None
+        self._scene = None
 
     def update_config_legend(self, key, value):
         """Updates the configuration legend when a configuration changes."""
@@ -223,45 +522,101 @@ class GUIManager:
         self.config_legend.update_configs(self.current_configs)
 
     def load_graph(self, graph_file):
-        """Loads a graph from a file and updates the visualizer and algorithms."""
-        try:
-            # Build the full path to the graph file
-            graph_path = os.path.join('./graphs', graph_file)
-
-            # Check if the graph file exists
-            if not os.path.exists(graph_path):
-                print(f"[ERRO] Arquivo de grafo não encontrado: {graph_path}")
-                return False
-
-            # Load the graph from the specified file
-            self.graph = Graph(graph_path)
-
-            # Update the visualizer and algorithms with the new graph
-            self.visualizer.set_graph(self.graph)
-            self.algorithms = Algorithms(self.graph)
-            self.heuristics_table = HeuristicsTable((self.heuristics_margin_left, self.heuristics_margin_top), self.graph)
-
-            # Update map nodes and positions
-            self.positions = self.map_renderer.map_positions(self.graph.nx_graph)
-            self.nodes = {name: Node(name, pos, self._cached_font) for name, pos in self.positions.items()}
-
-            # Reset the visualizer and algorithms
-            self.reset()
+        """
+        Starts loading a graph file in the background; update() swaps it in once ready.
+        Returns False if the file does not exist.
+        """
+        # Build the full path to the graph file
+        graph_path = os.path.join('./graphs', graph_file)
+
+        # Check if the graph file exists
+        if not os.path.exists(graph_path):
+            print(f"[ERRO] Arquivo de grafo não encontrado: {graph_path}")
+            return False
 
-            print(f"[GRAPH] Graph '{graph_file}' loaded successfully!")
-            return True
+        print(f"[GRAPH] Loading graph '{graph_file}'...")
+        self.graph_loader.load(graph_path)
+        self._ui_dirty = True
+        return True
+
+    def prefetch_graphs(self):
+        """Loads the other graph files of the Options window in the background, so switching to them is instant."""
+        current = os.path.abspath(self.graph.path)
+        paths = [os.path.join('./graphs', graph_file) for graph_file in self.options_window._get_graph_files()]
+        self.graph_loader.prefetch(path for path in paths if os.path.isfile(path) and os.path.abspath(path) != current)
+
+    def _prepare_graph(self, graph):
+        """Builds everything a graph needs on screen; runs on the loader thread, so it must not touch the shown state."""
+        graph.fingerprint()  # Search cache keys hash the graph; done here, it stays off the main thread
+        positions = self.map_renderer.map_positions(graph, adopt=False)
+        return {
+            "graph": graph,
+            "algorithms": Algorithms(graph, self.search_cache),
+            "positions": positions,
+            "nodes": {node: Node(node.name, pos, node.heuristic) for node, pos in positions.items()},
+        }
 
-        except Exception as e:
-            print(f"[ERRO] Failed to load graph '{graph_file}': {e}")
-            return False
+    def _swap_graph(self, prepared):
+        """Shows a graph prepared by the loader, keeping the previous one ready in case it is chosen again."""
+        self.reset()  # Stops the searches on the previous graph before it is kept
+        self.graph_loader.keep(self.graph.path, {"graph": self.graph, "algorithms": self.algorithms,
+                                                 "positions": self.positions, "nodes": self.nodes})
+        self.graph = prepared["graph"]
+
+        # Update the visualizer and algorithms with the new graph
+        self.visualizer.set_graph(self.graph)
+        self.algorithms = prepared["algorithms"]
+        self.heuristics_table = HeuristicsTable((self.heuristics_margin_left, self.heuristics_margin_top), self.graph)
+
+        # Update map nodes and positions
+        self.map_renderer.invalidate()
+        self.positions = prepared["positions"]
+        self.map_renderer.adopt_positions(self.positions)
+        self.nodes = prepared["nodes"]
+        self.comparison_view.set_layout(self.graph, self.positions, len(self.algorithms.designations))
+        self.invalidate_layers()
+
+        # Reset the visualizer and algorithms
+        self.reset()
+        self.update_config_legend('Graph', self.graph.get_graph_name())
+        print(f"[GRAPH] Graph '{self.graph.get_graph_name()}' loaded successfully!")
 
     def reset(self):
-        self.visualizer.clear_visited_nodes()  # Clear visited nodes
-        self.visit_order = []  # Reset visit_order
-        self.found_path = []  # Reset found path
+        self.search_executor.cancel()
+        self.comparison.cancel()
+        self.comparison_view.visible = False
+        self.playback.stop()  # Drop any running search and its timeline
+        self.search_stats = None
+        self.config_legend.update_stats(None)
+        self._ui_dirty = True
+        self.found_path = None  # Reset found path
         self.algorithms.found_path = []  # Reset found path in algorithms
         self.algorithms.visit_order = []  # Reset visit order in algorithms
         self.map_renderer.reset_animation()
         for node in self.nodes.values():
             node.reset_surf_order()
+        self._scene = None  # Any node may change back, so the dynamic layer is rebuilt from the visible ones
         self.animation_completed = False  # Reset animation completed flag
+
+    def export_trace(self, path=None):
+        """Writes the profiled frames as a Chrome trace, by default under ~/.cache/pymapz/traces."""
+        path = path or self.trace_path or os.path.join(os.path.expanduser("~"), ".cache", "pymapz", "traces",
+                                                       time.strftime("frames-%Y%m%d-%H%M%S.json"))
+        try:
+            frames = self.profiler.export_chrome_trace(path)
+            print(f"[INFO] Wrote {frames} profiled frames to {path}")
+        except OSError as e:
+            print(f"[ERRO] Failed to write frame trace: {e}")
+
+    def shutdown(self):
+        """Persists the search cache so the next run can reuse it, and writes the frame trace if one was asked for."""
+        self.search_executor.cancel()
+        self.comparison.close()
+        self.graph_loader.cancel()
+        try:
+            self.search_cache.save(self.search_cache_path)
+            print(f"[CACHE] Saved search cache {self.search_cache.stats()}")
+        except OSError as e:
+            print(f"[ERRO] Failed to save search cache: {e}")
+        if self.trace_path:
+            self.export_trace(self.trace_path)
@@ -1,6 +1,7 @@
 import pygame
 
 from utils.colors import Color
+from utils.fonts import render_text
 
 
 class HeuristicsTable:
@@ -8,7 +9,6 @@ class HeuristicsTable:
         self.position = position
         self.graph = graph
         self.show = False
-        self._cached_font = pygame.font.SysFont("Tahoma", 13)
 
     def draw(self, screen):
         if not self.show:
@@ -19,10 +19,10 @@ class HeuristicsTable:
 
         # Header
         pygame.draw.rect(screen, Color.WHITE.value, (x, y, rect_width, rect_height))
-        screen.blit(self._cached_font.render("Heuristics", True, Color.BLACK.value), (x + 3, y + 10))
+        screen.blit(render_text("Heuristics", 13, Color.BLACK.value), (x + 3, y + 10))
 
         # Display each node and its heuristic
         for idx, node in enumerate(self.graph.nodes.values()):
             pygame.draw.rect(screen, Color.WHITE.value, (x, y + (idx + 1) * rect_height, rect_width, rect_height))
-            text = f"{node.name}: {node.heuristic}"
-            screen.blit(self._cached_font.render(text, True, Color.BLACK.value), (x + 5, y + 10 + (idx + 1) * rect_height))
+            text = f"{node.name}: {node.heuristic:g}"
+            screen.blit(render_text(text, 13, Color.BLACK.value), (x + 5, y + 10 + (idx + 1) * rect_height))
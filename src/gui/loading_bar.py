@@ -0,0 +1,35 @@
+import os
+import time
+import pygame
+
+from utils.colors import Color
+from utils.fonts import get_font
+
+
+class LoadingBar:
+    """
+    Strip shown while a graph loads in the background: its name, the time spent so far and a sweeping block.
+    """
+    HEIGHT = 18
+
+    def __init__(self, loader, rect, background=Color.BLACK.value):
+        self.loader = loader
+        self.rect = rect
+        self.background = background
+
+    def draw(self, screen):
+        """Draws the strip and returns the rect it covers."""
+        pygame.draw.rect(screen, self.background, self.rect)
+        elapsed = time.perf_counter() - self.loader.started
+        text = f"Loading graph '{os.path.basename(self.loader.loading or '')}'... {elapsed:.1f} s"
+        # The time changes every frame, so it skips the shared text cache
+        label = get_font(12).render(text, True, Color.WHITE.value)
+        screen.blit(label, (self.rect.x + 8, self.rect.y + 3))
+
+        track = pygame.Rect(self.rect.x + label.get_width() + 18, self.rect.y + 5, 0, self.rect.height - 10)
+        track.width = self.rect.right - 10 - track.x
+        pygame.draw.rect(screen, Color.GREY.value, track)
+        block = pygame.Rect(0, track.y, 40, track.height)
+        block.x = track.x + round(elapsed * 80) % max(1, track.width - block.width)
+        pygame.draw.rect(screen, Color.GREEN.value, block)
+        return self.rect
@@ -97,7 +97,7 @@ class OptionsWindow:
 
         files = []
         for file in os.listdir(graph_dir):
-            if file.endswith(('.json', '.txt', '.graph')):
+            if file.endswith(('.json', '.txt', '.graph', '.pmz')):
                 files.append(file)
 
         return files if files else ["No graphs found"]
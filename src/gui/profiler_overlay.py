@@ -0,0 +1,38 @@
+import pygame
+
+from utils.colors import Color
+from utils.fonts import get_font
+
+
+class ProfilerOverlay:
+    """Frame-time percentiles and per-phase costs from a FrameProfiler, in a box anchored at its bottom-right corner."""
+    WIDTH = 270
+    LINE_HEIGHT = 15
+
+    def __init__(self, profiler, bottom_right):
+        self.profiler = profiler
+        self.bottom_right = bottom_right
+
+    def lines(self):
+        summary = self.profiler.summary()
+        if not summary["frames"]:
+            return ["Profiler: waiting for frames...", "F3: hide  F4: export trace"]
+        frame = summary["frame_ms"]
+        lines = [f"Frame ms over {summary['frames']} frames",
+                 f"p50 {frame['p50']:.1f} p95 {frame['p95']:.1f} p99 {frame['p99']:.1f} max {frame['max']:.1f}",
+                 f"{'phase':<12} {'mean':>7} {'p95':>7}"]
+        for phase, times in summary["phases_ms"].items():
+            lines.append(f"{phase:<12} {times['mean']:7.2f} {times['p95']:7.2f}")
+        lines.append("F3: hide  F4: export trace")
+        return lines
+
+    def draw(self, screen):
+        """Draws the overlay and returns the rect it covers."""
+        lines = self.lines()
+        font = get_font(12, "Consolas,Courier New")  # Numbers change every frame, so they skip the shared text cache
+        rect = pygame.Rect(0, 0, self.WIDTH, len(lines) * self.LINE_HEIGHT + 10)
+        rect.bottomright = self.bottom_right
+        pygame.draw.rect(screen, Color.BLACK.value, rect)
+        for idx, line in enumerate(lines):
+            screen.blit(font.render(line, True, Color.WHITE.value), (rect.x + 5, rect.y + 5 + idx * self.LINE_HEIGHT))
+        return rect
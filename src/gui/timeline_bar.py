@@ -0,0 +1,55 @@
+import time
+import pygame
+
+from utils.colors import Color
+from utils.fonts import get_font
+
+
+class TimelineBar:
+    """
+    Scrubbable timeline of the search playback: a strip with the shown part of the recorded expansions,
+    or what the search is doing while it has not expanded anything yet.
+    """
+    HEIGHT = 18
+    LABEL_WIDTH = 190
+
+    def __init__(self, playback, rect, background=Color.BLACK.value):
+        self.playback = playback
+        self.rect = rect
+        self.background = background
+        self.track = pygame.Rect(rect.x + self.LABEL_WIDTH, rect.y + 5, rect.width - self.LABEL_WIDTH - 10, rect.height - 10)
+
+    def position_at(self, x):
+        """Timeline position under screen column `x`."""
+        fraction = min(1.0, max(0.0, (x - self.track.x) / self.track.width))
+        return round(fraction * len(self.playback.visualizer.order))
+
+    def label(self):
+        playback, timeline = self.playback, self.playback.visualizer
+        if playback.searching and not timeline.order:
+            return f"{playback.status or 'Searching'}... {time.perf_counter() - playback.started:.1f} s"
+        state = "Paused" if playback.paused else "Done" if playback.finished else "Playing"
+        more = "+" if playback.searching else ""
+        return f"{state} {timeline.position}/{len(timeline.order)}{more} @ {playback.rate:,.0f}/s"
+
+    def draw(self, screen):
+        """Draws the strip and returns the rect it covers."""
+        timeline = self.playback.visualizer
+        pygame.draw.rect(screen, self.background, self.rect)
+        # Numbers change every frame, so they skip the shared text cache
+        label = get_font(12).render(self.label(), True, Color.WHITE.value)
+        screen.blit(label, (self.rect.x + 8, self.rect.y + 3))
+        if self.playback.searching and not timeline.order:
+            # Nothing to play yet: a block sweeping along the track, right of the (possibly long) label
+            track = self.track.clip(pygame.Rect(self.rect.x + label.get_width() + 18, self.rect.y, self.rect.width, self.rect.height))
+            pygame.draw.rect(screen, Color.GREY.value, track)
+            block = pygame.Rect(0, track.y, 40, track.height)
+            block.x = track.x + round((time.perf_counter() - self.playback.started) * 80) % max(1, track.width - block.width)
+            pygame.draw.rect(screen, Color.GREEN.value, block)
+            return self.rect
+        pygame.draw.rect(screen, Color.GREY.value, self.track)
+        if timeline.order:
+            shown = self.track.copy()
+            shown.width = round(self.track.width * timeline.position / len(timeline.order))
+            pygame.draw.rect(screen, Color.GREEN.value, shown)
+        return self.rect
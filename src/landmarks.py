@@ -0,0 +1,93 @@
+import heapq
+import numpy as np
+
+
+def shortest_distances(offsets, targets, weights, source):
+    """
+    One-to-all Dijkstra over CSR arrays.
+    Returns a float64 array of distances from `source`, inf where unreachable.
+    """
+    offsets, targets, weights = memoryview(offsets), memoryview(targets), memoryview(weights)
+    distances = np.full(len(offsets) - 1, np.inf)
+    settled = bytearray(len(offsets) - 1)
+    tentative = {source: 0.0}
+    heap = [(0.0, source)]
+
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        distances[node] = distance
+
+        for position in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[position]
+            if settled[neighbor]:
+                continue
+            new_distance = distance + weights[position]
+            if new_distance < tentative.get(neighbor, np.inf):
+                tentative[neighbor] = new_distance
+                heapq.heappush(heap, (new_distance, neighbor))
+
+    return distances
+
+
+class Landmarks:
+    """
+    ALT (A*, Landmarks, Triangle inequality) preprocessing for a Graph.
+
+    Stores, for a few landmark nodes L, the distances d(L, v) and d(v, L) to and from
+    every node as float32 arrays of shape (landmarks, nodes). By the triangle inequality
+    both d(L, t) - d(L, v) and d(v, L) - d(t, L) are lower bounds of d(v, t), so the
+    largest of them is an admissible heuristic towards any goal t.
+    """
+
+    def __init__(self, graph, count=8, seed=0):
+        n = graph.node_count
+        count = max(1, min(count, n))
+        forward = (graph.offsets, graph.targets, graph.weights)
+        backward = graph.reverse_adjacency()
+
+        self.landmark_ids = np.zeros(count, dtype=np.int32)
+        self.from_landmarks = np.zeros((count, n), dtype=np.float32)
+        self.to_landmarks = np.zeros((count, n), dtype=np.float32)
+
+        # Farthest-point selection: each new landmark is the node farthest from the
+        # ones already chosen (unreachable nodes first, so every component gets one)
+        seed_node = int(np.random.default_rng(seed).integers(n))
+        closest = shortest_distances(*forward, seed_node)
+        for index in range(count):
+            landmark = int(np.argmax(closest))
+            from_distances = shortest_distances(*forward, landmark)
+            self.landmark_ids[index] = landmark
+            self.from_landmarks[index] = from_distances
+            self.to_landmarks[index] = shortest_distances(*backward, landmark)
+            closest = from_distances if index == 0 else np.minimum(closest, from_distances)
+            closest[self.landmark_ids[:index + 1]] = -1
+
+        # float32 rounding may push a bound up by about one ulp of the largest distance
+        finite = np.concatenate((self.from_landmarks[np.isfinite(self.from_landmarks)],
+                                 self.to_landmarks[np.isfinite(self.to_landmarks)]))
+        largest = np.float32(finite.max()) if len(finite) else np.float32(0)
+        self.slack = 2 * float(np.spacing(largest))
+
+    @property
+    def count(self):
+        return len(self.landmark_ids)
+
+    @property
+    def nbytes(self):
+        return self.landmark_ids.nbytes + self.from_landmarks.nbytes + self.to_landmarks.nbytes
+
+    def heuristic(self, goal):
+        """
+        Returns a float64 array with an admissible estimate of d(v, goal) for every node v.
+        Nodes that provably cannot reach the goal get inf.
+        """
+        from_goal = self.from_landmarks[:, goal].astype(np.float64)[:, None]
+        to_goal = self.to_landmarks[:, goal].astype(np.float64)[:, None]
+        with np.errstate(invalid='ignore'):
+            # inf - inf (no information from that landmark) gives nan, which fmax ignores
+            bounds = np.fmax(from_goal - self.from_landmarks, self.to_landmarks - to_goal)
+            estimate = np.fmax.reduce(bounds, axis=0)
+        return np.maximum(np.nan_to_num(estimate, nan=0.0, posinf=np.inf) - self.slack, 0.0)
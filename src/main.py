@@ -1,47 +1,107 @@
+import argparse
+import json
+import os
+import time
+
+STARTED = time.perf_counter()  # Reference point of the startup timings
+
 import pygame
-from gui.gui_manager import GUIManager
 from graph import Graph
-import os
 
 
 class PyMapz:
     def __init__(self):
+        self.startup_times = {}  # Startup phase -> seconds since STARTED
+        self._mark_startup("imports")
         print("[ROOT] Starting pyGame...")
         pygame.init()
         pygame.display.set_caption('pyMapz v1.1 - A Python Graph Traversal Visualizer')
         pygame_icon = pygame.image.load('images/pygraphr-logo.jpeg')
         pygame.display.set_icon(pygame_icon)
+        self._mark_startup("pygame_init")
 
         # Load graph data
         self.graph_paths = "./graphs/graph.txt"
         self.graph = Graph(self.graph_paths)
+        self._mark_startup("graph_loaded")
 
-        # Initialize the GUI Manager
+        # Initialize the GUI Manager (pygame_gui and the map renderer are only imported here)
         print("[GUI] Starting GUI...")
+        from gui.gui_manager import GUIManager
         self.gui_manager = GUIManager(self.graph)
+        self._mark_startup("gui_ready")
         print("[GUI] GUI started successfully!")
 
-    def run(self):
+    def _mark_startup(self, phase):
+        self.startup_times[phase] = time.perf_counter() - STARTED
+
+    def run(self, exit_after_first_frame=False, prefetch=True):
         clock = pygame.time.Clock()
+        profiler = self.gui_manager.profiler
         is_running = True
 
         while is_running:
+            # Sleep until an event arrives or the next animation step is due, instead of spinning at 60 FPS
+            events = pygame.event.get()
+            timeout = self.gui_manager.idle_timeout()
+            if not events and timeout:
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    events = [event] + pygame.event.get()
+
             time_delta = clock.tick(60) / 1000.0
-            for event in pygame.event.get():
+            profiler.begin_frame()
+            for event in events:
                 if event.type == pygame.QUIT:
                     is_running = False
                 self.gui_manager.process_events(event)
+            profiler.mark("events")
 
             self.gui_manager.update(time_delta)
-            self.gui_manager.draw()
+            dirty_rects = self.gui_manager.draw()
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            profiler.mark("flip")
+            profiler.end_frame()
+
+            if "first_frame" not in self.startup_times:
+                self._mark_startup("first_frame")
+                self.startup_times["first_frame_epoch"] = time.time()
+                print(f"[ROOT] First frame after {self.startup_times['first_frame']:.2f} s.")
+                if exit_after_first_frame:
+                    is_running = False
+                elif prefetch:
+                    # Only now, so reading the other graph files does not delay the first frame
+                    self.gui_manager.prefetch_graphs()
 
-            pygame.display.flip()
+        self.gui_manager.shutdown()
 
 
-def main():
-    os.chdir(os.path.dirname(__file__))
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pymapz", description="pyMapz - A Python Graph Traversal Visualizer")
+    parser.add_argument("--startup-report", metavar="FILE", default=None,
+                        help="Write the startup timings as JSON to FILE after the first frame, then exit")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-phase frame timings from the start (F3 shows them, F4 exports a trace)")
+    parser.add_argument("--trace", metavar="FILE", default=None,
+                        help="Record frame timings and write them as a Chrome trace JSON to FILE on exit")
+    parser.add_argument("--prefetch-memory", metavar="MB", type=int, default=256,
+                        help="Memory for graphs loaded in the background but not shown: the other graph files and "
+                             "the ones shown before, so switching to them is instant (0 disables; default: 256)")
+    args = parser.parse_args(argv)
+    trace_path = os.path.abspath(args.trace) if args.trace else None
+    report_path = os.path.abspath(args.startup_report) if args.startup_report else None
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
     app = PyMapz()
-    app.run()
+    app.gui_manager.trace_path = trace_path
+    app.gui_manager.profiler.set_recording(args.profile or trace_path is not None)
+    app.gui_manager.graph_loader.memory_limit = max(0, args.prefetch_memory) * 1024 * 1024
+    app.run(exit_after_first_frame=report_path is not None, prefetch=args.prefetch_memory > 0)
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump(app.startup_times, file, indent=2)
 
 
 if __name__ == '__main__':
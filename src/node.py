@@ -1,6 +1,15 @@
-import pygame
 from utils.colors import Color
-from pygame import gfxdraw
+
+# pygame is only needed to draw: graphs built headless (batch, preprocessing) never import it.
+# _import_drawing() binds these on the first draw, so the per-node calls skip the import machinery.
+pygame = gfxdraw = render_text = None
+
+
+def _import_drawing():
+    global pygame, gfxdraw, render_text
+    import pygame
+    from pygame import gfxdraw
+    from utils.fonts import render_text
 
 
 class Node:
@@ -10,7 +19,6 @@ class Node:
         self.pos = pos
         self.heuristic = heuristic
         self.color = Color.BLUE.value
-        self._cached_font = pygame.font.SysFont("Tahoma", 12)
         self.visit_order = []
 
     def set_color(self, color):
@@ -20,12 +28,15 @@ class Node:
         self.visit_order = order
 
     def draw(self, screen):
+        if render_text is None:
+            _import_drawing()
+
         # Anti-aliased cirle nodes
         gfxdraw.aacircle(screen, self.pos[0], self.pos[1], self.radius, self.color)
         gfxdraw.filled_circle(screen, self.pos[0], self.pos[1], self.radius, self.color)
 
         # Draw node name
-        name_surf = self._cached_font.render(self.name, True, Color.BLACK.value, Color.WHITE.value)
+        name_surf = render_text(self.name, 12, Color.BLACK.value, Color.WHITE.value)
         tw, th = name_surf.get_size()
         name_x = self.pos[0] - tw // 2
         name_y = self.pos[1] - self.radius - th - 2  # 2px padding above circle
@@ -33,12 +44,26 @@ class Node:
 
         # Draw visit order (if any), centered below the circle
         if self.visit_order:
-            order_surf = self._cached_font.render(str(self.visit_order), True, Color.BLACK.value, Color.WHITE.value)
+            order_surf = render_text(self.visit_order, 12, Color.BLACK.value, Color.WHITE.value)
             ow, oh = order_surf.get_size()
             order_x = self.pos[0] - ow // 2
             order_y = self.pos[1] + self.radius + 2  # 2px padding below circle
             screen.blit(order_surf, (order_x, order_y))
 
+    def get_rect(self):
+        """Screen area covered by the circle and its labels, used to recomposite only what changed."""
+        if render_text is None:
+            _import_drawing()
+
+        x, y = self.pos
+        rect = pygame.Rect(x - self.radius - 1, y - self.radius - 1, 2 * self.radius + 3, 2 * self.radius + 3)
+        tw, th = render_text(self.name, 12, Color.BLACK.value, Color.WHITE.value).get_size()
+        rect.union_ip(pygame.Rect(x - tw // 2, y - self.radius - th - 2, tw, th))
+        if self.visit_order:
+            ow, oh = render_text(self.visit_order, 12, Color.BLACK.value, Color.WHITE.value).get_size()
+            rect.union_ip(pygame.Rect(x - ow // 2, y + self.radius + 2, ow, oh))
+        return rect
+
     def get_heuristic(self):
         return self.heuristic
 
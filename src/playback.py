@@ -0,0 +1,150 @@
+import time
+
+# Nodes per second at animation speed 50 (the default) and 100 (the options slider maximum)
+BASE_RATE = 2.0
+MAX_RATE = 50_000.0
+
+
+def nodes_per_second(speed):
+    """
+    Animation speed (1 to 100, as in the Options window) to nodes revealed per second. Up to 50 it
+    keeps the original pace of one node every 1000 - 10 * speed ms; above that the rate grows
+    exponentially up to MAX_RATE, so searches that expand 10^5 nodes play back in seconds.
+    """
+    if speed <= 50:
+        return 1000.0 / (1000 - 10 * speed)
+    return BASE_RATE * (MAX_RATE / BASE_RATE) ** ((min(speed, 100) - 50) / 50)
+
+
+class Playback:
+    """
+    Plays a search back on the SearchVisualizer timeline.
+
+    Expansions are recorded ahead of the shown position, either pushed by a SearchExecutor
+    (extend and finish) or pulled from the search's step generator, a few milliseconds per frame
+    (buffer) or on demand when seeking past the recording. advance() moves the shown position at
+    `rate` nodes per second, applying as many steps per frame as the elapsed time calls for, so
+    playback speed does not depend on the frame rate.
+    """
+
+    def __init__(self, visualizer, rate=BASE_RATE):
+        self.visualizer = visualizer
+        self.rate = rate
+        self.paused = False
+        self.found_path = None  # Set once the search is over
+        self.status = None  # What the search is doing, shown while it runs
+        self.started = None  # perf_counter() when the search started
+        self._searching = False
+        self._steps = None
+        self._owed = 0.0  # Fraction of a step carried over to the next frame
+
+    def start(self, steps=None):
+        """
+        Plays back a new search. Given its step generator, expansions are pulled from it as needed,
+        which keeps the playback deterministic for offscreen rendering; otherwise they arrive
+        through extend() and finish().
+        """
+        self.stop()
+        self._steps = steps
+        self._searching = True
+        self.started = time.perf_counter()
+
+    def extend(self, nodes):
+        """Records expansions produced elsewhere."""
+        record = self.visualizer.record
+        for node in nodes:
+            record(node)
+
+    def finish(self, found_path):
+        """Ends the recording: the search is over and found `found_path`."""
+        self.found_path = found_path
+        self.status = None
+        self._searching = False
+        self._steps = None
+
+    def stop(self):
+        """Drops the search and its timeline."""
+        if self._steps is not None:
+            self._steps.close()
+        self._steps = None
+        self._searching = False
+        self.found_path = None
+        self.status = None
+        self.paused = False
+        self._owed = 0.0
+        self.visualizer.clear_visited_nodes()
+
+    @property
+    def active(self):
+        """Whether there is a timeline to play."""
+        return self._searching or self.found_path is not None
+
+    @property
+    def searching(self):
+        """Whether the search still has expansions to record."""
+        return self._searching
+
+    @property
+    def finished(self):
+        """Whether the search is over and its whole timeline is shown."""
+        return self.found_path is not None and self.visualizer.position == len(self.visualizer.order)
+
+    def _record(self, count):
+        """Records up to `count` more expansions. Returns False once the search is over."""
+        steps, record = self._steps, self.visualizer.record
+        if steps is None:
+            return False
+        try:
+            for _ in range(count):
+                record(next(steps))
+        except StopIteration as stop:
+            # The generator returns the found path once the search is over
+            self.finish(stop.value)
+            return False
+        return True
+
+    def buffer(self, budget=0.004):
+        """Records expansions ahead of the shown position for up to `budget` seconds."""
+        deadline = time.perf_counter() + budget
+        while self._record(64) and time.perf_counter() < deadline:
+            pass
+
+    def seek(self, position):
+        """Shows the first `position` expansions, recording more if needed. Returns the previous position."""
+        timeline = self.visualizer
+        if position > len(timeline.order):
+            self._record(position - len(timeline.order))
+        previous = timeline.position
+        timeline.position = max(0, min(position, len(timeline.order)))
+        return previous
+
+    def step(self, count=1):
+        """Pauses and moves `count` expansions forwards (or backwards, if negative)."""
+        self.paused = True
+        self._owed = 0.0
+        return self.seek(self.visualizer.position + count)
+
+    def toggle_pause(self):
+        """Pauses or resumes; resuming a finished playback starts it over. Returns the previous position."""
+        previous = self.visualizer.position
+        if self.paused and self.finished:
+            self.seek(0)
+        self.paused = not self.paused
+        self._owed = 0.0
+        return previous
+
+    def advance(self, time_delta):
+        """Moves the playback clock by `time_delta` seconds. Returns the previous position."""
+        position = self.visualizer.position
+        if self.paused or not self.active or self.finished:
+            return position
+        self._owed += time_delta * self.rate
+        count = int(self._owed)
+        self._owed -= count
+        return self.seek(position + count) if count else position
+
+    def time_to_next_step(self):
+        """Seconds until advance() shows another node, or None while nothing plays."""
+        if self.paused or not self.active or self.finished:
+            return None
+        return max(0.0, (1.0 - self._owed) / self.rate)
@@ -0,0 +1,276 @@
+"""
+Offscreen rendering of search animations.
+
+Drives GUIManager.update/draw with SDL's dummy video driver and a fixed simulated timestep,
+so a clip has exactly the frames the window would show at that frame rate, however long
+each frame takes to render. Every run writes either
+
+* ``png``: a directory of numbered PNG frames,
+* ``raw``: raw frames to a file, or to stdout with ``-o -`` (the pixel format is printed), or
+* ``video``: raw frames piped into ffmpeg, which must be on the PATH.
+
+Frames are read straight from the window surface's pixel buffer: nothing is allocated per frame.
+Several runs (one per algorithm by default) are spread over worker processes, each loading
+the graph and building its GUI once.
+
+    python render_export.py graphs/graph.txt -a "A*" -a Dijkstra -f video -o "clips/{index:02d}-{slug}.mp4"
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_gui_manager = None  # Per-process GUI, set by _init_worker
+
+
+def _init_worker(graph_path):
+    """
+    Opens the dummy display and builds the GUI for the graph once in the current process.
+    Resource paths in the GUI are relative to src/, and its log messages go to stderr.
+    """
+    global _gui_manager
+    import pygame
+    from graph import Graph
+
+    # gui_manager imports through the "src." package, so the repository root must be importable too
+    root = os.path.dirname(SRC_DIR)
+    if root not in sys.path:
+        sys.path.append(root)
+    os.chdir(SRC_DIR)
+    with redirect_stdout(sys.stderr):
+        pygame.init()
+        from gui.gui_manager import GUIManager
+        _gui_manager = GUIManager(Graph(graph_path))
+
+
+def pixel_format(surface):
+    """
+    ffmpeg name of the surface's byte layout, e.g. 'bgr0' for little-endian XRGB8888.
+    """
+    if surface.get_bytesize() != 4:
+        raise ValueError(f"Unsupported {surface.get_bitsize()}-bit surface")
+    channels = ['0'] * 4
+    for letter, mask in zip("rgba", surface.get_masks()):
+        if mask:
+            shift = (mask & -mask).bit_length() - 1
+            byte = shift // 8 if sys.byteorder == 'little' else 3 - shift // 8
+            channels[byte] = letter
+    return "".join(channels)
+
+
+def _write_surface(stream, surface):
+    """
+    Writes the surface pixels, row by row only when rows are padded.
+    """
+    buffer = memoryview(surface.get_buffer()).cast('B')
+    width, height = surface.get_size()
+    row_bytes, pitch = width * surface.get_bytesize(), surface.get_pitch()
+    if pitch == row_bytes:
+        stream.write(buffer)
+    else:
+        for row in range(height):
+            stream.write(buffer[row * pitch:row * pitch + row_bytes])
+
+
+class _PngWriter:
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "frame_{:06d}.png")
+        self.frames = 0
+
+    def write(self, surface):
+        import pygame
+
+        pygame.image.save(surface, self.path.format(self.frames))
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+class _RawWriter:
+    def __init__(self, stream, process=None):
+        self.stream = stream
+        self.process = process
+        self.frames = 0
+
+    def write(self, surface):
+        _write_surface(self.stream, surface)
+        self.frames += 1
+
+    def close(self):
+        self.stream.flush()
+        if self.process is not None:
+            self.stream.close()
+            if self.process.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+        elif self.stream is not sys.stdout.buffer:
+            self.stream.close()
+
+
+def _open_writer(output_format, output, surface, fps):
+    if output_format == "png":
+        return _PngWriter(output)
+    if output_format == "raw":
+        if output == "-":
+            return _RawWriter(sys.stdout.buffer)
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        return _RawWriter(open(output, 'wb'))
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("Video output needs ffmpeg on the PATH (or use --format raw and encode separately)")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    width, height = surface.get_size()
+    process = subprocess.Popen([ffmpeg, "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", pixel_format(surface),
+                                "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                                "-pix_fmt", "yuv420p", output], stdin=subprocess.PIPE)
+    return _RawWriter(process.stdin, process)
+
+
+def render_run(job):
+    """
+    Renders one search animation in the current worker. Returns a summary dict.
+    """
+    algorithm, start, end, output, options = job
+    gui = _gui_manager
+    graph = gui.graph
+    result = {"algorithm": algorithm, "output": output}
+    if algorithm not in gui.algorithms.designations:
+        result["error"] = f"Unknown algorithm '{algorithm}'"
+        return result
+    for name in (start, end):
+        if name is not None and name not in graph.node_ids:
+            result["error"] = f"Unknown node '{name}'"
+            return result
+
+    started = time.perf_counter()
+    time_delta = 1.0 / options["fps"]
+    gui.animation_speed = options["speed"]
+    gui.background_search = False  # Record the search inline, so every frame shows the same step on every run
+    with redirect_stdout(sys.stderr):
+        gui.begin_search(algorithm,
+                         None if start is None else graph.nodes[start],
+                         None if end is None else graph.nodes[end])
+
+    writer = _open_writer(options["format"], output, gui.screen, options["fps"])
+    try:
+        max_frames = int(options["max_seconds"] * options["fps"])
+        hold_frames = int(options["hold"] * options["fps"])
+        while writer.frames < max_frames:
+            with redirect_stdout(sys.stderr):
+                gui.update(time_delta)
+            gui.draw()
+            writer.write(gui.screen)
+            if gui.animation_completed:
+                hold_frames -= 1
+                if hold_frames < 0:
+                    break
+    finally:
+        writer.close()
+
+    result["found"] = bool(gui.found_path)
+    result["expanded"] = gui.visualizer.position
+    result["frames"] = writer.frames
+    result["truncated"] = not gui.animation_completed
+    result["seconds"] = time.perf_counter() - started
+    result["stats"] = gui.search_stats.as_dict()
+    if options["format"] == "raw":
+        width, height = gui.screen.get_size()
+        result["raw_format"] = f"{pixel_format(gui.screen)} {width}x{height} @ {options['fps']} fps"
+    return result
+
+
+def _slug(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or "run"
+
+
+def render_all(graph_path, algorithms, start=None, end=None, output_template="renders/{index:02d}-{slug}",
+               output_format="png", workers=None, fps=30, speed=50, hold=1.0, max_seconds=300):
+    """
+    Renders one clip per algorithm, in parallel when workers > 1. Checks the options right away
+    and returns an iterator over the run summaries, in order.
+    `output_template` may use {index}, {algorithm} and {slug}; for video it must end with the file extension.
+    """
+    graph_path = os.path.abspath(graph_path)
+    options = {"format": output_format, "fps": fps, "speed": speed, "hold": hold, "max_seconds": max_seconds}
+    jobs = []
+    for index, algorithm in enumerate(algorithms):
+        output = output_template.format(index=index, algorithm=algorithm, slug=_slug(algorithm))
+        if output_format == "raw" and output != "-" and not os.path.splitext(output)[1]:
+            output += ".raw"
+        jobs.append((algorithm, start, end, output if output == "-" else os.path.abspath(output), options))
+
+    if output_format == "video" and shutil.which("ffmpeg") is None:
+        raise RuntimeError("Video output needs ffmpeg on the PATH (or use --format raw and encode separately)")
+    if output_format == "raw" and any(job[3] == "-" for job in jobs) and (len(jobs) > 1 or (workers or 1) > 1):
+        raise ValueError("Raw frames go to stdout for a single run with a single worker only")
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    return _render_jobs(graph_path, jobs, workers)
+
+
+def _render_jobs(graph_path, jobs, workers):
+    if workers == 1:
+        _init_worker(graph_path)
+        yield from map(render_run, jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph_path,)) as executor:
+            yield from executor.map(render_run, jobs)
+
+
+def main(argv=None):
+    from algorithms import Algorithms
+
+    parser = argparse.ArgumentParser(prog="pymapz-render", description="Render pyMapz search animations offscreen.")
+    parser.add_argument("graph", help="Graph file to load")
+    parser.add_argument("-a", "--algorithm", action="append", default=None,
+                        help="Algorithm to render; repeat for several clips (default: all of them)")
+    parser.add_argument("--start", default=None, help="Start node (default: the graph's)")
+    parser.add_argument("--end", default=None, help="End node (default: the graph's)")
+    parser.add_argument("-f", "--format", choices=("png", "raw", "video"), default="png", help="Output kind (default: png)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output path template with {index}, {algorithm} and {slug} (default: renders/{index:02d}-{slug})")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--fps", type=int, default=30, help="Simulated frames per second (default: 30)")
+    parser.add_argument("--speed", type=int, default=50, help="Animation speed, 1 to 100, as in the Options window (default: 50)")
+    parser.add_argument("--hold", type=float, default=1.0, help="Seconds to keep showing the found path (default: 1)")
+    parser.add_argument("--max-seconds", type=float, default=300, help="Longest clip, in simulated seconds (default: 300)")
+    args = parser.parse_args(argv)
+
+    output = args.output or ("renders/{index:02d}-{slug}" + (".mp4" if args.format == "video" else ""))
+    algorithms = args.algorithm or Algorithms(None).designations
+    try:
+        results = render_all(args.graph, algorithms, args.start, args.end, output, args.format, args.workers,
+                             args.fps, args.speed, args.hold, args.max_seconds)
+    except (RuntimeError, ValueError) as e:
+        parser.error(str(e))
+
+    failed = 0
+    for result in results:
+        if "error" in result:
+            failed += 1
+            print(f"[RENDER] {result['algorithm']}: {result['error']}", file=sys.stderr)
+            continue
+        note = " (truncated)" if result["truncated"] else ""
+        raw = f", {result['raw_format']}" if "raw_format" in result else ""
+        print(f"[RENDER] {result['algorithm']}: {result['frames']} frames{note} in {result['seconds']:.2f} s "
+              f"-> {result['output']}{raw}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
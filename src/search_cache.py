@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class SearchCache:
+    """
+    Bounded LRU cache of search results.
+
+    Entries are keyed by (graph fingerprint, algorithm designation, start name, end name)
+    and store the visit order and found path as node names, so they stay valid for any
+    Graph object with the same contents and can be written to disk as JSON. A graph whose
+    contents change gets a new fingerprint, so stale results are never served.
+
+    The cache is bounded by the node names it holds as well as by entries: searches that expand
+    more than `max_visit_order` nodes are not cached at all, and the least recently used entries
+    are evicted while the visit orders and paths add up to more than `max_nodes` names.
+
+    Searches running on worker threads store their results while the main thread reads or
+    saves the cache, so every access to the entries holds a lock.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, max_entries=1024, max_nodes=1_000_000, max_visit_order=100_000):
+        self.max_entries = max_entries
+        self.max_nodes = max_nodes
+        self.max_visit_order = max_visit_order
+        self.entries = OrderedDict()
+        self.nodes = 0  # Node names held by all the entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(graph, search_type, start_node, end_node):
+        return graph.fingerprint(), search_type, str(start_node), str(end_node)
+
+    def get(self, graph, search_type, start_node, end_node):
+        """
+        Returns the cached (visit_order, found_path) as Node objects of `graph`, or None.
+        """
+        key = self.make_key(graph, search_type, start_node, end_node)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        visit_order, found_path = entry
+        return [graph.nodes[name] for name in visit_order], [graph.nodes[name] for name in found_path]
+
+    def put(self, graph, search_type, start_node, end_node, visit_order, found_path):
+        key = self.make_key(graph, search_type, start_node, end_node)
+        self.put_entry(key, [str(node) for node in visit_order], [str(node) for node in found_path])
+
+    def put_entry(self, key, visit_order, found_path):
+        """
+        Stores an entry whose visit order and path are already lists of node names,
+        unless the visit order is longer than max_visit_order.
+        """
+        if len(visit_order) > self.max_visit_order:
+            return
+        key, entry = tuple(key), (tuple(visit_order), tuple(found_path))
+        with self._lock:
+            self._drop(key)
+            self.entries[key] = entry
+            self.nodes += len(visit_order) + len(found_path)
+            while self.entries and (len(self.entries) > self.max_entries or self.nodes > self.max_nodes):
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        """Removes an entry; the caller holds the lock."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.nodes -= len(entry[0]) + len(entry[1])
+
+    def invalidate(self, fingerprint=None):
+        """
+        Drops every entry of the graph with the given fingerprint, or everything if None.
+        """
+        with self._lock:
+            if fingerprint is None:
+                self.entries.clear()
+                self.nodes = 0
+                return
+            for key in [key for key in self.entries if key[0] == fingerprint]:
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.entries), "nodes": self.nodes, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def save(self, path):
+        """
+        Writes the entries to a JSON file, least recently used first.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            entries = list(self.entries.items())
+        data = {
+            "version": self.FORMAT_VERSION,
+            "entries": [[*key, list(visit_order), list(found_path)] for key, (visit_order, found_path) in entries],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """
+        Merges the entries of a file written by save(). Missing or outdated files are ignored.
+        Returns the number of entries loaded.
+        """
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"[CACHE] Ignoring unreadable search cache '{path}': {e}")
+            return 0
+        if data.get("version") != self.FORMAT_VERSION:
+            return 0
+
+        for *key, visit_order, found_path in data["entries"]:
+            self.put_entry(key, visit_order, found_path)
+        return len(data["entries"])
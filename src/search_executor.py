@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+
+# Expansions are sent to the main thread in batches of this size, or sooner after BATCH_SECONDS
+BATCH_SIZE = 512
+BATCH_SECONDS = 0.02
+
+
+class SearchExecutor:
+    """
+    Runs searches on a background thread, so the pygame event loop never waits for them.
+
+    submit() starts a job that drains the algorithm's step generator on a worker thread, after
+    building any preprocessing it needs (landmarks, contraction hierarchy). Its expansions come
+    back in batches through a queue, and poll() hands them over on the main thread as
+    ("steps", nodes), ("done", found_path) and ("error", message) messages.
+
+    One job runs at a time: submitting or cancel() stops the previous one at its next step and
+    drops whatever it still had queued. A preprocessing build cannot be interrupted; it finishes
+    in the background and its result stays on the graph, and a job that needs the same build waits
+    for it instead of starting another one.
+    """
+
+    def __init__(self):
+        self.status = None  # What the running job is doing, for the progress indicator
+        self.started = None  # perf_counter() when the running job was submitted
+        self._messages = queue.SimpleQueue()
+        self._job = 0
+        self._cancel = None
+        self._preprocessing = threading.Lock()
+
+    @property
+    def running(self):
+        return self._cancel is not None
+
+    def submit(self, algorithms, search_type, start_node, end_node, stats=None):
+        """Starts a search, cancelling the running one."""
+        self.cancel()
+        self._job += 1
+        self._cancel = threading.Event()
+        self.started = time.perf_counter()
+        self.status = "Starting"
+        worker = threading.Thread(target=self._run, name=f"pymapz-search-{self._job}", daemon=True,
+                                  args=(self._job, self._cancel, algorithms, search_type, start_node, end_node, stats))
+        worker.start()
+
+    def cancel(self):
+        """Stops the running job, if any; its pending messages are dropped."""
+        if self._cancel is not None:
+            self._cancel.set()
+        self._cancel = None
+        self.status = None
+
+    def poll(self):
+        """
+        Returns the messages of the running job that arrived since the last poll, without waiting.
+        """
+        messages = []
+        while True:
+            try:
+                job, kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                return messages
+            if job != self._job or self._cancel is None:
+                continue  # From a cancelled job
+            if kind == "status":
+                self.status = payload
+                continue
+            if kind != "steps":
+                self._cancel, self.status = None, None
+            messages.append((kind, payload))
+
+    def _run(self, job, cancel, algorithms, search_type, start_node, end_node, stats):
+        send = self._messages.put
+        try:
+            if algorithms.pending_preprocessing(search_type):
+                send((job, "status", f"Waiting to build {algorithms.pending_preprocessing(search_type)}"))
+                with self._preprocessing:
+                    pending = algorithms.pending_preprocessing(search_type)
+                    if pending and not cancel.is_set():
+                        send((job, "status", f"Building {pending}"))
+                        algorithms.preprocess(search_type)
+            if cancel.is_set():
+                return
+            send((job, "status", "Searching"))
+
+            steps = algorithms.search_steps(search_type, start_node, end_node, stats)
+            batch, flushed = [], time.perf_counter()
+            while not cancel.is_set():
+                try:
+                    batch.append(next(steps))
+                except StopIteration as stop:
+                    # The generator returns the found path once the search is over
+                    send((job, "steps", batch))
+                    send((job, "done", stop.value))
+                    return
+                if len(batch) >= BATCH_SIZE or time.perf_counter() - flushed >= BATCH_SECONDS:
+                    send((job, "steps", batch))
+                    batch, flushed = [], time.perf_counter()
+            steps.close()
+        except Exception as e:
+            send((job, "error", f"{type(e).__name__}: {e}"))
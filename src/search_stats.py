@@ -0,0 +1,75 @@
+import sys
+
+# Estimated bytes per priority queue entry: the list slot plus a (priority, node) tuple
+HEAP_ENTRY_BYTES = 8 + sys.getsizeof((0.0, 0))
+# Bytes per entry of a deque or list of node ids
+QUEUE_ENTRY_BYTES = 8
+
+
+class SearchStats:
+    """
+    Work done by one search run.
+
+    The search generators count their own work (edges relaxed, heap operations, peak frontier,
+    memory); Algorithms.search_steps adds what can be seen from outside: nodes expanded, wall
+    time spent inside the search and the cost of the found path. A result replayed from the
+    SearchCache does no search work, so only its expanded, path and cost fields are filled in.
+
+    `memory_bytes` is an estimate of the peak size of the search structures: the containers
+    themselves (sys.getsizeof) plus the frontier at its largest, not the numbers they hold.
+    """
+
+    FIELDS = ("algorithm", "found", "cost", "path_length", "expanded", "relaxed", "heap_pushes", "heap_pops",
+              "peak_frontier", "memory_bytes", "wall_time", "cached")
+
+    def __init__(self, algorithm=None):
+        self.algorithm = algorithm
+        self.found = False
+        self.cost = None
+        self.path_length = 0
+        self.expanded = 0  # Nodes yielded by the search
+        self.relaxed = 0  # Edges examined out of expanded nodes
+        self.heap_pushes = 0  # Frontier insertions (heap, queue or stack)
+        self.heap_pops = 0  # Frontier removals, including stale entries
+        self.peak_frontier = 0
+        self.memory_bytes = 0
+        self.wall_time = 0.0  # Seconds spent inside the search, excluding the caller's work between steps
+        self.cached = False
+
+    def add_work(self, relaxed=0, pushes=0, pops=0, peak_frontier=0, memory_bytes=0):
+        """Called by the search generators when they finish or are closed."""
+        self.relaxed += int(relaxed)  # May be a NumPy integer from the CSR offsets
+        self.heap_pushes += pushes
+        self.heap_pops += pops
+        self.peak_frontier = max(self.peak_frontier, peak_frontier)
+        self.memory_bytes = max(self.memory_bytes, int(memory_bytes))
+
+    def finish(self, graph, found_path):
+        self.found = bool(found_path)
+        self.path_length = len(found_path)
+        self.cost = graph.path_cost(found_path) if found_path else None
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def lines(self):
+        """Short "label: value" lines for the GUI legends."""
+        cost = "-" if self.cost is None else f"{self.cost:g}"
+        lines = [f"Expanded: {self.expanded}", f"Path cost: {cost}"]
+        if self.cached:
+            return lines + ["Replayed from cache"]
+        return lines + [
+            f"Edges relaxed: {self.relaxed}",
+            f"Heap push/pop: {self.heap_pushes}/{self.heap_pops}",
+            f"Peak frontier: {self.peak_frontier}",
+            f"Memory: {self.memory_bytes / 1024:.1f} KB",
+            f"Search time: {self.wall_time * 1000:.2f} ms",
+        ]
+
+    def __repr__(self):
+        return f"SearchStats({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
+
+
+def container_bytes(*containers):
+    """Shallow size of the given containers, in bytes."""
+    return sum(sys.getsizeof(container) for container in containers)
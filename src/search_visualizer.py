@@ -1,13 +1,42 @@
 class SearchVisualizer:
+    """
+    Timeline of the animated search: every node expanded so far, in order, and how many of
+    them are shown.
+
+    The first index of every node in `order` is kept as it is recorded, so whether a node is
+    visited at the shown position, and the number it shows, is a single lookup. Moving the
+    position backwards or forwards never replays the search.
+    """
+
     def __init__(self, graph):
         self.graph = graph
-        self.visited_nodes = []
+        self.order = []  # Recorded expansions, possibly ahead of what is shown
+        self.position = 0  # Expansions shown
+        self._rank = {}  # Node -> first index in order
+
+    def record(self, node):
+        """Appends an expansion to the timeline without showing it."""
+        self._rank.setdefault(node, len(self.order))
+        self.order.append(node)
 
     def add_visited_node(self, node):
-        self.visited_nodes.append(node)
+        """Records an expansion and shows the whole timeline."""
+        self.record(node)
+        self.position = len(self.order)
+
+    def is_visited(self, node):
+        rank = self._rank.get(node)
+        return rank is not None and rank < self.position
+
+    def visit_number(self, node):
+        """1-based expansion number of the node at the shown position, or None if it is not visited yet."""
+        rank = self._rank.get(node)
+        return rank + 1 if rank is not None and rank < self.position else None
 
     def clear_visited_nodes(self):
-        self.visited_nodes.clear()
+        self.order.clear()
+        self._rank.clear()
+        self.position = 0
 
     def set_graph(self, graph):
         self.graph = graph
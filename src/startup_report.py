@@ -0,0 +1,148 @@
+"""
+Startup-time report for pyMapz.
+
+Measures, each in a fresh interpreter:
+
+* the import-time breakdown of ``main`` (``python -X importtime``), as self time summed
+  per top-level package, so the rows add up to the total;
+* which heavy packages the headless entry points (batch, graph_io, contraction) pull in,
+  which should be none of the GUI or map stack;
+* the time to the first frame, from process spawn, with the phases recorded by PyMapz
+  (imports, pygame init, graph load, GUI build, first frame).
+
+Run ``python startup_report.py [--repeat 5] [--json report.json] [--budget 2.5]``. With
+--budget, the exit status is 1 when the median time to first frame exceeds it, so the
+report can guard against regressions. SDL's dummy video driver is used unless --window.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+HEADLESS_MODULES = ("batch", "graph_io", "contraction")
+HEAVY_PACKAGES = ("pygame", "pygame_gui", "geopandas", "shapely", "pandas", "pyogrio", "networkx", "matplotlib", "scipy")
+
+
+def _environment(window=False):
+    env = dict(os.environ)
+    # gui_manager imports through the "src." package, so the repository root goes on the path too
+    paths = [SRC_DIR, os.path.dirname(SRC_DIR)] + [path for path in env.get("PYTHONPATH", "").split(os.pathsep) if path]
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    if not window:
+        env["SDL_VIDEODRIVER"] = "dummy"
+        env["SDL_AUDIODRIVER"] = "dummy"
+    return env
+
+
+def import_breakdown(module="main"):
+    """
+    Returns (total seconds, {top-level package: seconds}) for importing `module` in a fresh interpreter.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=SRC_DIR,
+                            env=_environment(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    packages, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (field.strip() for field in line[len("import time:"):].split("|"))
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us) / 1e6
+        if name == module:
+            total = int(cumulative_us) / 1e6
+    return total, packages
+
+
+def heavy_imports(module):
+    """
+    Heavy packages that end up in sys.modules after importing `module`.
+    """
+    code = f"import json, sys, {module}; print(json.dumps([p for p in {HEAVY_PACKAGES!r} if p in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, env=_environment(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def time_to_first_frame(window=False):
+    """
+    Launches pyMapz until its first frame. Returns the phases it recorded (seconds since main.py
+    started importing) plus "spawn_to_first_frame", which also includes interpreter startup.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        report_path = os.path.join(tmp_dir, "startup.json")
+        spawned = time.time()
+        result = subprocess.run([sys.executable, os.path.join(SRC_DIR, "main.py"), "--startup-report", report_path],
+                                cwd=SRC_DIR, env=_environment(window), capture_output=True, text=True)
+        if result.returncode != 0 or not os.path.exists(report_path):
+            raise RuntimeError(f"pyMapz did not reach its first frame:\n{result.stdout}\n{result.stderr}")
+        with open(report_path, 'r', encoding='utf-8') as file:
+            phases = json.load(file)
+    phases["spawn_to_first_frame"] = phases.pop("first_frame_epoch") - spawned
+    return phases
+
+
+def _median_dicts(dicts):
+    keys = [key for key in dicts[0] if all(key in d for d in dicts)]
+    return {key: statistics.median(d[key] for d in dicts) for key in keys}
+
+
+def build_report(repeat=3, window=False):
+    runs = [import_breakdown("main") for _ in range(repeat)]
+    packages = _median_dicts([packages for _, packages in runs])
+    return {
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "import_main_seconds": statistics.median(total for total, _ in runs),
+        "import_packages_seconds": dict(sorted(packages.items(), key=lambda item: -item[1])),
+        "headless_heavy_imports": {module: heavy_imports(module) for module in HEADLESS_MODULES},
+        "first_frame_seconds": _median_dicts([time_to_first_frame(window) for _ in range(repeat)]),
+    }
+
+
+def print_report(report, top=12):
+    print(f"[STARTUP] Python {report['python']}, median of {report['repeat']} runs")
+    print(f"[STARTUP] import main: {report['import_main_seconds'] * 1000:.0f} ms")
+    for package, seconds in list(report["import_packages_seconds"].items())[:top]:
+        print(f"    {package:<24} {seconds * 1000:8.1f} ms")
+    for module, packages in report["headless_heavy_imports"].items():
+        print(f"[STARTUP] import {module}: heavy packages loaded: {', '.join(packages) or 'none'}")
+    phases = report["first_frame_seconds"]
+    print(f"[STARTUP] Time to first frame: {phases['spawn_to_first_frame']:.2f} s from spawn")
+    previous = 0.0
+    for phase in ("imports", "pygame_init", "graph_loaded", "gui_ready", "first_frame"):
+        if phase in phases:
+            print(f"    {phase:<24} {(phases[phase] - previous) * 1000:8.1f} ms")
+            previous = phases[phase]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pymapz-startup", description="Report pyMapz import and startup times.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Runs per measurement; the median is reported")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    parser.add_argument("--budget", type=float, default=None, help="Fail when the time to first frame exceeds this many seconds")
+    parser.add_argument("--window", action="store_true", help="Open a real window instead of SDL's dummy driver")
+    args = parser.parse_args(argv)
+
+    report = build_report(max(1, args.repeat), args.window)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+    if args.budget is not None and report["first_frame_seconds"]["spawn_to_first_frame"] > args.budget:
+        print(f"[STARTUP] Over budget: {report['first_frame_seconds']['spawn_to_first_frame']:.2f} s > {args.budget:.2f} s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_FONT = "Tahoma"
+
+_fonts = {}
+
+
+def get_font(size, name=DEFAULT_FONT):
+    """
+    Returns the process-wide pygame font for (name, size), looking the system font up only once.
+    """
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by (text, font, size, colors).
+    Labels that do not change between frames are rasterized once and then only blitted.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def render(self, text, size, color, background=None, name=DEFAULT_FONT):
+        key = (text, name, size, color, background)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = get_font(size, name).render(text, True, color, background)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+text_cache = TextCache()
+
+
+def render_text(text, size, color, background=None, name=DEFAULT_FONT):
+    """
+    Renders text through the shared TextCache. The returned surface is shared: do not draw on it.
+    """
+    return text_cache.render(str(text), size, color, background, name)
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+import numpy as np
+
+# Phases of a main loop iteration, in the order they run
+PHASES = ("events", "ui_update", "animation", "map_render", "overlays", "flip")
+
+
+class FrameProfiler:
+    """
+    Per-phase timings of the main loop for the last `capacity` frames, kept in ring buffers.
+
+    A frame is bracketed by begin_frame() and end_frame(), and every mark(phase) in between
+    charges the time since the previous mark to that phase. While the profiler is disabled,
+    begin_frame() does not start a frame and every other call returns right away.
+    """
+
+    def __init__(self, capacity=600, enabled=False, phases=PHASES):
+        self.phases = tuple(phases)
+        self.capacity = capacity
+        self.recording = enabled  # Record even while the overlay is hidden
+        self.show_overlay = False
+        self.enabled = enabled
+        self.frames = 0  # Frames recorded since the last clear()
+        self.epoch = time.perf_counter()
+        self._index = {phase: i for i, phase in enumerate(self.phases)}
+
+        self._frame_starts = np.zeros(capacity)
+        self._frame_times = np.zeros(capacity)
+        self._phase_starts = np.zeros((capacity, len(self.phases)))
+        self._phase_times = np.zeros((capacity, len(self.phases)))
+
+        self._in_frame = False
+        self._frame_start = self._last = 0.0
+        self._starts = [0.0] * len(self.phases)
+        self._times = [0.0] * len(self.phases)
+
+    def set_recording(self, recording):
+        """Records frames even while the overlay is hidden (for a trace written at exit)."""
+        self.recording = recording
+        self.enabled = self.show_overlay or self.recording
+
+    def toggle_overlay(self):
+        """Shows or hides the overlay; frames are recorded while it is shown."""
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay or self.recording
+
+    def clear(self):
+        self.frames = 0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._times = [0.0] * len(self.phases)
+        self._in_frame = True
+
+    def mark(self, phase):
+        """Charges the time since the previous mark (or the frame start) to `phase`."""
+        if not self._in_frame:
+            return
+        now = time.perf_counter()
+        i = self._index[phase]
+        if not self._times[i]:
+            self._starts[i] = self._last
+        self._times[i] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        if not self._in_frame:
+            return
+        self._in_frame = False
+        row = self.frames % self.capacity
+        self._frame_starts[row] = self._frame_start
+        self._frame_times[row] = time.perf_counter() - self._frame_start
+        self._phase_starts[row] = self._starts
+        self._phase_times[row] = self._times
+        self.frames += 1
+
+    def _rows(self):
+        """Ring buffer rows holding recorded frames, oldest first."""
+        count = min(self.frames, self.capacity)
+        if self.frames <= self.capacity:
+            return np.arange(count)
+        return (np.arange(count) + self.frames) % self.capacity
+
+    def summary(self):
+        """
+        Frame-time percentiles and per-phase mean and 95th percentile over the buffered frames, in milliseconds.
+        """
+        rows = self._rows()
+        if not len(rows):
+            return {"frames": 0}
+        frame_times = self._frame_times[rows] * 1000
+        phase_times = self._phase_times[rows] * 1000
+        p50, p95, p99 = np.percentile(frame_times, (50, 95, 99)).tolist()
+        return {
+            "frames": len(rows),
+            "frame_ms": {"p50": p50, "p95": p95, "p99": p99, "max": float(frame_times.max())},
+            "phases_ms": {phase: {"mean": float(phase_times[:, i].mean()), "p95": float(np.percentile(phase_times[:, i], 95))}
+                          for i, phase in enumerate(self.phases)},
+        }
+
+    def trace_events(self):
+        """
+        The buffered frames as Chrome trace "complete" events (chrome://tracing, Perfetto).
+        """
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "pyMapz"}},
+                  {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "main loop"}}]
+        first = self.frames - min(self.frames, self.capacity)
+        for index, row in enumerate(self._rows().tolist(), start=first):
+            events.append({"name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": (self._frame_starts[row] - self.epoch) * 1e6, "dur": self._frame_times[row] * 1e6,
+                           "args": {"frame": index}})
+            for i, phase in enumerate(self.phases):
+                if self._phase_times[row, i]:
+                    events.append({"name": phase, "cat": "phase", "ph": "X", "pid": 1, "tid": 1,
+                                   "ts": (self._phase_starts[row, i] - self.epoch) * 1e6,
+                                   "dur": self._phase_times[row, i] * 1e6})
+        return events
+
+    def export_chrome_trace(self, path):
+        """
+        Writes the buffered frames as Chrome trace JSON. Returns the number of frames written.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms",
+                       "otherData": {"summary": self.summary()}}, file)
+        return min(self.frames, self.capacity)
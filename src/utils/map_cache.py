@@ -0,0 +1,250 @@
+"""
+Preprocessed map geometry for MapRenderer.
+
+Reading the shapefile with geopandas, computing the district centroids, projecting every
+coordinate to the window and simplifying the polygons takes seconds. build_map_data() does
+it once and the result is saved as a small ``.npz`` file, keyed by a hash of the shapefile
+(and its .dbf/.shx/.prj/.cpg companions), the window size and the margin. load_map_data()
+reads that file and only falls back to geopandas when it is missing or stale.
+
+Build the cache ahead of time with ``python utils/map_cache.py [SHAPEFILE] --window 800x800 --margin 100``.
+"""
+import argparse
+import hashlib
+import os
+import time
+import numpy as np
+
+MAP_CACHE_VERSION = 1
+
+# Polygon simplification tolerances, in unzoomed screen pixels, coarsest first
+LOD_TOLERANCES = (8.0, 4.0, 2.0, 1.0, 0.5, 0.25, 0.125, 0.0625)
+
+_SHAPEFILE_PARTS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+
+class MapData:
+    """
+    Projected map geometry: district names and centroids, and the polygon rings at every
+    level of detail, all in unzoomed screen coordinates.
+
+    Rings are stored flat: ring i of the whole file is points[ring_offsets[i]:ring_offsets[i + 1]],
+    and level l (tolerance tolerances[l], 0 for full resolution) owns rings
+    level_offsets[l] to level_offsets[l + 1].
+    """
+
+    def __init__(self, names, centroids, tolerances, level_offsets, ring_offsets, points):
+        self.names = names
+        self.centroids = centroids
+        self.tolerances = tolerances
+        self.level_offsets = level_offsets
+        self.ring_offsets = ring_offsets
+        self.points = points
+
+    def levels(self):
+        """
+        Yields (tolerance, list of (n, 2) ring arrays) for every level, coarsest first.
+        """
+        ring_offsets = self.ring_offsets.tolist()
+        for level, tolerance in enumerate(self.tolerances.tolist()):
+            first, last = self.level_offsets[level], self.level_offsets[level + 1]
+            yield tolerance, [self.points[ring_offsets[i]:ring_offsets[i + 1]] for i in range(first, last)]
+
+    def save(self, path, fingerprint, window_size, margin):
+        """
+        Writes the cache atomically, tagged with what it was built from.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as file:
+            np.savez(file, version=MAP_CACHE_VERSION, fingerprint=np.array(fingerprint),
+                     window_size=np.array(window_size), margin=margin,
+                     names=np.array(self.names, dtype=str), centroids=self.centroids,
+                     tolerances=self.tolerances, level_offsets=self.level_offsets,
+                     ring_offsets=self.ring_offsets, points=self.points)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, fingerprint, window_size, margin):
+        """
+        Reads a cache written by save(). Raises ValueError if it was built from another
+        shapefile, window size or margin, or by another version of this module.
+        """
+        with np.load(path) as data:
+            if int(data["version"]) != MAP_CACHE_VERSION:
+                raise ValueError(f"Map cache '{path}' has an old format")
+            if str(data["fingerprint"]) != fingerprint:
+                raise ValueError(f"Map cache '{path}' was built from a different shapefile")
+            if tuple(data["window_size"].tolist()) != tuple(window_size) or int(data["margin"]) != margin:
+                raise ValueError(f"Map cache '{path}' was built for a different window")
+            return cls(data["names"].tolist(), data["centroids"], data["tolerances"],
+                       data["level_offsets"], data["ring_offsets"], data["points"])
+
+
+def shapefile_fingerprint(shapefile_path):
+    """
+    SHA-256 over the shapefile and the companion files that exist next to it.
+    """
+    digest = hashlib.sha256()
+    stem = os.path.splitext(shapefile_path)[0]
+    for extension in _SHAPEFILE_PARTS:
+        part = stem + extension
+        if not os.path.exists(part):
+            continue
+        digest.update(extension.encode())
+        with open(part, 'rb') as file:
+            while chunk := file.read(1 << 20):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_path(shapefile_path, window_size, margin):
+    stem = os.path.splitext(os.path.basename(shapefile_path))[0]
+    return os.path.join(os.path.expanduser("~"), ".cache", "pymapz", "maps",
+                        f"{stem}-{window_size[0]}x{window_size[1]}-m{margin}.npz")
+
+
+def _simplify_coverage(geometries, tolerance):
+    """
+    Simplify the polygons so that shared borders stay shared (shapely.coverage_simplify, GEOS 3.12+).
+    Falls back to simplifying every polygon on its own, still without self-intersections.
+    """
+    import shapely
+
+    if hasattr(shapely, 'coverage_simplify'):
+        try:
+            return shapely.coverage_simplify(geometries, tolerance)
+        except (shapely.errors.GEOSException, shapely.errors.UnsupportedGEOSVersionError):
+            pass
+    return shapely.simplify(geometries, tolerance, preserve_topology=True)
+
+
+def _polygon_rings(geometries):
+    """
+    Every exterior and interior ring of the (Multi)Polygons, as (n, 2) geographic coordinate arrays.
+    """
+    rings = []
+    for geom in geometries:
+        if geom.geom_type == 'Polygon':
+            polygons = [geom]
+        elif geom.geom_type == 'MultiPolygon':
+            polygons = geom.geoms
+        else:
+            continue
+        for poly in polygons:
+            for ring in (poly.exterior, *poly.interiors):
+                rings.append(np.asarray(ring.coords)[:, :2])
+    return rings
+
+
+def build_map_data(shapefile_path, window_size, margin):
+    """
+    Reads the shapefile with geopandas and projects it into a window of `window_size`
+    pixels, leaving `margin` pixels around the district centroids.
+    """
+    import geopandas as gpd
+
+    window_width, window_height = window_size
+
+    # Load geodata and drop metadata rows
+    gdf = gpd.read_file(shapefile_path, encoding='utf-8')
+    gdf = gdf.iloc[2:].reset_index(drop=True)
+
+    # Compute centroids and raw bounds
+    columns = [gdf[column] if column in gdf.columns else [None] * len(gdf) for column in ("NAME", "Name", "NAME_1")]
+    names, xs, ys = [], [], []
+    for geom, *labels in zip(gdf.geometry, *columns):
+        if geom is None:
+            continue
+        names.append(str(next((label for label in labels if label), '')))
+        centroid = geom.centroid
+        xs.append(centroid.x)
+        ys.append(centroid.y)
+    if not xs:
+        raise ValueError("No centroids found in shapefile.")
+
+    min_x, max_x = min(xs), max(xs)
+    min_y, max_y = min(ys), max(ys)
+    geo_w = max_x - min_x
+    geo_h = max_y - min_y
+
+    # Compute scale factoring margin
+    avail_w = window_width - 2 * margin
+    avail_h = window_height - 2 * margin
+    scale = min(avail_w / geo_w, avail_h / geo_h)
+
+    # Compute offsets to center map within margin
+    raw_w, raw_h = geo_w * scale, geo_h * scale
+    off_x = margin + (avail_w - raw_w) / 2
+    off_y = margin + (avail_h - raw_h) / 2
+
+    def project(coords):
+        return np.column_stack((off_x + (coords[:, 0] - min_x) * scale, off_y + (max_y - coords[:, 1]) * scale))
+
+    centroids = project(np.column_stack((xs, ys)))
+
+    # Simplify from the full resolution up: every level starts from the next finer one, so only
+    # the first pass sees all source vertices and the error of a level stays below twice its tolerance
+    geometries = np.array([geom for geom in gdf.geometry if geom is not None and not geom.is_empty], dtype=object)
+    levels = []
+    for tolerance in (0.0,) + LOD_TOLERANCES[::-1]:
+        if tolerance:
+            geometries = _simplify_coverage(geometries, tolerance / scale)
+        levels.append([project(ring) for ring in _polygon_rings(geometries)])
+    levels.reverse()
+
+    rings = [ring for level in levels for ring in level]
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum([len(ring) for ring in rings], out=ring_offsets[1:])
+    level_offsets = np.zeros(len(levels) + 1, dtype=np.int64)
+    np.cumsum([len(level) for level in levels], out=level_offsets[1:])
+    points = np.concatenate(rings) if rings else np.zeros((0, 2))
+
+    return MapData(names, centroids, np.array(LOD_TOLERANCES + (0.0,)), level_offsets, ring_offsets, points)
+
+
+def load_map_data(shapefile_path, window_size, margin, cache_path=None):
+    """
+    Returns the MapData for the shapefile, from the cache when it is up to date. Otherwise it is
+    built with geopandas and the cache is rewritten (a cache that cannot be written is only reported).
+    """
+    cache_path = cache_path or default_cache_path(shapefile_path, window_size, margin)
+    fingerprint = shapefile_fingerprint(shapefile_path)
+    try:
+        return MapData.load(cache_path, fingerprint, window_size, margin)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[GUI] Ignoring map cache: {e}")
+
+    print("[GUI] Preprocessing map shapefile...")
+    started = time.perf_counter()
+    data = build_map_data(shapefile_path, window_size, margin)
+    print(f"[GUI] Map preprocessed in {time.perf_counter() - started:.2f} s.")
+    try:
+        data.save(cache_path, fingerprint, window_size, margin)
+    except OSError as e:
+        print(f"[ERRO] Failed to save map cache: {e}")
+    return data
+
+
+def main(argv=None):
+    default_shapefile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps", "PRT_ADM1.shp")
+    parser = argparse.ArgumentParser(prog="pymapz-mapcache", description="Preprocess a map shapefile for the pyMapz window.")
+    parser.add_argument("shapefile", nargs="?", default=default_shapefile, help="Shapefile to preprocess")
+    parser.add_argument("--window", default="800x800", help="Window size as WIDTHxHEIGHT (default: 800x800)")
+    parser.add_argument("--margin", type=int, default=100, help="Margin in pixels around the map (default: 100)")
+    parser.add_argument("-o", "--output", default=None, help="Cache file (default: under ~/.cache/pymapz/maps)")
+    args = parser.parse_args(argv)
+
+    window_size = tuple(int(size) for size in args.window.lower().split("x"))
+    output = args.output or default_cache_path(args.shapefile, window_size, args.margin)
+    started = time.perf_counter()
+    data = build_map_data(args.shapefile, window_size, args.margin)
+    data.save(output, shapefile_fingerprint(args.shapefile), window_size, args.margin)
+    print(f"[INFO] Wrote {output} ({os.path.getsize(output) / 1e6:.1f} MB, "
+          f"{len(data.points)} vertices, {time.perf_counter() - started:.2f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,13 @@
-import geopandas as gpd
 import numpy as np
 import pygame
 from src.utils.colors import Color
+from utils.fonts import get_font
+from utils.map_cache import load_map_data
+from utils.spatial_index import SpatialGrid
+
+# Screen pixels around the viewport still searched, so labels of just-offscreen items are not cut
+_NODE_CULL_MARGIN = 80
+_EDGE_CULL_MARGIN = 40
 
 
 class MapRenderer:
@@ -9,185 +15,303 @@ class MapRenderer:
     Object-oriented renderer for mapping and drawing graphs over geographic districts.
     """
 
-    def __init__(self, shapefile_path="./utils/maps/PRT_ADM1.shp", window_size=(960, 740), margin=150, manager=None):
+    def __init__(self, shapefile_path="./utils/maps/PRT_ADM1.shp", window_size=(960, 740), margin=150, manager=None, cache_path=None):
         """
-        Load the shapefile, compute centroids and polygon shapes, and prepare scaling.
+        Load the projected centroids and polygon shapes, preprocessing the shapefile if needed.
         Args:
             shapefile_path (str): Path to the GPKG/SHAPEFILE with district geometries.
             window_size (tuple): (width, height) of the rendering surface.
             margin (int): margin in pixels around the map.
+            cache_path (str): preprocessed map file; by default one per shapefile and window under ~/.cache/pymapz.
         """
         self.window_width, self.window_height = window_size
         self.margin = margin
         self.manager = manager
-        self.visited_nodes, self.path_nodes = set(), set()
-        self._font_cache = pygame.font.SysFont('Tahoma', 12)
-        self._background_surface = None
-        self._edge_data = {}
+        self.path_nodes = set()
+        self._font_cache = get_font(12)
+        self._world_positions = np.zeros((0, 2))  # Unzoomed screen position of every node, by id
+        self._node_grid = None  # Spatial indexes over nodes and edges, built from the positions on first draw
+        self._edge_grid = None
+        self._edge_points = None  # Geometry of the visible edges, in screen coordinates
+        self._edge_labels = []  # (surface, rect) of every visible weight label, drawn above the nodes
+        self._label_rects = []
+        self._node_list = []
+        self._visible_nodes = []  # Graph nodes inside the viewport, in id order
+        self._visible = set()
+        self._node_rects = {}  # Last drawn area of every visible node
         self._weight_surfaces = {}
 
-        # Load geodata and drop metadata rows
-        gdf = gpd.read_file(shapefile_path, encoding='utf-8')
-        gdf = gdf.iloc[2:].reset_index(drop=True)
-
-        # Compute centroids and raw bounds
-        self._centroids = {}
-        xs, ys = [], []
-        for _, row in gdf.iterrows():
-            name = str(row.get("NAME") or row.get("Name") or row.get("NAME_1") or '')
-            geom = row.geometry
-            if geom is None:
-                continue
-            cx, cy = geom.centroid.x, geom.centroid.y
-            self._centroids[name] = (cx, cy)
-            xs.append(cx)
-            ys.append(cy)
-        if not xs:
-            raise ValueError("No centroids found in shapefile.")
-
-        self.min_x, self.max_x = min(xs), max(xs)
-        self.min_y, self.max_y = min(ys), max(ys)
-        geo_w = self.max_x - self.min_x
-        geo_h = self.max_y - self.min_y
-
-        # Compute scale factoring margin
-        avail_w = self.window_width - 2 * self.margin
-        avail_h = self.window_height - 2 * self.margin
-        self.scale = min(avail_w / geo_w, avail_h / geo_h)
-
-        # Compute offsets to center map within margin
-        raw_w, raw_h = geo_w * self.scale, geo_h * self.scale
-        self.off_x = self.margin + (avail_w - raw_w) / 2
-        self.off_y = self.margin + (avail_h - raw_h) / 2
-
-        # Helper to transform geographic to screen coords
-        def tf(x, y):
-            sx = self.off_x + (x - self.min_x) * self.scale
-            sy = self.off_y + (self.max_y - y) * self.scale
-            return int(sx), int(sy)
-
-        # Precompute shapes
-        self.shapes = []
-        for geom in gdf.geometry:
-            if geom.geom_type == 'Polygon':
-                self.shapes.append([tf(x, y) for x, y in geom.exterior.coords])
-                for hole in geom.interiors:
-                    self.shapes.append([tf(x, y) for x, y in hole.coords])
-            elif geom.geom_type == 'MultiPolygon':
-                for poly in geom.geoms:
-                    self.shapes.append([tf(x, y) for x, y in poly.exterior.coords])
-                    for hole in poly.interiors:
-                        self.shapes.append([tf(x, y) for x, y in hole.coords])
-
-    def map_positions(self, graph):
+        # Camera: screen = world * zoom + pan, where world is the unzoomed screen position
+        self.zoom = 1.0
+        self.pan_x, self.pan_y = 0.0, 0.0
+        self.min_zoom, self.max_zoom = 0.5, 256.0
+        self.viewport = pygame.Rect(0, 0, self.window_width, self.window_height)
+
+        # Projected centroids and polygons, from the preprocessed map cache (see map_cache.py)
+        map_data = load_map_data(shapefile_path, window_size, margin, cache_path)
+        self._centroids = dict(zip(map_data.names, map_data.centroids.tolist()))
+
+        # Shapes at every level of detail, coarsest first
+        self.shape_levels = []
+        for tolerance, rings in map_data.levels():
+            grid = SpatialGrid([(*ring.min(axis=0), *ring.max(axis=0)) for ring in rings])
+            self.shape_levels.append((tolerance, rings, grid))
+        self.shapes = self.shape_levels[-1][1]
+        vertices = [sum(len(ring) for ring in rings) for _, rings, _ in self.shape_levels]
+        print(f"[GUI] Map levels of detail: {' / '.join(map(str, vertices))} vertices.")
+
+    def shape_level(self):
+        """
+        The coarsest level of detail whose error stays under about a screen pixel at the current zoom.
+        """
+        for level in self.shape_levels:
+            if level[0] * self.zoom <= 0.5:
+                return level
+        return self.shape_levels[-1]
+
+    def map_positions(self, graph, adopt=True):
+        """
+        Screen positions of the nodes, at the centroid of the map district each one names. With
+        `adopt` False the renderer keeps its current positions (for a graph loaded in the background).
+        """
         pos = {}
-        for node in graph.nodes():
+        for node in graph.node_list:
             centroid = self._centroids.get(str(node))
             if centroid:
-                x, y = centroid
-                sx = self.off_x + (x - self.min_x) * self.scale
-                sy = self.off_y + (self.max_y - y) * self.scale
+                sx, sy = centroid
                 pos[node] = (int(sx), int(sy))
             else:
                 default = (self.window_width // 2, self.window_height // 2)
                 pos[node] = default
+        if adopt:
+            self.adopt_positions(pos)
         print(f"[GUI] Mapped {len(pos)} nodes to screen positions.")
         return pos
 
+    def layout_positions(self, graph, coordinates):
+        """
+        Positions for graphs that do not name districts: fits the (n, 2) coordinates (by node id,
+        y pointing up) inside the window margins, like the map itself, keeping the aspect ratio.
+        """
+        coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+        low, high = coordinates.min(axis=0), coordinates.max(axis=0)
+        extent = np.maximum(high - low, 1e-9)
+        available = np.array([self.window_width, self.window_height], dtype=float) - 2 * self.margin
+        scale = (available / extent).min()
+        offset = self.margin + (available - extent * scale) / 2
+        xs = offset[0] + (coordinates[:, 0] - low[0]) * scale
+        ys = offset[1] + (high[1] - coordinates[:, 1]) * scale
+        pos = {node: (int(x), int(y)) for node, x, y in zip(graph.node_list, xs.tolist(), ys.tolist())}
+        self.adopt_positions(pos)
+        return pos
+
+    def adopt_positions(self, positions):
+        """Draws the nodes at `positions` (node -> unzoomed screen position, in node id order) from now on."""
+        self._world_positions = np.array(list(positions.values()), dtype=float).reshape(-1, 2)
+
     def draw(self, screen, graph, nodes, visualizer, found_path, animation_done, radius=20):
         """
-        Draw the map polygons, graph edges, weights, and nodes onto the screen.
+        Draw the map polygons, graph edges, weights, and nodes onto the screen in one pass.
         Args:
             screen: pygame Surface to draw on.
-            graph: graph object with .nx_graph.edges and .start_node/.end_node.
+            graph: Graph object with .edges() and .start_node/.end_node.
             nodes: dict of node_label -> Node instance with .pos and draw()
-            visualizer: SearchVisualizer with visited_nodes list.
+            visualizer: SearchVisualizer, the search timeline.
             found_path: list of node labels representing the final path.
             animation_done (bool): whether the search animation completed.
             radius (int): node circle radius.
         """
-        # Draw map shapes
-        if self._background_surface is None:
-            self._background_surface = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
-            for poly in self.shapes:
-                pygame.draw.polygon(self._background_surface, Color.WHITE.value, poly)
-                pygame.draw.polygon(self._background_surface, Color.BLACK.value, poly, 2)
+        self.draw_static(screen, graph, nodes, radius)
+        self.update_nodes(graph, nodes, self.visible_nodes, visualizer, found_path, animation_done)
+        self.draw_dynamic(screen, nodes)
 
-        # Fill the background
-        screen.blit(self._background_surface, (0, 0))
+    def draw_static(self, surface, graph, nodes, radius=20):
+        """
+        Draw the static layer for the current camera: map polygons and edge lines with their
+        arrowheads, limited to what intersects the viewport. Also moves the visible nodes to
+        their screen positions. Weight labels are only prepared here, since they go on top of
+        the nodes.
+        """
+        if self._node_grid is None:
+            self._build_index(graph)
+        previous_clip = surface.get_clip()
+        surface.set_clip(self.viewport)
 
-        # Get visited and path nodes
-        self.visited_nodes = set(visualizer.visited_nodes)
-        self.path_nodes = set(found_path) if animation_done else set()
+        # Draw map shapes, at the level of detail of the current zoom
+        _, rings, grid = self.shape_level()
+        for index in grid.query(*self.visible_world_rect()).tolist():
+            poly = self.to_screen(rings[index]).tolist()
+            pygame.draw.polygon(surface, Color.WHITE.value, poly)
+            pygame.draw.polygon(surface, Color.BLACK.value, poly, 2)
+
+        # Place the visible nodes
+        ids = self._node_grid.query(*self.visible_world_rect(_NODE_CULL_MARGIN))
+        self._visible_nodes = [self._node_list[node_id] for node_id in ids.tolist()]
+        self._visible = set(self._visible_nodes)
+        for key, pos in zip(self._visible_nodes, self.to_screen(self._world_positions[ids]).tolist()):
+            nodes[key].pos = tuple(pos)
+        self._node_rects = {}
 
         # Draw edges
-        edge_labels = []
-        for u, v in graph.nx_graph.edges:
-            # Calculate edge key
-            edge_key = (u, v)
-            if edge_key not in self._edge_data:
-                p1 = np.array(nodes[u].pos, float)
-                p2 = np.array(nodes[v].pos, float)
-                d = p2 - p1
-                dist = np.linalg.norm(d)
-                if dist == 0:
-                    continue
-
-                direction = d / dist
-                perp = np.array([-direction[1], direction[0]])
-                tip = p2 - radius * direction
-                offset = 15 * direction * 0.5
-                left = tip - offset - 15 * perp * 0.7
-                right = tip - offset + 15 * perp * 0.7
-
-                self._edge_data[edge_key] = {
-                    'p1': tuple(p1),
-                    'tip': tuple(tip),
-                    'left': tuple(left),
-                    'right': tuple(right),
-                    'mid': tuple((p1 + p2) / 2)
-                }
-
-            data = self._edge_data[edge_key]
-
-            # Draw edge line
-            pygame.draw.line(screen, Color.BLACK.value, data['p1'], data['tip'], 1)
-            pygame.draw.line(screen, Color.BLACK.value, data['tip'], data['left'], 1)
-            pygame.draw.line(screen, Color.BLACK.value, data['tip'], data['right'], 1)
-
-            # Draw edge weight
-            weight = graph.nx_graph[u][v].get('weight', '')
-            if weight:
-                weight_str = str(weight)
-                if weight_str not in self._weight_surfaces:
-                    txt = self._font_cache.render(weight_str, True, Color.BLACK.value, Color.WHITE.value)
-                    tw, th = txt.get_size()
-                    surf = pygame.Surface((tw + 3, th + 3))
-                    surf.fill(Color.WHITE.value)
-                    surf.blit(txt, (3, 3))
-                    self._weight_surfaces[weight_str] = surf
-                edge_labels.append((self._weight_surfaces[weight_str], data['mid']))
-
-        # Draw nodes
-        for name, node in nodes.items():
-            if name == graph.start_node:
-                color = Color.BLACK.value
-            elif name == graph.end_node:
-                color = Color.RED.value
-            elif name in self.path_nodes:
-                color = Color.YELLOW.value
-            elif name in self.visited_nodes:
-                color = Color.GREEN.value
-            else:
-                color = Color.BLUE.value
-            node.set_color(color)
-            node.draw(screen)
+        self._build_edge_geometry(graph, self._edge_grid.query(*self.visible_world_rect(_EDGE_CULL_MARGIN)), radius)
+        for p1, tip, left, right in self._edge_points.tolist():
+            pygame.draw.line(surface, Color.BLACK.value, p1, tip, 1)
+            pygame.draw.line(surface, Color.BLACK.value, tip, left, 1)
+            pygame.draw.line(surface, Color.BLACK.value, tip, right, 1)
+        surface.set_clip(previous_clip)
+
+    def _build_index(self, graph):
+        """
+        Index the node positions and the edge bounding boxes, in world coordinates.
+        """
+        self._node_list = graph.node_list
+        self._edge_sources = np.repeat(np.arange(graph.node_count), np.diff(graph.offsets))
+        self._edge_targets = np.asarray(graph.targets)
+        points = self._world_positions
+        self._node_grid = SpatialGrid(np.hstack((points, points)))
+        p1, p2 = points[self._edge_sources], points[self._edge_targets]
+        self._edge_grid = SpatialGrid(np.hstack((np.minimum(p1, p2), np.maximum(p1, p2))))
+
+    def _build_edge_geometry(self, graph, edges, radius=20):
+        """
+        Compute the line, arrowhead and label position of the given edges at once.
+        Stores (edges, 4, 2) screen points (start, tip, left and right arrowhead corners) and the
+        weight labels with their rects, so drawing is only a walk over ready-made coordinates.
+        """
+        p1 = self.to_screen(self._world_positions[self._edge_sources[edges]], rounded=False)
+        p2 = self.to_screen(self._world_positions[self._edge_targets[edges]], rounded=False)
+        d = p2 - p1
+        dist = np.hypot(d[:, 0], d[:, 1])
+
+        # Edges between nodes at the same spot have no direction and are not drawn
+        keep = dist != 0
+        p1, p2, d, dist = p1[keep], p2[keep], d[keep], dist[keep]
+        weights = np.asarray(graph.weights)[edges[keep]]
+
+        direction = d / dist[:, None]
+        perp = np.stack((-direction[:, 1], direction[:, 0]), axis=1)
+        tip = p2 - radius * direction
+        offset = 15 * direction * 0.5
+        left = tip - offset - 15 * perp * 0.7
+        right = tip - offset + 15 * perp * 0.7
+        self._edge_points = np.stack((p1, tip, left, right), axis=1)
+
+        # Weight labels, drawn later above the nodes
+        self._edge_labels = []
+        labelled = np.flatnonzero(weights)
+        mids = ((p1[labelled] + p2[labelled]) / 2).tolist()
+        for weight, mid in zip(weights[labelled].tolist(), mids):
+            weight_str = f"{weight:g}"
+            if weight_str not in self._weight_surfaces:
+                txt = self._font_cache.render(weight_str, True, Color.BLACK.value, Color.WHITE.value)
+                tw, th = txt.get_size()
+                surf = pygame.Surface((tw + 3, th + 3))
+                surf.fill(Color.WHITE.value)
+                surf.blit(txt, (3, 3))
+                self._weight_surfaces[weight_str] = surf
+            surf = self._weight_surfaces[weight_str]
+            self._edge_labels.append((surf, surf.get_rect(center=mid)))
+        self._label_rects = [rect for _, rect in self._edge_labels]
+
+    @property
+    def visible_nodes(self):
+        """Graph nodes placed by the last draw_static, in id order."""
+        return self._visible_nodes
+
+    def to_screen(self, points, rounded=True):
+        """Transform (n, 2) world points to screen coordinates, as ints unless `rounded` is False."""
+        screen = points * self.zoom + (self.pan_x, self.pan_y)
+        return np.rint(screen).astype(int) if rounded else screen
+
+    def visible_world_rect(self, margin=0):
+        """The viewport, grown by `margin` screen pixels, as a (min_x, min_y, max_x, max_y) world rect."""
+        view = self.viewport.inflate(2 * margin, 2 * margin)
+        return ((view.left - self.pan_x) / self.zoom, (view.top - self.pan_y) / self.zoom,
+                (view.right - self.pan_x) / self.zoom, (view.bottom - self.pan_y) / self.zoom)
+
+    def zoom_at(self, screen_pos, factor):
+        """Zoom by `factor`, keeping the map point under `screen_pos` in place."""
+        zoom = min(max(self.zoom * factor, self.min_zoom), self.max_zoom)
+        x, y = screen_pos
+        self.pan_x = x - (x - self.pan_x) * zoom / self.zoom
+        self.pan_y = y - (y - self.pan_y) * zoom / self.zoom
+        self.zoom = zoom
+
+    def pan_by(self, dx, dy):
+        self.pan_x += dx
+        self.pan_y += dy
+
+    def reset_view(self):
+        self.zoom = 1.0
+        self.pan_x, self.pan_y = 0.0, 0.0
+
+    def node_color(self, graph, node, visualizer=None):
+        if node == graph.start_node:
+            return Color.BLACK.value
+        elif node == graph.end_node:
+            return Color.RED.value
+        elif node in self.path_nodes:
+            return Color.YELLOW.value
+        elif visualizer is not None and visualizer.is_visited(node):
+            return Color.GREEN.value
+        return Color.BLUE.value
+
+    def update_nodes(self, graph, nodes, changed, visualizer, found_path, animation_done):
+        """
+        Recolor and renumber the `changed` nodes from the search timeline at its shown position.
+        Returns the screen rects that must be recomposited (old and new area of every changed node).
+        """
+        self.path_nodes = set(found_path) if animation_done else set()
+
+        dirty = []
+        for key in changed:
+            node = nodes.get(key)
+            if node is None:
+                continue
+            node.set_color(self.node_color(graph, key, visualizer))
+            node.set_order(visualizer.visit_number(key) or [])
+            if key not in self._visible:
+                continue  # Offscreen: placed and drawn when the camera brings it into view
+            rect = node.get_rect()
+            previous = self._node_rects.get(key)
+            self._node_rects[key] = rect
+            dirty.append(rect if previous is None else rect.union(previous))
+        return dirty
+
+    def draw_dynamic(self, surface, nodes, area=None):
+        """
+        Draw the dynamic layer: nodes in their current state, then the weight labels above them.
+        With `area`, only what overlaps it is drawn (the caller clips the surface to it).
+        """
+        if area is None:
+            for key in self._visible_nodes:
+                nodes[key].draw(surface)
+            for surf, rect in self._edge_labels:
+                surface.blit(surf, rect.topleft)
+            return
+
+        # Nodes near the area, from the grid, then the exact check against their drawn rects
+        left, top = (area.left - _NODE_CULL_MARGIN - self.pan_x) / self.zoom, (area.top - _NODE_CULL_MARGIN - self.pan_y) / self.zoom
+        right, bottom = (area.right + _NODE_CULL_MARGIN - self.pan_x) / self.zoom, (area.bottom + _NODE_CULL_MARGIN - self.pan_y) / self.zoom
+        node_list = self._node_list
+        for node_id in self._node_grid.query(left, top, right, bottom).tolist():
+            rect = self._node_rects.get(node_list[node_id])
+            if rect is not None and area.colliderect(rect):
+                nodes[node_list[node_id]].draw(surface)
+        for index in area.collidelistall(self._label_rects):
+            surf, rect = self._edge_labels[index]
+            surface.blit(surf, rect.topleft)
 
-        # At last, draw edge labels
-        for surf, mid_pos in edge_labels:
-            rect = surf.get_rect(center=mid_pos)
-            screen.blit(surf, rect.topleft)
+    def invalidate(self):
+        """Drop the spatial indexes, edge geometry and node areas. Must be called whenever the graph or the positions change."""
+        self._node_grid = None
+        self._edge_grid = None
+        self._edge_points = None
+        self._visible_nodes = []
+        self._visible = set()
+        self._edge_labels = []
+        self._label_rects = []
+        self._node_rects = {}
 
     def reset_animation(self):
-        self.visited_nodes.clear()
         self.path_nodes.clear()
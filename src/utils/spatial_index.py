@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class SpatialGrid:
+    """
+    Uniform grid over axis-aligned boxes, answering "which boxes intersect this rect" queries.
+
+    Every box is registered in each cell it overlaps, and the (cell, box) pairs are stored sorted
+    by cell in CSR form, so a query only gathers one contiguous slice per grid row. Boxes that
+    span more than `max_cells` cells (very long edges, whole countries) are kept apart and
+    checked on every query instead.
+    """
+
+    def __init__(self, boxes, cell_size=None, max_cells=64):
+        """
+        Args:
+            boxes: array-like of shape (n, 4) with (min_x, min_y, max_x, max_y) rows.
+            cell_size (float): side of a grid cell; by default about one box per cell.
+            max_cells (int): boxes spanning more cells than this are not registered in the grid.
+        """
+        self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        count = len(self.boxes)
+        if count == 0:
+            self.origin = np.zeros(2)
+            self.cell_size = 1.0
+            self.columns = self.rows = 1
+            self.items = np.zeros(0, dtype=np.int32)
+            self.cell_offsets = np.zeros(2, dtype=np.int64)
+            self.oversized = np.zeros(0, dtype=np.int64)
+            return
+
+        self.origin = self.boxes[:, :2].min(axis=0)
+        extent = self.boxes[:, 2:].max(axis=0) - self.origin
+        if cell_size is None:
+            # About one box per cell, but no smaller than a typical box
+            area = extent[0] * extent[1]
+            cell_size = np.sqrt(area / count) if area > 0 else extent.max() / count
+            cell_size = max(cell_size, float(np.median((self.boxes[:, 2:] - self.boxes[:, :2]).max(axis=1))))
+        self.cell_size = float(cell_size) or 1.0
+        self.columns, self.rows = (np.floor(extent / self.cell_size).astype(np.int64) + 1).tolist()
+
+        first = self._cells(self.boxes[:, :2])
+        spans = self._cells(self.boxes[:, 2:]) - first + 1
+        sizes = spans[:, 0] * spans[:, 1]
+        oversized = sizes > max_cells
+        self.oversized = np.flatnonzero(oversized)
+
+        # Enumerate the cells of every registered box without a Python loop
+        registered = np.flatnonzero(~oversized)
+        sizes = sizes[registered]
+        local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        widths = np.repeat(spans[registered, 0], sizes)
+        xs = np.repeat(first[registered, 0], sizes) + local % widths
+        ys = np.repeat(first[registered, 1], sizes) + local // widths
+        cells = ys * self.columns + xs
+
+        order = np.argsort(cells, kind='stable')
+        self.items = np.repeat(registered, sizes)[order].astype(np.int32)
+        self.cell_offsets = np.zeros(self.columns * self.rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.columns * self.rows), out=self.cell_offsets[1:])
+
+    def _cells(self, points):
+        cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, [self.columns - 1, self.rows - 1])
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def query(self, min_x, min_y, max_x, max_y):
+        """
+        Returns the sorted indices of the boxes intersecting the given rect.
+        """
+        if not len(self.boxes):
+            return np.zeros(0, dtype=np.int64)
+
+        (x0, y0), (x1, y1) = self._cells(np.array([[min_x, min_y], [max_x, max_y]], dtype=float))
+        row_starts = np.arange(y0, y1 + 1) * self.columns
+        slices = [self.items[self.cell_offsets[row + x0]:self.cell_offsets[row + x1 + 1]] for row in row_starts.tolist()]
+        candidates = np.unique(np.concatenate(slices + [self.oversized]))
+
+        # Cells are coarser than the boxes, so check the candidates exactly
+        boxes = self.boxes[candidates]
+        hits = (boxes[:, 0] <= max_x) & (boxes[:, 2] >= min_x) & (boxes[:, 1] <= max_y) & (boxes[:, 3] >= min_y)
+        return candidates[hits]